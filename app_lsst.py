@@ -23,8 +23,10 @@ from prometheus_flask_exporter.multiprocess import GunicornPrometheusMetrics
 from apps import __version__
 from apps.routes.v1.lsst.blocks.api import ns as ns_blocks
 from apps.routes.v1.lsst.conesearch.api import ns as ns_conesearch
+from apps.routes.v1.lsst.crossmatch.api import ns as ns_crossmatch
 from apps.routes.v1.lsst.cutouts.api import ns as ns_cutouts
 from apps.routes.v1.lsst.fp.api import ns as ns_fp
+from apps.routes.v1.lsst.jobs.api import ns as ns_jobs
 from apps.routes.v1.lsst.objects.api import ns as ns_objects
 from apps.routes.v1.lsst.resolver.api import ns as ns_resolver
 from apps.routes.v1.lsst.schema.api import ns as ns_schema
@@ -32,7 +34,12 @@ from apps.routes.v1.lsst.skymap.api import ns as ns_skymap
 from apps.routes.v1.lsst.sources.api import ns as ns_sources
 from apps.routes.v1.lsst.sso.api import ns as ns_sso
 from apps.routes.v1.lsst.statistics.api import ns as ns_stats
+from apps.routes.v1.lsst.stream.api import ns as ns_stream
 from apps.routes.v1.lsst.tags.api import ns as ns_tags
+from apps.utils.admission import register_admission
+from apps.utils.profiling import register_profiler
+from apps.utils.recorder import register_recorder
+from apps.utils.slowlog import register_slowlog
 from apps.utils.utils import extract_configuration
 from config_prometheus import child_exit, post_fork, pre_fork
 
@@ -84,6 +91,7 @@ api.add_namespace(ns_sources)
 api.add_namespace(ns_objects)
 api.add_namespace(ns_fp)
 api.add_namespace(ns_conesearch)
+api.add_namespace(ns_crossmatch)
 api.add_namespace(ns_cutouts)
 api.add_namespace(ns_schema)
 api.add_namespace(ns_sso)
@@ -91,11 +99,25 @@ api.add_namespace(ns_resolver)
 api.add_namespace(ns_skymap)
 api.add_namespace(ns_stats)
 api.add_namespace(ns_tags)
+api.add_namespace(ns_stream)
 api.add_namespace(ns_blocks)
+api.add_namespace(ns_jobs)
 
 # Register blueprint
 app.register_blueprint(blueprint)
 
+# Record the traffic for replays, if enabled
+register_recorder(app, "lsst")
+
+# Log the slow requests
+register_slowlog(app, "lsst")
+
+# Release the slots of heavy queries, and flag downgraded queries
+register_admission(app)
+
+# Profile a sample of the requests, if FINK_PROFILE=sample
+register_profiler(app)
+
 
 if __name__ == "__main__":
     app.run(config["HOST"], debug=True, port=int(config["PORT"]))
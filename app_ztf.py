@@ -24,7 +24,9 @@ from apps import __version__
 from apps.routes.v1.ztf.anomaly.api import ns as ns_anomaly
 from apps.routes.v1.ztf.classes.api import ns as ns_classes
 from apps.routes.v1.ztf.conesearch.api import ns as ns_conesearch
+from apps.routes.v1.ztf.crossmatch.api import ns as ns_crossmatch
 from apps.routes.v1.ztf.cutouts.api import ns as ns_cutouts
+from apps.routes.v1.ztf.jobs.api import ns as ns_jobs
 from apps.routes.v1.ztf.latests.api import ns as ns_latests
 from apps.routes.v1.ztf.metadata.api import ns as ns_metadata
 from apps.routes.v1.ztf.objects.api import ns as ns_objects
@@ -36,7 +38,12 @@ from apps.routes.v1.ztf.ssobulk.api import ns as ns_ssobulk
 from apps.routes.v1.ztf.ssocand.api import ns as ns_ssocand
 from apps.routes.v1.ztf.ssoft.api import ns as ns_ssoft
 from apps.routes.v1.ztf.statistics.api import ns as ns_statistics
+from apps.routes.v1.ztf.stream.api import ns as ns_stream
 from apps.routes.v1.ztf.tracklet.api import ns as ns_tracklet
+from apps.utils.admission import register_admission
+from apps.utils.profiling import register_profiler
+from apps.utils.recorder import register_recorder
+from apps.utils.slowlog import register_slowlog
 from apps.utils.utils import extract_configuration
 from config_prometheus import child_exit, post_fork, pre_fork
 
@@ -87,8 +94,10 @@ app.config["JSON_SORT_KEYS"] = False
 api.add_namespace(ns_objects)
 api.add_namespace(ns_cutouts)
 api.add_namespace(ns_latests)
+api.add_namespace(ns_stream)
 api.add_namespace(ns_classes)
 api.add_namespace(ns_conesearch)
+api.add_namespace(ns_crossmatch)
 api.add_namespace(ns_sso)
 api.add_namespace(ns_ssocand)
 api.add_namespace(ns_resolver)
@@ -100,10 +109,23 @@ api.add_namespace(ns_anomaly)
 api.add_namespace(ns_ssoft)
 api.add_namespace(ns_metadata)
 api.add_namespace(ns_ssobulk)
+api.add_namespace(ns_jobs)
 
 # Register blueprint
 app.register_blueprint(blueprint)
 
+# Record the traffic for replays, if enabled
+register_recorder(app, "ztf")
+
+# Log the slow requests
+register_slowlog(app, "ztf")
+
+# Release the slots of heavy queries, and flag downgraded queries
+register_admission(app)
+
+# Profile a sample of the requests, if FINK_PROFILE=sample
+register_profiler(app)
+
 
 if __name__ == "__main__":
     app.run(config["HOST"], debug=True, port=int(config["PORT"]))
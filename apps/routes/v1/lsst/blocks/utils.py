@@ -14,8 +14,6 @@
 # limitations under the License.
 import importlib
 
-import fink_filters.rubin.blocks as fblocks
-
 
 def extract_blocks(with_description=False):
     """Extract user-defined blocks
@@ -33,6 +31,8 @@ def extract_blocks(with_description=False):
     descriptions: list of str, optional
         Long descriptions for blocks
     """
+    import fink_filters.rubin.blocks as fblocks
+
     # User-defined blocks
     block_names = [prop for prop in dir(fblocks) if prop.startswith("b_")]
 
@@ -12,10 +12,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import json
+
 from flask import Response, request
 from flask_restx import Namespace, Resource, fields
 
 from apps.routes.v1.lsst.conesearch.utils import run_conesearch
+from apps.utils.cursor import add_cursor_header
 from apps.utils.utils import check_args, send_tabular_data
 
 ns = Namespace("api/v1/conesearch", "Get Rubin alerts data based on coordinates")
@@ -65,6 +68,16 @@ ARGS = ns.model(
             example="r:midpointMjdTai,r:psfFlux,r:band,r:diaObjectId",
             required=False,
         ),
+        "debug": fields.Boolean(
+            description="If True, return the cost model used to choose the pixel table in the `X-Fink-Debug` response header. Default is False.",
+            example=False,
+            required=False,
+        ),
+        "cursor": fields.String(
+            description="Cursor returned in the `X-Fink-Cursor` header of the previous response, to get the next page. Other arguments must be unchanged.",
+            example="",
+            required=False,
+        ),
         "output-format": fields.String(
             description="Output format among json[default], csv, parquet, votable.",
             example="json",
@@ -107,4 +120,11 @@ class Objects(Resource):
             return out
 
         output_format = payload.get("output-format", "json")
-        return send_tabular_data(out, output_format)
+        response = add_cursor_header(send_tabular_data(out, output_format), out)
+
+        if "debug" in payload and (
+            payload["debug"] == "True" or payload["debug"] is True
+        ):
+            response.headers.set("X-Fink-Debug", json.dumps(out.attrs))
+
+        return response
@@ -12,18 +12,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import astropy.units as u
 import pandas as pd
-from astropy.coordinates import SkyCoord
-from astropy.time import Time
-from flask import Response
-from healpy import ang2vec, query_disc
-from line_profiler import profile
-from numpy import pi as nppi
 
-from apps.utils.client import connect_to_hbase_table
-from apps.utils.decoding import format_lsst_hbase_output
-from apps.utils.utils import isoify_time
+from apps.utils.engine import LSST, conesearch
+from apps.utils.profiling import profile
 
 
 @profile
@@ -41,135 +33,4 @@ def run_conesearch(payload: dict) -> pd.DataFrame:
     ----------
     out: pandas dataframe
     """
-    if "columns" in payload:
-        cols = payload["columns"].replace(" ", "")
-        if "r:ra" not in cols:
-            cols = ",".join([cols, "r:ra"])
-        if "r:dec" not in cols:
-            cols = ",".join([cols, "r:dec"])
-        if "r:midpointMjdTai" not in cols:
-            # use for grouping of alerts
-            cols = ",".join([cols, "r:midpointMjdTai"])
-    else:
-        cols = "*"
-
-    n = int(payload.get("n", 1000))
-
-    # Conesearch with optional date range
-    client = connect_to_hbase_table("rubin.pixel1024")
-    client.setLimit(n)
-
-    # Interpret user input
-    ra, dec = payload["ra"], payload["dec"]
-    radius = payload["radius"]
-
-    if float(radius) > 18000.0:
-        rep = {
-            "status": "error",
-            "text": "`radius` cannot be bigger than 18,000 arcseconds (5 degrees).\n",
-        }
-        return Response(str(rep), 400)
-
-    try:
-        if "h" in str(ra):
-            coord = SkyCoord(ra, dec, frame="icrs")
-        elif ":" in str(ra) or " " in str(ra):
-            coord = SkyCoord(ra, dec, frame="icrs", unit=(u.hourangle, u.deg))
-        else:
-            coord = SkyCoord(ra, dec, frame="icrs", unit="deg")
-    except ValueError as e:
-        rep = {
-            "status": "error",
-            "text": e,
-        }
-        return Response(str(rep), 400)
-
-    if ("startdate" in payload or "stopdate" in payload) and (
-        cols != "*" and "f:firstDiaSourceMjdTaiFink" not in cols
-    ):
-        rep = {
-            "status": "error",
-            "text": "You need to specify f:firstDiaSourceMjdTaiFink in the columns to filter on dates.\n",
-        }
-        return Response(str(rep), 400)
-
-    ra = coord.ra.deg
-    dec = coord.dec.deg
-    radius_deg = float(radius) / 3600.0
-
-    # angle to vec conversion
-    vec = ang2vec(nppi / 2.0 - nppi / 180.0 * dec, nppi / 180.0 * ra)
-
-    # Send request
-    nside = 1024
-
-    pixs = query_disc(
-        nside,
-        vec,
-        nppi / 180 * radius_deg,
-        inclusive=True,
-    )
-
-    results = {}
-    for pix in pixs:
-        to_search = f"key:key:{pix}_"
-        result = client.scan(
-            "",
-            to_search,
-            cols,
-            0,
-            True,
-            True,
-        )
-        results.update(result)
-
-    schema_client = client.schema()
-
-    client.close()
-
-    pdf = format_lsst_hbase_output(
-        results,
-        schema_client,
-        truncated=True,
-        group_alerts=True,
-        extract_color=False,
-    )
-
-    if pdf.empty:
-        return pdf
-
-    # Filter by time
-    # FIXME: does not work yet as firstDiaSourceMjdTai is not populated
-    if "startdate" in payload:
-        # Filter out alerts that vary in the past
-        mjd_start = Time(isoify_time(payload["startdate"]), scale="tai").mjd
-        pdf = pdf[pdf["f:firstDiaSourceMjdTaiFink"] >= mjd_start]
-
-        if "window" in payload:
-            # Also filter out alerts that vary in the future
-            window = float(payload["window"])
-            mjd_stop = mjd_start + window
-            pdf = pdf[pdf["r:midpointMjdTai"] <= mjd_stop]
-
-    if "stopdate" in payload:
-        # Filter out alerts that vary in the future
-        mjd_stop = Time(isoify_time(payload["stopdate"]), scale="tai").mjd
-        pdf = pdf[pdf["r:midpointMjdTai"] <= mjd_stop]
-
-    # For conesearch, sort by distance
-    if len(pdf) > 0:
-        sep = coord.separation(
-            SkyCoord(
-                pdf["r:ra"],
-                pdf["r:dec"],
-                unit="deg",
-            ),
-        ).deg
-
-        pdf["v:separation_degree"] = sep
-        pdf = pdf.sort_values("v:separation_degree", ascending=True)
-
-        mask = pdf["v:separation_degree"] > radius_deg
-        pdf = pdf[~mask]
-
-    return pdf
+    return conesearch(LSST, payload)
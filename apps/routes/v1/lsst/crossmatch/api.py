@@ -0,0 +1,91 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from flask import Response, request
+from flask_restx import Namespace, Resource, fields
+
+from apps.routes.v1.lsst.crossmatch.utils import run_crossmatch
+from apps.utils.utils import check_args, stream_tabular_data
+
+ns = Namespace(
+    "api/v1/crossmatch", "Crossmatch a catalog of sources with Fink/LSST alerts"
+)
+
+ARGS = ns.model(
+    "crossmatch",
+    {
+        "catalog": fields.Raw(
+            description="Catalog of sources with columns id, ra, dec (decimal degree), and optionally radius (arcsec). Can be uploaded as a file (multipart/form-data), or sent as a string (CSV content, or str(bytes) for binary formats).",
+            required=False,
+        ),
+        "catalog-format": fields.String(
+            description="Format of the catalog among csv[default], parquet, arrow.",
+            example="csv",
+            required=False,
+        ),
+        "radius": fields.Float(
+            description="Crossmatch radius in arcsec, used if the catalog has no radius column. Maximum is 18,000 arcseconds (5 degrees).",
+            example=5.0,
+            required=False,
+        ),
+        "n": fields.Integer(
+            description="Maximal number of alerts to read. Default and maximum are set by the server.",
+            example=10000,
+            required=False,
+        ),
+        "columns": fields.String(
+            description="Comma-separated data columns to transfer. If not specified, transfer all columns.",
+            example="r:diaObjectId,r:midpointMjdTai,r:psfFlux,r:band",
+            required=False,
+        ),
+        "output-format": fields.String(
+            description="Output format among json[default], csv, parquet, arrow, votable.",
+            example="json",
+            required=False,
+        ),
+    },
+)
+
+
+@ns.route("")
+@ns.doc(params={k: ARGS[k].description for k in ARGS})
+class Crossmatch(Resource):
+    def get(self):
+        """Crossmatch a catalog of sources with Fink/LSST alerts"""
+        return Response(ns.description, 200)
+
+    @ns.expect(ARGS, location="json", as_dict=True)
+    def post(self):
+        """Crossmatch a catalog of sources with Fink/LSST alerts"""
+        # get payload from the query URL
+        payload = request.args
+
+        if payload is None or len(payload) == 0:
+            # if no payload, try the JSON blob or the form (file upload)
+            payload = request.get_json(silent=True) or request.form
+
+        rep = check_args(ARGS, payload)
+        if rep["status"] != "ok":
+            return Response(str(rep), 400)
+
+        out, truncated = run_crossmatch(payload, request.files)
+
+        # Error propagation
+        if isinstance(out, Response):
+            return out
+
+        output_format = payload.get("output-format", "json")
+        return stream_tabular_data(
+            out, output_format, headers={"X-Fink-Truncated": str(truncated)}
+        )
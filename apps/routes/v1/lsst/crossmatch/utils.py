@@ -0,0 +1,38 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from apps.utils.engine import LSST, crossmatch
+from apps.utils.profiling import profile
+
+
+@profile
+def run_crossmatch(payload: dict, files) -> tuple:
+    """Crossmatch a user catalog with Fink/LSST alerts
+
+    Data is from /api/v1/crossmatch
+
+    Parameters
+    ----------
+    payload: dict
+        See https://api.lsst.fink-portal.org
+    files: dict
+        Uploaded files (`request.files`)
+
+    Return
+    ----------
+    out: pandas dataframe
+    truncated: bool
+        True if the row budget has been exhausted
+    """
+    return crossmatch(LSST, payload, files)
@@ -0,0 +1,65 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+
+from apps.routes.v1.tests import jobs as cases
+
+APIURL = sys.argv[1]
+
+OBJECTS = {"diaObjectId": "314003014107006318"}
+
+
+def test_objects_job() -> None:
+    """
+    Examples
+    --------
+    >>> test_objects_job()
+    """
+    cases.objects_job(APIURL, OBJECTS)
+
+
+def test_result_json() -> None:
+    """
+    Examples
+    --------
+    >>> test_result_json()
+    """
+    cases.result_json(APIURL, OBJECTS)
+
+
+def test_unknown_route() -> None:
+    """
+    Examples
+    --------
+    >>> test_unknown_route()
+    """
+    cases.unknown_route(APIURL)
+
+
+def test_unknown_job() -> None:
+    """
+    Examples
+    --------
+    >>> test_unknown_job()
+    """
+    cases.unknown_job(APIURL)
+
+
+if __name__ == "__main__":
+    """ Execute the test suite """
+    import doctest
+    import sys
+
+    sys.exit(doctest.testmod()[0])
@@ -0,0 +1,32 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from apps.routes.v1.lsst.objects.api import ARGS as ARGS_OBJECTS
+from apps.routes.v1.lsst.objects.utils import extract_object_data
+from apps.routes.v1.lsst.skymap.api import ARGS as ARGS_SKYMAP
+from apps.routes.v1.lsst.skymap.utils import search_in_skymap
+from apps.routes.v1.lsst.sso.api import ARGS as ARGS_SSO
+from apps.routes.v1.lsst.sso.utils import extract_sso_data
+
+# Routes that can run as jobs, and their arguments
+JOB_ROUTES = {
+    "objects": extract_object_data,
+    "skymap": search_in_skymap,
+    "sso": extract_sso_data,
+}
+JOB_ARGS = {
+    "objects": ARGS_OBJECTS,
+    "skymap": ARGS_SKYMAP,
+    "sso": ARGS_SSO,
+}
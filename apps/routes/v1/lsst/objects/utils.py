@@ -13,10 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import pandas as pd
-from line_profiler import profile
 
-from apps.utils.client import connect_to_hbase_table
-from apps.utils.decoding import format_lsst_hbase_output
+from apps.utils.engine import LSST, extract_objects
+from apps.utils.profiling import profile
 
 
 @profile
@@ -34,52 +33,4 @@ def extract_object_data(payload: dict) -> pd.DataFrame:
     ----------
     out: pandas dataframe
     """
-    if "columns" in payload:
-        cols = payload["columns"].replace(" ", "")
-    else:
-        cols = "*"
-
-    if "," in payload["diaObjectId"]:
-        # multi-objects search
-        splitids = payload["diaObjectId"].split(",")
-        splitids = [i.strip() for i in splitids]
-        # add salt
-        objectids = [f"key:key:{i[-3:]}_{i}" for i in splitids]
-    else:
-        # single object search
-        objectids = [
-            "key:key:{}_{}".format(payload["diaObjectId"][-3:], payload["diaObjectId"])
-        ]
-
-    if cols == "*":
-        truncated = False
-    else:
-        truncated = True
-
-    client = connect_to_hbase_table("rubin.diaObject")
-
-    # Get data from the main table
-    results = {}
-    for to_evaluate in objectids:
-        result = client.scan(
-            "",
-            to_evaluate,
-            cols,
-            0,
-            True,
-            True,
-        )
-        results.update(result)
-
-    schema_client = client.schema()
-
-    pdf = format_lsst_hbase_output(
-        results,
-        schema_client,
-        group_alerts=False,
-        truncated=truncated,
-    )
-
-    client.close()
-
-    return pdf
+    return extract_objects(LSST, payload)
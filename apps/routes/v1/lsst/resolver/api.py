@@ -42,6 +42,11 @@ ARGS = ns.model(
             example=False,
             required=False,
         ),
+        "bulk": fields.Boolean(
+            description="If True, `name_or_id` is a comma-separated list of names to resolve in one request (`simbad` only). A `query` column gives the name of each match. Default is False.",
+            example=False,
+            required=False,
+        ),
         "nmax": fields.Integer(
             description="Maximum number of match to return. Default is 10.",
             example=10,
@@ -15,11 +15,14 @@
 import io
 
 import pandas as pd
-import requests
-from line_profiler import profile
+from flask import Response
 
 from apps.utils.client import connect_to_hbase_table
 from apps.utils.decoding import hbase_to_dict
+from apps.utils.profiling import profile
+from apps.utils.resolver_index import resolver_index
+from apps.utils.sesame import format_resolutions, read_names, resolve_names
+from apps.utils.stages import upstream_request
 from apps.utils.utils import extract_configuration
 
 
@@ -52,18 +55,23 @@ def resolve_name(payload: dict) -> pd.DataFrame:
 
     if resolver == "tns":
         if name == "":
-            client = connect_to_hbase_table("rubin.tns_resolver")
-            client.setLimit(nmax)
-            # return the full table
-            results = client.scan(
-                "",
-                "",
-                "*",
-                0,
-                False,
-                False,
-            )
-            pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
+            # return the full table, from the in-memory index if available
+            results = resolver_index("rubin.tns_resolver").prefix("", int(nmax))
+            if results is None:
+                client = connect_to_hbase_table("rubin.tns_resolver")
+                client.setLimit(nmax)
+                results = hbase_to_dict(
+                    client.scan(
+                        "",
+                        "",
+                        "*",
+                        0,
+                        False,
+                        False,
+                    )
+                )
+                client.close()
+            pdf = pd.DataFrame.from_dict(results, orient="index")
         elif reverse:
             # Search main table
             client = connect_to_hbase_table("rubin.diaSource_static")
@@ -92,25 +100,30 @@ def resolve_name(payload: dict) -> pd.DataFrame:
         else:
             # indices are case-insensitive
             # salt is last letter of the name
-            client = connect_to_hbase_table("rubin.tns_resolver")
-            client.setLimit(nmax)
-            to_evaluate = f"key:key:{name.lower()[-1]}_{name.lower()}"
-            results = client.scan(
-                "",
-                to_evaluate,
-                "*",
-                0,
-                False,
-                False,
-            )
-            pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
-
-        # Restore default limits
-        client.close()
+            prefix = f"{name.lower()[-1]}_{name.lower()}"
+            index = resolver_index("rubin.tns_resolver")
+            results = index.prefix(prefix, int(nmax))
+            if results is None:
+                client = connect_to_hbase_table("rubin.tns_resolver")
+                client.setLimit(nmax)
+                results = hbase_to_dict(
+                    client.scan(
+                        "",
+                        f"key:key:{prefix}",
+                        "*",
+                        0,
+                        False,
+                        False,
+                    )
+                )
+                client.close()
+                if len(results) == 0:
+                    index.add_miss(prefix)
+            pdf = pd.DataFrame.from_dict(results, orient="index")
 
     elif resolver == "simbad":
-        client = connect_to_hbase_table("rubin.diaObject")
         if reverse:
+            client = connect_to_hbase_table("rubin.diaObject")
             to_evaluate = f"key:key:{name[-3:]}_{name}"
             client.setLimit(nmax)
             results = client.scan(
@@ -124,15 +137,15 @@ def resolve_name(payload: dict) -> pd.DataFrame:
             client.close()
             pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
         else:
-            r = requests.get(
-                f"http://cds.unistra.fr/cgi-bin/nph-sesame/-oxp/~S?{name}",
-            )
+            names = read_names(payload, "name_or_id")
+            if isinstance(names, Response):
+                return names
 
-            check = pd.read_xml(io.BytesIO(r.content))
-            if "Resolver" in check.columns:
-                pdf = pd.read_xml(io.BytesIO(r.content), xpath=".//Resolver")
-            else:
-                pdf = pd.DataFrame()
+            pdf = format_resolutions(
+                resolve_names(names), str(payload.get("bulk", False)) == "True"
+            )
+            if isinstance(pdf, Response):
+                return pdf
 
     elif resolver == "ssodnet":
         if reverse:
@@ -158,7 +171,8 @@ def resolve_name(payload: dict) -> pd.DataFrame:
 
             config = extract_configuration("config.yml")
 
-            r = requests.post(
+            r = upstream_request(
+                "post",
                 "{}/api/v1/sso".format(config["APIURL"]),
                 json={
                     "n_or_d": name,
@@ -12,15 +12,36 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import json
 import logging
+from functools import cache
+from types import MappingProxyType
 
-import requests
 from flask import Response
-from line_profiler import profile
+
+from apps.utils.profiling import profile
+from apps.utils.schemas import (
+    latest_lsst_version,
+    lsst_schema,
+    register_cache,
+    start_refresh,
+)
+from apps.utils.utils import json_body, send_json_body
 
 _LOG = logging.getLogger(__name__)
 
+ENDPOINTS = [
+    "/api/v1/sources",
+    "/api/v1/fp",
+    "/api/v1/objects",
+    "/api/v1/conesearch",
+    "/api/v1/cutouts",
+    "/api/v1/sso",
+    "/api/v1/tags",
+    "/api/v1/statistics",
+    "/datatransfer/fink",
+    "/datatransfer/lsst",
+]
+
 
 def sort_dict(adict):
     """ """
@@ -59,32 +80,26 @@ def reconstruct_lsst_schema(section, name):
     return section_reconstructed
 
 
-@profile
-def extract_schema(payload: dict) -> Response:
-    """Retrieve the data schema
+def build_types(endpoint: str, sections: dict):
+    """Build the schema of an endpoint
+
+    Parameters
+    ----------
+    endpoint: str
+        Endpoint name, e.g. /api/v1/sources
+    sections: dict
+        LSST schema sections, as returned by `lsst_schema`
+
+    Returns
+    -------
+    out: dict or None
+        Schema, or None if the endpoint is not known
 
     Notes
     -----
     All fields are initially defined in `fink_broker.rubin.hbase_utils`
-
     """
-    if ("major_version" not in payload) or ("minor_version" not in payload):
-        # Get latest version
-        r = requests.get(
-            "https://raw.githubusercontent.com/lsst/alert_packet/refs/heads/main/python/lsst/alert/packet/schema/latest.txt"
-        )
-        version = f"{r.json()}"
-        major_version, minor_version = [int(i) for i in version.split(".")]
-    else:
-        major_version = payload["major_version"]
-        minor_version = payload["minor_version"]
-
-    base_url = "https://raw.githubusercontent.com/lsst/alert_packet/refs/heads/main/python/lsst/alert/packet/schema"
-
-    r_root = requests.get(
-        f"{base_url}/{major_version}/{minor_version}/lsst.v{major_version}_{minor_version}.alert.avsc"
-    )
-    root_schema = r_root.json()
+    root_schema = sections["alert"]
 
     # root level should be everywhere
     root_rubin_names = ["observation_reason", "target_name", "diaSourceId"]
@@ -94,30 +109,11 @@ def extract_schema(payload: dict) -> Response:
     cutout_list = [i for i in root_schema["fields"] if i["name"] in cutout_rubin_names]
 
     # Other fields
-    r_diaSource = requests.get(
-        f"{base_url}/{major_version}/{minor_version}/lsst.v{major_version}_{minor_version}.diaSource.avsc"
-    )
-    diaSource_schema = r_diaSource.json()["fields"]
-
-    r_diaForcedSource = requests.get(
-        f"{base_url}/{major_version}/{minor_version}/lsst.v{major_version}_{minor_version}.diaForcedSource.avsc"
-    )
-    forcedDiaSource_schema = r_diaForcedSource.json()["fields"]
-
-    r_diaObject = requests.get(
-        f"{base_url}/{major_version}/{minor_version}/lsst.v{major_version}_{minor_version}.diaObject.avsc"
-    )
-    diaObject_schema = r_diaObject.json()["fields"]
-
-    r_ssSource = requests.get(
-        f"{base_url}/{major_version}/{minor_version}/lsst.v{major_version}_{minor_version}.ssSource.avsc"
-    )
-    ssSource_schema = r_ssSource.json()["fields"]
-
-    r_mpc_orbits = requests.get(
-        f"{base_url}/{major_version}/{minor_version}/lsst.v{major_version}_{minor_version}.mpc_orbits.avsc"
-    )
-    mpc_orbits_schema = r_mpc_orbits.json()["fields"]
+    diaSource_schema = sections["diaSource"]["fields"]
+    forcedDiaSource_schema = sections["diaForcedSource"]["fields"]
+    diaObject_schema = sections["diaObject"]["fields"]
+    ssSource_schema = sections["ssSource"]["fields"]
+    mpc_orbits_schema = sections["mpc_orbits"]["fields"]
 
     # Fink Science modules
     # Store this on disk as avsc - versioned.
@@ -550,7 +546,7 @@ def extract_schema(payload: dict) -> Response:
         },
     ]
 
-    if payload["endpoint"] == "/api/v1/sources":
+    if endpoint == "/api/v1/sources":
         # root, diaSOurce, fink
         types = {
             "LSST original fields (r:)": sort_dict(
@@ -571,7 +567,7 @@ def extract_schema(payload: dict) -> Response:
                 }
             ),
         }
-    elif payload["endpoint"] == "/api/v1/fp":
+    elif endpoint == "/api/v1/fp":
         # root, diaSOurce, fink
         types = {
             "LSST original fields (r:)": sort_dict(
@@ -581,7 +577,7 @@ def extract_schema(payload: dict) -> Response:
                 }
             ),
         }
-    elif payload["endpoint"] == "/api/v1/objects":
+    elif endpoint == "/api/v1/objects":
         # root, diaObject, fink
         types = {
             "LSST original fields (r:)": sort_dict(
@@ -602,7 +598,7 @@ def extract_schema(payload: dict) -> Response:
                 }
             ),
         }
-    elif payload["endpoint"] == "/api/v1/conesearch":
+    elif endpoint == "/api/v1/conesearch":
         types = {
             "LSST original fields (r:)": sort_dict(
                 {
@@ -622,7 +618,7 @@ def extract_schema(payload: dict) -> Response:
                 }
             ),
         }
-    elif payload["endpoint"] == "/api/v1/cutouts":
+    elif endpoint == "/api/v1/cutouts":
         types = {
             "LSST original cutouts (b:)": sort_dict(
                 {
@@ -631,7 +627,7 @@ def extract_schema(payload: dict) -> Response:
                 }
             ),
         }
-    elif payload["endpoint"] == "/api/v1/sso":
+    elif endpoint == "/api/v1/sso":
         # FIXME: where mpc_orbits goes???
         types = {
             "LSST original fields (r:)": sort_dict(
@@ -658,7 +654,7 @@ def extract_schema(payload: dict) -> Response:
                 }
             ),
         }
-    elif payload["endpoint"] == "/api/v1/tags":
+    elif endpoint == "/api/v1/tags":
         types = {
             "LSST original fields (r:)": sort_dict(
                 {
@@ -678,7 +674,7 @@ def extract_schema(payload: dict) -> Response:
                 }
             ),
         }
-    elif payload["endpoint"] == "/api/v1/statistics":
+    elif endpoint == "/api/v1/statistics":
         types = {
             "Fink science module outputs (f:)": sort_dict(
                 {
@@ -692,7 +688,7 @@ def extract_schema(payload: dict) -> Response:
                 }
             ),
         }
-    elif payload["endpoint"] == "/datatransfer/fink":
+    elif endpoint == "/datatransfer/fink":
         fink_source_science_reconstructed, fink_object_science_reconstructed = (
             reconstruct_fink_schema(fink_source_science, fink_object_science)
         )
@@ -710,7 +706,7 @@ def extract_schema(payload: dict) -> Response:
                 }
             ),
         }
-    elif payload["endpoint"] == "/datatransfer/lsst":
+    elif endpoint == "/datatransfer/lsst":
         all_fields = (
             root_list
             + reconstruct_lsst_schema(diaObject_schema, "diaObject.")
@@ -734,10 +730,54 @@ def extract_schema(payload: dict) -> Response:
         }
     else:
         # FIXME: /gw is missing...
+        return None
+
+    return types
+
+
+@register_cache
+@cache
+def schema_bodies(major_version: int, minor_version: int) -> MappingProxyType:
+    """Return the JSON body and ETag of each endpoint schema for a LSST version
+
+    Raises
+    ------
+    FileNotFoundError
+        If the version is not in the registry
+    """
+    sections = lsst_schema(major_version, minor_version)
+    bodies = {}
+    for endpoint in ENDPOINTS:
+        bodies[endpoint] = json_body(build_types(endpoint, sections))
+    return MappingProxyType(bodies)
+
+
+@profile
+def extract_schema(payload: dict) -> Response:
+    """Retrieve the data schema
+
+    Schemas are read from the local registry (see `apps.utils.schemas`),
+    and built once per version.
+    """
+    start_refresh()
+
+    if ("major_version" not in payload) or ("minor_version" not in payload):
+        # Get latest version
+        major_version, minor_version = latest_lsst_version()
+    else:
+        major_version = int(payload["major_version"])
+        minor_version = int(payload["minor_version"])
+
+    try:
+        bodies = schema_bodies(major_version, minor_version)
+    except FileNotFoundError:
+        msg = f"LSST schema version {major_version}.{minor_version} is not available"
+        _LOG.warning(msg)
+        return Response(msg, 404)
+
+    if payload["endpoint"] not in bodies:
         msg = "{} is not a valid endpoint".format(payload["endpoint"])
         _LOG.warning(msg)
         return Response(msg, 404)
 
-    response = Response(json.dumps(types), 200)
-    response.headers.set("Content-Type", "application/json")
-    return response
+    return send_json_body(*bodies[payload["endpoint"]])
@@ -13,16 +13,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import pandas as pd
-import requests
 from flask import Response
 
-from fink_utils.sso.miriade import get_miriade_data
 
 # from fink_utils.sso.spins import func_hg1g2_with_spin, estimate_sso_params
-from line_profiler import profile
 
 from apps.utils.client import connect_to_hbase_table
 from apps.utils.decoding import format_lsst_hbase_output
+from apps.utils.profiling import profile
+from apps.utils.stages import stage, upstream_request
 
 
 def resolve_packed(n_or_d):
@@ -30,8 +29,9 @@ def resolve_packed(n_or_d):
     n_or_d = str(n_or_d)
 
     # Pure quaero implementation
-    r = requests.get(
-        f"https://ssp.imcce.fr/webservices/ssodnet/api/resolver.php?-name=EQUAL:{n_or_d}&-mime=json&-from=FINK"
+    r = upstream_request(
+        "get",
+        f"https://ssp.imcce.fr/webservices/ssodnet/api/resolver.php?-name=EQUAL:{n_or_d}&-mime=json&-from=FINK",
     )
     if r.status_code == 200 and r.json() != []:
         sso_name = r.json()["data"][0]["name"]
@@ -170,7 +170,10 @@ def extract_sso_data(payload: dict) -> pd.DataFrame:
     )
 
     if with_ephem:
-        pdf = get_miriade_data(pdf, survey="lsst", observer="X05", shift=0.0)
+        from fink_utils.sso.miriade import get_miriade_data
+
+        with stage("upstream-http"):
+            pdf = get_miriade_data(pdf, survey="lsst", observer="X05", shift=0.0)
         if "i:magpsf_red" not in pdf.columns:
             rep = {
                 "status": "error",
@@ -21,12 +21,13 @@ import requests
 APIURL = sys.argv[1]
 
 
-def statstest(date="2025", columns="*", output_format="json"):
+def statstest(date="2025", columns="*", output_format="json", **kwargs):
     """Perform a stats search in the Science Portal using the Fink/LSST REST API"""
     payload = {
         "date": date,
         "columns": columns,
         "output-format": output_format,
+        **kwargs,
     }
 
     r = requests.post(f"{APIURL}/api/v1/statistics", json=payload)
@@ -86,6 +87,34 @@ def test_cols() -> None:
     assert len(pdf.columns) == 2, pdf.columns
 
 
+def test_aggregate() -> None:
+    """
+    Examples
+    --------
+    >>> test_aggregate()
+    """
+    pdf = statstest(columns="f:alerts")
+    total = statstest(columns="f:alerts", aggregate="sum")
+    cumulative = statstest(columns="f:alerts", aggregate="cumsum")
+
+    assert len(total) == 1, len(total)
+    assert total["f:alerts"].to_numpy()[0] == pdf["f:alerts"].astype(int).sum()
+
+    assert len(cumulative) == len(pdf), len(cumulative)
+    assert cumulative["f:alerts"].to_numpy()[-1] == total["f:alerts"].to_numpy()[0]
+
+
+def test_range() -> None:
+    """
+    Examples
+    --------
+    >>> test_range()
+    """
+    pdf = statstest(date="", startdate="20250101", stopdate="20251231")
+
+    assert len(pdf) == len(statstest(date="2025")), len(pdf)
+
+
 if __name__ == "__main__":
     """ Execute the test suite """
     import doctest
@@ -13,10 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import pandas as pd
-from line_profiler import profile
+from flask import Response
 
-from apps.utils.client import connect_to_hbase_table
-from apps.utils.decoding import hbase_to_dict
+from apps.utils.profiling import profile
+from apps.utils.statistics import read_nights, statistics_store
 
 
 @profile
@@ -34,34 +34,19 @@ def get_statistics(payload: dict) -> pd.DataFrame:
     ----------
     out: pandas dataframe
     """
-    if "columns" in payload:
-        cols = payload["columns"]
-    else:
-        cols = "*"
+    nights = read_nights(payload)
+    if isinstance(nights, Response):
+        return nights
 
-    if payload["date"] == "":
-        dates = "20"  # get all dates starting with 20XY
+    cols = payload.get("columns", "*")
+    if cols in ["*", ""]:
+        columns = None
     else:
-        dates = payload["date"]
-
-    if "f:night" in cols:
-        cols = cols.replace("f:night", "key")
-
-    client = connect_to_hbase_table("rubin.statistics")
+        columns = [col.replace("f:night", "key:key") for col in cols.split(",")]
 
-    to_evaluate = f"key:key:{dates}"
-    results = client.scan(
-        "",
-        to_evaluate,
-        cols,
-        0,
-        True,
-        True,
+    pdf = statistics_store("rubin.statistics", "").query(
+        *nights, columns=columns, aggregate=payload.get("aggregate") or None
     )
-    pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
-
-    # See https://github.com/astrolabsoftware/fink-science-portal/issues/579
-    pdf = pdf.replace(regex={r"^\x00.*$": 0})
 
     # Rename key:key in f:night
     pdf = pdf.rename(columns={"key:key": "f:night"})
@@ -69,6 +54,4 @@ def get_statistics(payload: dict) -> pd.DataFrame:
     if "key:time" in pdf.columns:
         pdf = pdf.drop(columns=["key:time"])
 
-    client.close()
-
     return pdf
@@ -0,0 +1,81 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+
+import requests
+
+APIURL = sys.argv[1]
+
+
+def open_stream(tag="in_tns"):
+    """Open a stream of new alerts for a tag"""
+    r = requests.get(
+        f"{APIURL}/api/v1/stream",
+        params={"tag": tag},
+        stream=True,
+        timeout=60,
+    )
+
+    assert r.status_code == 200, r.content
+
+    return r
+
+
+def test_stream_headers() -> None:
+    """
+    Examples
+    --------
+    >>> test_stream_headers()
+    """
+    r = open_stream()
+
+    assert r.headers["Content-Type"].startswith("text/event-stream"), r.headers
+
+    # the first event sets the reconnection delay
+    line = next(r.iter_lines(decode_unicode=True))
+    assert line.startswith("retry:"), line
+
+    r.close()
+
+
+def test_stream_description() -> None:
+    """
+    Examples
+    --------
+    >>> test_stream_description()
+    """
+    r = requests.get(f"{APIURL}/api/v1/stream")
+
+    assert r.status_code == 200, r.content
+    assert b"event" in r.content, r.content
+
+
+def test_stream_wrong_tag() -> None:
+    """
+    Examples
+    --------
+    >>> test_stream_wrong_tag()
+    """
+    r = requests.get(f"{APIURL}/api/v1/stream", params={"tag": "not_a_tag"})
+
+    assert r.status_code == 400, r.content
+
+
+if __name__ == "__main__":
+    """ Execute the test suite """
+    import doctest
+    import sys
+
+    sys.exit(doctest.testmod()[0])
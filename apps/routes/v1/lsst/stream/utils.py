@@ -0,0 +1,125 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from functools import partial
+
+import numpy as np
+from astropy.time import Time
+from flask import Response
+
+from apps.routes.v1.lsst.tags.utils import check_tag
+from apps.utils.client import connect_to_hbase_table
+from apps.utils.decoding import format_lsst_hbase_output
+from apps.utils.profiling import profile
+from apps.utils.stream import stream_topic, unseen_rows
+from apps.utils.utils import extract_configuration
+
+
+@profile
+def poll_tag(tag: str, seen: set, nmax: int, lookback: float):
+    """Return alerts of a tag not seen yet
+
+    Parameters
+    ----------
+    tag: str
+        Tag name, as given in /api/v1/tags
+    seen: set
+        Rowkeys seen by the previous polls. If None, start from now.
+    nmax: int
+        Maximum number of alerts to return. If more alerts
+        are available, only the most recent ones are returned.
+    lookback: float
+        Alerts observed up to `lookback` seconds ago are read again,
+        in case they were ingested late.
+
+    Returns
+    -------
+    rows: list of str
+        Alerts, as JSON records
+    seen: set
+        Rowkeys seen, including this poll
+    dropped: int
+        Number of new alerts not returned, beyond `nmax`
+    """
+    mjd_now = Time.now().mjd
+    lower = f"{mjd_now - lookback / 86400}"
+
+    client = connect_to_hbase_table(f"rubin.tag_{tag}")
+    if seen is None:
+        # All rows of the window, to be skipped
+        client.setLimit(np.iinfo(np.int32).max)
+    else:
+        client.setLimit(len(seen) + nmax + 1)
+    client.setRangeScan(True)
+    client.setReversed(True)
+
+    results = client.scan(
+        "",
+        f"key:key:{lower},key:key:{mjd_now}",
+        "*",
+        0,
+        False,
+        False,
+    )
+    if seen is None:
+        client.close()
+        return [], set(results), 0
+
+    seen, dropped = unseen_rows(results, seen, lower, nmax)
+    if len(results) == 0:
+        client.close()
+        return [], seen, dropped
+
+    schema_client = client.schema()
+    client.close()
+
+    pdf = format_lsst_hbase_output(
+        results,
+        schema_client,
+        group_alerts=False,
+        truncated=False,
+    )
+
+    return pdf.to_json(orient="records", lines=True).splitlines(), seen, dropped
+
+
+def stream_tag(payload: dict) -> Response:
+    """Stream new alerts of a tag
+
+    Data is from /api/v1/stream
+
+    Parameters
+    ----------
+    payload: dict
+        See https://api.lsst.fink-portal.org
+
+    Return
+    ----------
+    out: Response
+        text/event-stream Response
+    """
+    tag = payload["tag"]
+    rep = check_tag(tag)
+    if rep is not None:
+        return rep
+
+    config = extract_configuration("config.yml")
+    poll = partial(
+        poll_tag,
+        tag,
+        nmax=int(config["STREAM_BATCH"]),
+        lookback=float(config["STREAM_LOOKBACK"]),
+    )
+
+    return stream_topic(f"lsst/{tag}", poll, config)
@@ -12,11 +12,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from flask import Response, jsonify, request
+from flask import Response, request
 from flask_restx import Namespace, Resource, fields
 
-from apps.routes.v1.lsst.tags.utils import extract_object_data, extract_tags
-from apps.utils.utils import check_args, send_tabular_data
+from apps.routes.v1.lsst.tags.utils import extract_object_data, tag_catalog
+from apps.utils.cursor import add_cursor_header
+from apps.utils.utils import check_args, send_json_body, send_tabular_data
 
 ns = Namespace("api/v1/tags", "Get latest Rubin alerts by tags")
 
@@ -48,6 +49,11 @@ ARGS = ns.model(
             example="r:diaObjectId,r:scienceFlux,r:midpointMjdTai",
             required=False,
         ),
+        "cursor": fields.String(
+            description="Cursor returned in the `X-Fink-Cursor` header of the previous response, to get the next page. Other arguments must be unchanged.",
+            example="",
+            required=False,
+        ),
         "output-format": fields.String(
             description="Output format among json[default], csv, parquet, votable.",
             example="json",
@@ -67,12 +73,7 @@ class Tags(Resource):
             # POST from query URL
             return self.post()
         else:
-            tags, descriptions, hbase_supports = extract_tags()
-            out = {
-                k: {"description": v, "API support": h}
-                for k, v, h in zip(tags, descriptions, hbase_supports, strict=True)
-            }
-            return jsonify(out)
+            return send_json_body(*tag_catalog())
 
     @ns.expect(ARGS, location="json", as_dict=True)
     def post(self):
@@ -95,4 +96,4 @@ class Tags(Resource):
             return out
 
         output_format = payload.get("output-format", "json")
-        return send_tabular_data(out, output_format)
+        return add_cursor_header(send_tabular_data(out, output_format), out)
@@ -14,46 +14,105 @@
 # limitations under the License.
 import importlib
 import pkgutil
+from functools import cache
+from types import MappingProxyType
 
-import fink_filters.rubin.livestream as ffrl
 import pandas as pd
 from astropy.time import Time
 from flask import Response
-from line_profiler import profile
 
+from apps.utils.admission import admit, cap_rows, query_cost
 from apps.utils.client import connect_to_hbase_table
+from apps.utils.cursor import paginate, read_cursor
 from apps.utils.decoding import format_lsst_hbase_output
+from apps.utils.profiling import profile
+from apps.utils.utils import json_body
 
 
+@cache
 def extract_tags():
     """Extract user-defined tags
 
+    Filter modules are imported once per process.
+
     Returns
     -------
-    tags: list of str
+    tags: tuple of str
         List of tags
-    descriptions: list of str
+    descriptions: tuple of str
         Long descriptions for tags.
-    hbase_support: list of bool
+    hbase_support: tuple of bool
         Boolean for HBase support
     """
+    import fink_filters.rubin.livestream as ffrl
+
     # User-defined topics
     userfilters = [
         "{}.{}.filter.{}".format(ffrl.__package__, mod, mod.split("filter_")[1])
         for _, mod, _ in pkgutil.iter_modules(ffrl.__path__)
     ]
 
-    tags = [userfilter.split(".")[-1] for userfilter in userfilters]
+    tags = tuple(userfilter.split(".")[-1] for userfilter in userfilters)
     modules = [
         importlib.import_module(u.rsplit(".", maxsplit=1)[0]) for u in userfilters
     ]
 
-    descriptions = [m.DESCRIPTION for m in modules]
-    hbase_supports = [m.HBASE_SUPPORT for m in modules]
+    descriptions = tuple(m.DESCRIPTION for m in modules)
+    hbase_supports = tuple(m.HBASE_SUPPORT for m in modules)
 
     return tags, descriptions, hbase_supports
 
 
+@cache
+def tag_support() -> MappingProxyType:
+    """Return a read-only mapping between tags and their HBase support"""
+    tags, _, hbase_supports = extract_tags()
+    return MappingProxyType(dict(zip(tags, hbase_supports, strict=True)))
+
+
+@cache
+def tag_catalog() -> tuple:
+    """Return the JSON body and ETag of /api/v1/tags"""
+    tags, descriptions, hbase_supports = extract_tags()
+    out = {
+        k: {"description": v, "API support": h}
+        for k, v, h in zip(tags, descriptions, hbase_supports, strict=True)
+    }
+    return json_body(out)
+
+
+def check_tag(tag: str):
+    """Check that a tag exists and is available from HBase
+
+    Parameters
+    ----------
+    tag: str
+        Tag name
+
+    Returns
+    -------
+    out: Response or None
+        Response with the error, or None if the tag is valid
+    """
+    supports = tag_support()
+    if tag not in supports:
+        msg = f"""
+        {tag} is not a valid tag. Here is the list of tags:
+        {list(supports)}
+        And you can always retrieve available tags at https://api.lsst.fink-portal.org/api/v1/tags
+        """
+        return Response(msg, 400)
+
+    if not supports[tag]:
+        msg = f"""
+        {tag} is only available from the Livestream service (no API support defined).
+        And you can always retrieve available tags and their API support at https://api.lsst.fink-portal.org/api/v1/tags
+        """
+        return Response(msg, 400)
+
+    return None
+
+
 @profile
 def extract_object_data(payload: dict, return_raw: bool = False) -> pd.DataFrame:
     """Extract data returned by HBase and format it in a Pandas dataframe
@@ -76,24 +135,11 @@ def extract_object_data(payload: dict, return_raw: bool = False) -> pd.DataFrame
     tag = payload["tag"]
 
     # Check the tag exists
-    allowed_tags, _, hbase_supports = extract_tags()
-    if tag not in allowed_tags:
-        msg = f"""
-        {tag} is not a valid tag. Here is the list of tags:
-        {allowed_tags}
-        And you can always retrieve available tags at https://api.lsst.fink-portal.org/api/v1/tags
-        """
-        return Response(msg, 400)
-
-    has_hbase_support = hbase_supports[allowed_tags.index(tag)]
-    if not has_hbase_support:
-        msg = f"""
-        {tag} is only available from the Livestream service (no API support defined).
-        And you can always retrieve available tags and their API support at https://api.lsst.fink-portal.org/api/v1/tags
-        """
-        return Response(msg, 400)
+    rep = check_tag(tag)
+    if rep is not None:
+        return rep
 
-    nalerts = int(payload.get("n", 10))
+    nalerts = cap_rows(int(payload.get("n", 10)))
 
     if "startdate" not in payload:
         # start of the Fink operations
@@ -116,20 +162,38 @@ def extract_object_data(payload: dict, return_raw: bool = False) -> pd.DataFrame
     else:
         truncated = True
 
+    # The scan stops after n + 1 rows
+    rep = admit(
+        query_cost(nalerts + 1, 1),
+        "Reduce the number of alerts `n`, or the time range.",
+    )
+    if rep is not None:
+        return rep
+
+    # Resume from the previous page, if any
+    lower, upper = f"{jd_start}", f"{jd_stop}"
+    cursor_key = read_cursor(payload, reverse=True, lower=lower, upper=upper)
+    if isinstance(cursor_key, Response):
+        return cursor_key
+    if cursor_key is not None:
+        upper = cursor_key
+
     client = connect_to_hbase_table(f"rubin.tag_{tag}")
 
-    client.setLimit(nalerts)
+    # One more row is read to know if a next page exists
+    client.setLimit(nalerts + 1)
     client.setRangeScan(True)
     client.setReversed(True)
 
     results = client.scan(
         "",
-        f"key:key:{jd_start},key:key:{jd_stop}",
+        f"key:key:{lower},key:key:{upper}",
         cols,
         0,
         False,
         False,
     )
+    cursor = paginate(results, nalerts, reverse=True)
     schema_client = client.schema()
 
     client.close()
@@ -143,5 +207,6 @@ def extract_object_data(payload: dict, return_raw: bool = False) -> pd.DataFrame
         group_alerts=False,
         truncated=truncated,
     )
+    pdf.attrs["cursor"] = cursor
 
     return pdf
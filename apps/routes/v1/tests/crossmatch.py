@@ -0,0 +1,116 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test cases of /api/v1/crossmatch, shared by the surveys
+
+Each survey runs them from its `crossmatch/test.py`, around a position
+with alerts.
+"""
+
+import io
+
+import pandas as pd
+import requests
+
+
+def crossmatch(apiurl, catalog, catalog_format="csv", n=None, output_format="json"):
+    """Crossmatch a catalog in the Science Portal using the Fink REST API"""
+    payload = {"catalog-format": catalog_format, "output-format": output_format}
+    if n is not None:
+        payload.update({"n": n})
+
+    if catalog_format == "csv":
+        files = {"catalog": catalog.to_csv(index=False)}
+    else:
+        f = io.BytesIO()
+        catalog.to_parquet(f)
+        files = {"catalog": f.getvalue()}
+
+    r = requests.post(f"{apiurl}/api/v1/crossmatch", data=payload, files=files)
+
+    assert r.status_code == 200, r.content
+
+    if output_format == "json":
+        pdf = pd.read_json(io.BytesIO(r.content))
+    elif output_format == "csv":
+        pdf = pd.read_csv(io.BytesIO(r.content))
+    elif output_format == "parquet":
+        pdf = pd.read_parquet(io.BytesIO(r.content))
+
+    return pdf, r.headers["X-Fink-Truncated"]
+
+
+def crossmatch_vs_conesearch(apiurl, ra0, dec0, id_column) -> None:
+    """Sources get the same objects as a conesearch around them"""
+    catalog = pd.DataFrame(
+        {
+            "id": ["target", "empty"],
+            "ra": [ra0, 0.0],
+            "dec": [dec0, 0.0],
+            "radius": [5.0, 1.0],
+        }
+    )
+    pdf, truncated = crossmatch(apiurl, catalog)
+
+    assert truncated == "False", truncated
+
+    r = requests.post(
+        f"{apiurl}/api/v1/conesearch",
+        json={"ra": ra0, "dec": dec0, "radius": 5.0},
+    )
+    ref = pd.read_json(io.BytesIO(r.content))
+
+    # Same objects as for the conesearch, all attached to the first source
+    assert len(pdf) == len(ref), (len(pdf), len(ref))
+    assert set(pdf["v:id"]) == {"target"}, set(pdf["v:id"])
+    assert set(pdf[id_column]) == set(ref[id_column])
+    assert (pdf["v:separation_degree"] <= 5.0 / 3600).all()
+
+
+def formats(apiurl, ra0, dec0) -> None:
+    """Catalog and output formats give the same matches"""
+    catalog = pd.DataFrame({"id": [1], "ra": [ra0], "dec": [dec0], "radius": [5.0]})
+    pdf1, _ = crossmatch(apiurl, catalog)
+    pdf2, _ = crossmatch(
+        apiurl, catalog, catalog_format="parquet", output_format="parquet"
+    )
+    pdf3, _ = crossmatch(apiurl, catalog, output_format="csv")
+
+    assert len(pdf1) == len(pdf2) == len(pdf3), (len(pdf1), len(pdf2), len(pdf3))
+
+
+def form_without_file(apiurl, ra0, dec0) -> None:
+    """The catalog can be sent as a form field"""
+    r = requests.post(
+        f"{apiurl}/api/v1/crossmatch",
+        data={"catalog": f"id,ra,dec\n1,{ra0},{dec0}\n", "radius": 5.0},
+    )
+
+    assert r.status_code == 200, r.content
+
+
+def invalid_catalogs(apiurl) -> None:
+    """Malformed catalogs and budgets are rejected"""
+    for payload in [
+        {"catalog": "id,ra\n1,10.0\n"},
+        {"catalog": "id,ra,dec,radius\n"},
+        {"catalog": "id,ra,dec,radius\n1,10.0,0.0,-1.0\n"},
+        {"catalog": "id,ra,dec,radius\n1,10.0,0.0,\n"},
+        {"catalog": "id,ra,dec,radius\n1,10.0,0.0,5.0\n", "n": 0},
+        {"catalog": "b'\\x00", "catalog-format": "parquet"},
+        {"catalog": "'not bytes'", "catalog-format": "parquet"},
+    ]:
+        r = requests.post(f"{apiurl}/api/v1/crossmatch", json=payload)
+
+        assert r.status_code == 400, (payload, r.content)
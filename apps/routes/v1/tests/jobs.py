@@ -0,0 +1,88 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test cases of /api/v1/jobs, shared by the surveys
+
+Each survey runs them from its `jobs/test.py`, with its own object.
+"""
+
+import io
+import time
+
+import pandas as pd
+import requests
+
+
+def submit_and_wait(apiurl: str, payload: dict, timeout: float = 120) -> dict:
+    """Submit a job, and wait for its end"""
+    r = requests.post(f"{apiurl}/api/v1/jobs", json=payload)
+
+    assert r.status_code == 202, r.content
+
+    job_id = r.json()["id"]
+    start = time.time()
+    while time.time() - start < timeout:
+        r = requests.get(f"{apiurl}/api/v1/jobs", params={"id": job_id})
+        assert r.status_code == 200, r.content
+        if r.json()["status"] in ["done", "failed"]:
+            return r.json()
+        time.sleep(1)
+
+    raise AssertionError(f"Job {job_id} did not end within {timeout} seconds")
+
+
+def objects_job(apiurl: str, objects: dict) -> None:
+    """Run an objects job, and download its result as parquet"""
+    status = submit_and_wait(apiurl, {"route": "objects", **objects})
+
+    assert status["status"] == "done", status
+
+    r = requests.get(f"{apiurl}/api/v1/jobs/result", params={"id": status["id"]})
+
+    assert r.status_code == 200, r.content
+
+    pdf = pd.read_parquet(io.BytesIO(r.content))
+
+    assert not pdf.empty
+    assert len(pdf) == status["rows"], (len(pdf), status["rows"])
+
+
+def result_json(apiurl: str, objects: dict) -> None:
+    """Download the result of a job as JSON"""
+    status = submit_and_wait(apiurl, {"route": "objects", **objects})
+
+    r = requests.get(
+        f"{apiurl}/api/v1/jobs/result",
+        params={"id": status["id"], "output-format": "json"},
+    )
+
+    assert r.status_code == 200, r.content
+
+    pdf = pd.read_json(io.BytesIO(r.content))
+
+    assert len(pdf) == status["rows"], (len(pdf), status["rows"])
+
+
+def unknown_route(apiurl: str) -> None:
+    """Routes that cannot run as jobs are rejected"""
+    r = requests.post(f"{apiurl}/api/v1/jobs", json={"route": "conesearch"})
+
+    assert r.status_code == 400, r.content
+
+
+def unknown_job(apiurl: str) -> None:
+    """Unknown jobs are not found"""
+    r = requests.get(f"{apiurl}/api/v1/jobs", params={"id": "0123456789abcdef"})
+
+    assert r.status_code == 404, r.content
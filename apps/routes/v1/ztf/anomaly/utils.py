@@ -14,10 +14,13 @@
 # limitations under the License.
 import pandas as pd
 from astropy.time import Time
-from line_profiler import profile
+from flask import Response
 
+from apps.utils.admission import admit, cap_rows, query_cost
 from apps.utils.client import connect_to_hbase_table
+from apps.utils.cursor import paginate, read_cursor
 from apps.utils.decoding import format_hbase_output
+from apps.utils.profiling import profile
 
 
 @profile
@@ -38,7 +41,7 @@ def get_anomalous_alerts(payload: dict) -> pd.DataFrame:
     if "n" not in payload:
         nalerts = 10
     else:
-        nalerts = int(payload["n"])
+        nalerts = cap_rows(int(payload["n"]))
 
     if "start_date" not in payload:
         # start of the Fink operations
@@ -62,12 +65,29 @@ def get_anomalous_alerts(payload: dict) -> pd.DataFrame:
     else:
         truncated = True
 
+    # The scan stops after n + 1 rows
+    rep = admit(
+        query_cost(nalerts + 1, 1),
+        "Reduce the number of alerts `n`.",
+    )
+    if rep is not None:
+        return rep
+
+    # Resume from the previous page, if any
+    lower, upper = f"{jd_start}", f"{jd_stop}"
+    cursor_key = read_cursor(payload, reverse=True, lower=lower, upper=upper)
+    if isinstance(cursor_key, Response):
+        return cursor_key
+    if cursor_key is not None:
+        upper = cursor_key
+
+    # One more row is read to know if a next page exists
     client = connect_to_hbase_table("ztf.anomaly")
-    client.setLimit(nalerts)
+    client.setLimit(nalerts + 1)
     client.setRangeScan(True)
     client.setReversed(True)
 
-    to_evaluate = f"key:key:{jd_start},key:key:{jd_stop}"
+    to_evaluate = f"key:key:{lower},key:key:{upper}"
     results = client.scan(
         "",
         to_evaluate,
@@ -76,6 +96,7 @@ def get_anomalous_alerts(payload: dict) -> pd.DataFrame:
         True,
         True,
     )
+    cursor = paginate(results, nalerts, reverse=True)
     schema_client = client.schema()
     client.close()
 
@@ -89,5 +110,6 @@ def get_anomalous_alerts(payload: dict) -> pd.DataFrame:
         truncated=truncated,
         with_constellation=True,
     )
+    pdf.attrs["cursor"] = cursor
 
     return pdf
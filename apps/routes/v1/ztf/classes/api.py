@@ -12,11 +12,11 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import pandas as pd
-from fink_utils.xmatch.simbad import get_simbad_labels
-from flask import Response, json
 from flask_restx import Namespace, Resource
 
+from apps.routes.v1.ztf.classes.utils import class_catalog
+from apps.utils.utils import send_json_body
+
 ns = Namespace("api/v1/classes", "Get Fink derived class names, and their origin")
 
 
@@ -24,26 +24,4 @@ ns = Namespace("api/v1/classes", "Get Fink derived class names, and their origin
 class Classnames(Resource):
     def get(self):
         """Retrieve all Fink derived class names, and their origin"""
-        # TNS
-        tns_types = pd.read_csv("assets/tns_types.csv", header=None)[0].to_numpy()
-        tns_types = sorted(tns_types, key=lambda s: s.lower())
-        tns_types = ["(TNS) " + x for x in tns_types]
-
-        # SIMBAD
-        simbad_types = get_simbad_labels("old_and_new")
-        simbad_types = sorted(simbad_types, key=lambda s: s.lower())
-        simbad_types = ["(SIMBAD) " + x for x in simbad_types]
-
-        # Fink science modules
-        fink_types = pd.read_csv("assets/fink_types.csv", header=None)[0].to_numpy()
-        fink_types = sorted(fink_types, key=lambda s: s.lower())
-
-        types = {
-            "Fink classifiers": fink_types,
-            "Cross-match with TNS": tns_types,
-            "Cross-match with SIMBAD (see http://simbad.u-strasbg.fr/simbad/sim-display?data=otypes)": simbad_types,
-        }
-
-        response = Response(json.dumps(types), 200)
-        response.headers.set("Content-Type", "application/json")
-        return response
+        return send_json_body(*class_catalog())
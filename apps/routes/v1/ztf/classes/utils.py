@@ -0,0 +1,95 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Catalogs of class names, built once per process"""
+
+from functools import cache
+
+import pandas as pd
+from flask import Response
+
+from apps.utils.utils import json_body
+
+
+@cache
+def tns_classes() -> frozenset:
+    """Return the TNS class names"""
+    return frozenset(pd.read_csv("assets/tns_types.csv", header=None)[0])
+
+
+@cache
+def class_names() -> frozenset:
+    """Return the class names that can be searched
+
+    SIMBAD classes are accepted with or without their `(SIMBAD)` prefix.
+    """
+    from fink_utils.xmatch.simbad import get_simbad_labels
+
+    simbad_types = set(get_simbad_labels("old_and_new"))
+    fink_types = set(pd.read_csv("assets/fink_types.csv", header=None)[0])
+    return frozenset(
+        fink_types
+        | simbad_types
+        | {"(SIMBAD) " + x for x in simbad_types}
+        | {"(TNS) " + x for x in tns_classes()}
+    )
+
+
+def check_class(fink_class: str):
+    """Check that a class exists
+
+    Parameters
+    ----------
+    fink_class: str
+        Class name, as given in /api/v1/classes
+
+    Returns
+    -------
+    out: Response or None
+        Response with the error, or None if the class is valid
+    """
+    if fink_class not in class_names():
+        msg = f"""
+        {fink_class} is not a valid class.
+        You can retrieve available classes at https://api.ztf.fink-portal.org/api/v1/classes
+        """
+        return Response(msg, 400)
+    return None
+
+
+@cache
+def class_catalog() -> tuple:
+    """Return the JSON body and ETag of /api/v1/classes"""
+    from fink_utils.xmatch.simbad import get_simbad_labels
+
+    # TNS
+    tns_types = sorted(tns_classes(), key=lambda s: s.lower())
+    tns_types = ["(TNS) " + x for x in tns_types]
+
+    # SIMBAD
+    simbad_types = get_simbad_labels("old_and_new")
+    simbad_types = sorted(simbad_types, key=lambda s: s.lower())
+    simbad_types = ["(SIMBAD) " + x for x in simbad_types]
+
+    # Fink science modules
+    fink_types = pd.read_csv("assets/fink_types.csv", header=None)[0].to_numpy()
+    fink_types = sorted(fink_types, key=lambda s: s.lower())
+
+    types = {
+        "Fink classifiers": fink_types,
+        "Cross-match with TNS": tns_types,
+        "Cross-match with SIMBAD (see http://simbad.u-strasbg.fr/simbad/sim-display?data=otypes)": simbad_types,
+    }
+
+    return json_body(types)
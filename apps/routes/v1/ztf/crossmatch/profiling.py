@@ -0,0 +1,36 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Call run_crossmatch"""
+
+import numpy as np
+import pandas as pd
+
+from apps.routes.v1.ztf.crossmatch.utils import run_crossmatch
+
+# 1000 sources within a few degrees
+rng = np.random.default_rng(0)
+catalog = pd.DataFrame(
+    {
+        "id": np.arange(1000),
+        "ra": 193.8217 + rng.uniform(-2, 2, 1000),
+        "dec": 2.897 + rng.uniform(-2, 2, 1000),
+        "radius": 5.0,
+    }
+)
+
+payload = {"catalog": catalog.to_csv(index=False)}
+
+pdf, truncated = run_crossmatch(payload, {})
+print(f"{len(pdf)} matches (truncated: {truncated})")
@@ -0,0 +1,66 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sys
+
+from apps.routes.v1.tests import crossmatch as cases
+
+APIURL = sys.argv[1]
+
+RA0 = 193.8217
+DEC0 = 2.897
+
+
+def test_crossmatch_vs_conesearch() -> None:
+    """
+    Examples
+    --------
+    >>> test_crossmatch_vs_conesearch()
+    """
+    cases.crossmatch_vs_conesearch(APIURL, RA0, DEC0, "i:objectId")
+
+
+def test_formats() -> None:
+    """
+    Examples
+    --------
+    >>> test_formats()
+    """
+    cases.formats(APIURL, RA0, DEC0)
+
+
+def test_form_without_file() -> None:
+    """
+    Examples
+    --------
+    >>> test_form_without_file()
+    """
+    cases.form_without_file(APIURL, RA0, DEC0)
+
+
+def test_invalid_catalogs() -> None:
+    """
+    Examples
+    --------
+    >>> test_invalid_catalogs()
+    """
+    cases.invalid_catalogs(APIURL)
+
+
+if __name__ == "__main__":
+    """ Execute the test suite """
+    import doctest
+    import sys
+
+    sys.exit(doctest.testmod()[0])
@@ -16,6 +16,7 @@ from flask import Response, request
 from flask_restx import Namespace, Resource, fields
 
 from apps.routes.v1.ztf.latests.utils import extract_object_from_class
+from apps.utils.cursor import add_cursor_header
 from apps.utils.utils import check_args, send_tabular_data
 
 ns = Namespace("api/v1/latests", "Get object data based their class")
@@ -58,6 +59,11 @@ ARGS = ns.model(
             example="i:objectId,i:jd,i:magpsf,i:fid,d:mag_rate,d:blazar_stats_m0",
             required=False,
         ),
+        "cursor": fields.String(
+            description="Cursor returned in the `X-Fink-Cursor` header of the previous response, to get the next page. Other arguments must be unchanged.",
+            example="",
+            required=False,
+        ),
         "output-format": fields.String(
             description="Output format among json[default], csv, parquet, votable.",
             example="json",
@@ -100,4 +106,4 @@ class Latests(Resource):
             return out
 
         output_format = payload.get("output-format", "json")
-        return send_tabular_data(out, output_format)
+        return add_cursor_header(send_tabular_data(out, output_format), out)
@@ -15,10 +15,121 @@
 import pandas as pd
 from astropy.time import Time
 from flask import Response
-from line_profiler import profile
 
+from apps.routes.v1.ztf.classes.utils import tns_classes
+from apps.utils.admission import admit, cap_rows, query_cost
 from apps.utils.client import connect_to_hbase_table
+from apps.utils.cursor import paginate, read_cursor
 from apps.utils.decoding import format_hbase_output
+from apps.utils.profiling import profile
+from apps.utils.statistics import statistics_store
+
+
+def class_scan_bounds(fink_class: str, jd_start: float, jd_stop: float):
+    """Return the table and rowkey bounds to scan alerts of a class
+
+    Parameters
+    ----------
+    fink_class: str
+        Class name, as given in /api/v1/classes
+    jd_start: float
+        Lower time bound, in JD
+    jd_stop: float
+        Upper time bound, in JD
+
+    Returns
+    -------
+    tablename: str
+        Name of the HBase table
+    lower: str
+        Lower rowkey bound
+    upper: str
+        Upper rowkey bound
+    with_key: bool
+        True if the rowkey and time must be transferred
+    group_alerts: bool
+        True if alerts must be grouped when decoding
+    """
+    is_tns = fink_class.startswith("(TNS)") and (
+        fink_class.split("(TNS) ")[1] in tns_classes()
+    )
+    is_cta_blazar_low = fink_class == "(CTA) Blazar low state"
+    is_cta_blazar_high = fink_class == "(CTA) Blazar high state"
+    is_slsn = fink_class == "SLSN candidate"
+    if is_tns:
+        tablename = "ztf.tns"
+        classname = fink_class.split("(TNS) ")[1]
+        lower, upper = f"{classname}_{jd_start}", f"{classname}_{jd_stop}"
+        with_key = True
+        group_alerts = False
+    elif is_cta_blazar_low or is_cta_blazar_high:
+        # CTAO Blazars with low/high states
+        if is_cta_blazar_low:
+            tablename = "ztf.low_state_blazars"
+        elif is_cta_blazar_high:
+            tablename = "ztf.high_state_blazars"
+        lower, upper = f"{jd_start}_", f"{jd_stop}_"
+        with_key = False
+        group_alerts = True
+    elif is_slsn:
+        tablename = "ztf.slsn"
+        lower, upper = f"{jd_start}_", f"{jd_stop}_"
+        with_key = False
+        group_alerts = True
+    else:
+        if fink_class.startswith("(SIMBAD)"):
+            # SIMBAD crossmatch
+            classname = fink_class.split("(SIMBAD) ")[1]
+        else:
+            # Fink classification
+            classname = fink_class
+
+        tablename = "ztf.class"
+        lower, upper = f"{classname}_{jd_start}", f"{classname}_{jd_stop}"
+        with_key = False
+        group_alerts = False
+
+    return tablename, lower, upper, with_key, group_alerts
+
+
+def count_class_alerts(fink_class: str, jd_start: float, jd_stop: float):
+    """Return the number of alerts of a class within a time range
+
+    Counts are read from the statistics of the nights, cached by the API.
+    The count is skipped until the statistics are loaded, which is done
+    in the background on the first call.
+
+    Parameters
+    ----------
+    fink_class: str
+        Fink or SIMBAD class name, as given in /api/v1/classes
+    jd_start: float
+        Lower time bound, in JD
+    jd_stop: float
+        Upper time bound, in JD
+
+    Returns
+    -------
+    out: int or None
+        Number of alerts, or None if the class has no statistics or
+        if they are not loaded yet
+    """
+    if fink_class.startswith("(SIMBAD) "):
+        fink_class = fink_class.split("(SIMBAD) ")[1]
+    column = f"class:{fink_class}"
+
+    first_night, last_night = (
+        int(Time(jd, format="jd").strftime("%Y%m%d")) for jd in (jd_start, jd_stop)
+    )
+    store = statistics_store("statistics_class", "ztf_")
+    if not store.loaded:
+        store.warm()
+        return None
+
+    pdf = store.query(first_night, last_night, columns=[column], aggregate="sum")
+    if column not in pdf.columns:
+        return None
+    return int(pdf[column].iloc[0])
 
 
 @profile
@@ -63,7 +174,7 @@ def extract_object_from_class(payload: dict, return_raw: bool = False) -> pd.Dat
     if "n" not in payload:
         nalerts = 10
     else:
-        nalerts = int(payload["n"])
+        nalerts = cap_rows(int(payload["n"]))
 
     if "startdate" not in payload:
         # start of the Fink operations
@@ -92,92 +203,47 @@ def extract_object_from_class(payload: dict, return_raw: bool = False) -> pd.Dat
         truncated = True
 
     # Search for latest alerts for a specific class
-    tns_classes = pd.read_csv("assets/tns_types.csv", header=None)[0].to_numpy()
-    is_tns = payload["class"].startswith("(TNS)") and (
-        payload["class"].split("(TNS) ")[1] in tns_classes
+    tablename, lower, upper, with_key, group_alerts = class_scan_bounds(
+        payload["class"], jd_start, jd_stop
     )
-    is_cta_blazar_low = payload["class"] == "(CTA) Blazar low state"
-    is_cta_blazar_high = payload["class"] == "(CTA) Blazar high state"
-    is_slsn = payload["class"] == "SLSN candidate"
-    if is_tns:
-        client = connect_to_hbase_table("ztf.tns")
-        classname = payload["class"].split("(TNS) ")[1]
-        client.setLimit(nalerts)
-        client.setRangeScan(True)
-        client.setReversed(True)
-
-        results = client.scan(
-            "",
-            f"key:key:{classname}_{jd_start},key:key:{classname}_{jd_stop}",
-            cols,
-            0,
-            True,
-            True,
-        )
-        schema_client = client.schema()
-        group_alerts = False
-    elif is_cta_blazar_low or is_cta_blazar_high:
-        # CTAO Blazars with low/high states
-        if is_cta_blazar_low:
-            client = connect_to_hbase_table("ztf.low_state_blazars")
-        elif is_cta_blazar_high:
-            client = connect_to_hbase_table("ztf.high_state_blazars")
-
-        client.setLimit(nalerts)
-        client.setRangeScan(True)
-        client.setReversed(True)
-
-        results = client.scan(
-            "",
-            f"key:key:{jd_start}_,key:key:{jd_stop}_",
-            cols,
-            0,
-            False,
-            False,
-        )
-        schema_client = client.schema()
-        group_alerts = True
-    elif is_slsn:
-        client = connect_to_hbase_table("ztf.slsn")
-
-        client.setLimit(nalerts)
-        client.setRangeScan(True)
-        client.setReversed(True)
-
-        results = client.scan(
-            "",
-            f"key:key:{jd_start}_,key:key:{jd_stop}_",
-            cols,
-            0,
-            False,
-            False,
-        )
-        schema_client = client.schema()
-        group_alerts = True
-    else:
-        if payload["class"].startswith("(SIMBAD)"):
-            # SIMBAD crossmatch
-            classname = payload["class"].split("(SIMBAD) ")[1]
-        else:
-            # Fink classification
-            classname = payload["class"]
-
-        client = connect_to_hbase_table("ztf.class")
-
-        client.setLimit(nalerts)
-        client.setRangeScan(True)
-        client.setReversed(True)
-
-        results = client.scan(
-            "",
-            f"key:key:{classname}_{jd_start},key:key:{classname}_{jd_stop}",
-            cols,
-            0,
-            False,
-            False,
-        )
-        schema_client = client.schema()
-        group_alerts = False
+
+    # The scan stops after n + 1 rows, or at the last alert of the class
+    rows = nalerts + 1
+    if tablename == "ztf.class":
+        count = count_class_alerts(payload["class"], jd_start, jd_stop)
+        if count is not None:
+            rows = min(rows, count)
+    rep = admit(
+        query_cost(rows, 1),
+        "Reduce the number of alerts `n`, or the time range.",
+    )
+    if rep is not None:
+        return rep
+
+    # Resume from the previous page, if any
+    cursor_key = read_cursor(payload, reverse=True, lower=lower, upper=upper)
+    if isinstance(cursor_key, Response):
+        return cursor_key
+    if cursor_key is not None:
+        upper = cursor_key
+
+    client = connect_to_hbase_table(tablename)
+
+    # One more row is read to know if a next page exists
+    client.setLimit(nalerts + 1)
+    client.setRangeScan(True)
+    client.setReversed(True)
+
+    results = client.scan(
+        "",
+        f"key:key:{lower},key:key:{upper}",
+        cols,
+        0,
+        with_key,
+        with_key,
+    )
+    cursor = paginate(results, nalerts, reverse=True)
+    schema_client = client.schema()
 
     client.close()
 
@@ -194,6 +260,7 @@ def extract_object_from_class(payload: dict, return_raw: bool = False) -> pd.Dat
         truncated=truncated,
         with_constellation=True,
     )
+    pdf.attrs["cursor"] = cursor
 
     if len(pdf) > 0:
         # Search for trend
@@ -12,30 +12,210 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import fcntl
+import logging
+import os
+import threading
+import time
+from functools import cache
+
 import pandas as pd
 from flask import Response
-from line_profiler import profile
 
 from apps.utils.client import connect_to_hbase_table
 from apps.utils.decoding import hbase_to_dict
+from apps.utils.profiling import profile
 from apps.utils.utils import extract_configuration
 
+_LOG = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ["internal_name", "internal_name_encoded"]
+
+
+class MetadataStore:
+    """In-memory mirror of ztf.metadata, with write-through puts
+
+    The whole table is kept in memory, with reverse indexes on
+    `INDEXED_FIELDS`. Each put is sent to HBase at once, then applied to
+    the mirror, and the objectId is appended to the `journal` file shared
+    by all workers. On their next request, other workers fetch the rows
+    listed in the journal since their last read, instead of reading the
+    whole table again.
+
+    The journal is emptied once it exceeds `max_bytes`, by replacing the
+    file. Workers then read the whole table again, once.
+
+    Parameters
+    ----------
+    journal: str
+        File shared by all workers, listing the objectIds written
+    refresh_interval: float
+        Maximum age of the full copy of the table, in second
+    max_bytes: int
+        Size of the journal above which it is emptied
+    """
+
+    def __init__(self, journal: str, refresh_interval: float, max_bytes: int):
+        self.journal = journal
+        self.refresh_interval = refresh_interval
+        self.max_bytes = max_bytes
+
+        self.lock = threading.RLock()
+        self.rows = {}
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
+        self.loaded = -float("inf")
+        # Journal file (inode), and position of the last write loaded
+        self.inode = None
+        self.offset = 0
+
+        os.makedirs(os.path.dirname(journal) or ".", exist_ok=True)
+        open(journal, "a").close()
+
+    def _apply(self, objectId: str, columns: dict):
+        """Update a row of the mirror and the reverse indexes"""
+        row = self.rows.setdefault(objectId, {"key:key": objectId})
+        for field in INDEXED_FIELDS:
+            previous = row.get(f"d:{field}")
+            if previous is not None:
+                self.indexes[field].get(previous, set()).discard(objectId)
+        row.update(columns)
+        for field in INDEXED_FIELDS:
+            if row.get(f"d:{field}") is not None:
+                self.indexes[field].setdefault(row[f"d:{field}"], set()).add(objectId)
+
+    def _scan(self, prefix: str) -> dict:
+        client = connect_to_hbase_table("ztf.metadata")
+        results = client.scan(
+            "",
+            f"key:key:{prefix}",
+            "*",
+            0,
+            True,
+            True,
+        )
+        client.close()
+        return hbase_to_dict(results)
+
+    @profile
+    def _load(self):
+        """Read the whole table if the mirror is too old, or the new writes"""
+        now = time.time()
+        with self.lock, open(self.journal, "a+b") as f:
+            stat = os.fstat(f.fileno())
+            if (
+                now - self.loaded >= self.refresh_interval
+                or stat.st_ino != self.inode
+                or stat.st_size < self.offset
+            ):
+                # Writes logged after `st_size` are read on the next request
+                self.rows = {}
+                self.indexes = {field: {} for field in INDEXED_FIELDS}
+                for objectId, row in self._scan("ZTF").items():
+                    self._apply(objectId, row)
+                self.loaded = now
+                self.inode = stat.st_ino
+                self.offset = stat.st_size
+                return
+
+            if stat.st_size == self.offset:
+                return
+
+            f.seek(self.offset)
+            content = f.read(stat.st_size - self.offset)
+            # Only complete lines, a write may be in progress
+            content = content[: content.rfind(b"\n") + 1]
+            for objectId in dict.fromkeys(content.decode().split()):
+                for key, row in self._scan(objectId).items():
+                    if key == objectId:
+                        self._apply(objectId, row)
+            self.offset += len(content)
+
+    def put(self, objectId: str, columns: dict):
+        """Write a row to HBase, then to the mirror
+
+        Raises
+        ------
+        Exception
+            If the put fails. The mirror is then left unchanged.
+        """
+        client = connect_to_hbase_table("ztf.metadata")
+        client.put(objectId, [f"{col}:{value}" for col, value in columns.items()])
+        client.close()
+
+        with self.lock:
+            self._apply(objectId, columns)
+
+        # Tell other workers to fetch this row. The journal is not
+        # replaced while it is written.
+        with open(f"{self.journal}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH)
+            with open(self.journal, "a") as f:
+                f.write(f"{objectId}\n")
+                size = f.tell()
+        if size > self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """Empty the journal, unless another worker did it"""
+        with open(f"{self.journal}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if os.stat(self.journal).st_size <= self.max_bytes:
+                return
+            # A new file, such that readers notice it by its inode
+            open(f"{self.journal}.tmp", "w").close()
+            os.replace(f"{self.journal}.tmp", self.journal)
+
+    def _to_pandas(self, objectIds) -> pd.DataFrame:
+        rows = {objectId: self.rows[objectId] for objectId in sorted(objectIds)}
+        if len(rows) == 0:
+            return pd.DataFrame()
+        pdf = pd.DataFrame.from_dict(rows, orient="index")
+        pdf = pdf.rename(columns={"key:key": "i:objectId"})
+        return pdf.drop(columns=["key:time"], errors="ignore")
+
+    @profile
+    def get(self, objectId: str) -> pd.DataFrame:
+        """Rows whose objectId starts with `objectId`, or all rows"""
+        self._load()
+        with self.lock:
+            if objectId == "all":
+                objectIds = list(self.rows)
+            elif objectId.startswith("ZTF"):
+                objectIds = [oid for oid in self.rows if oid.startswith(objectId)]
+            else:
+                objectIds = []
+            return self._to_pandas(objectIds)
+
+    @profile
+    def find(self, metaname: str, field: str) -> pd.DataFrame:
+        """Rows whose `field` is exactly `metaname`"""
+        self._load()
+        with self.lock:
+            return self._to_pandas(self.indexes[field].get(metaname, set()))
+
+
+@cache
+def metadata_store() -> MetadataStore:
+    """Return the metadata store of this worker"""
+    config = extract_configuration("config.yml")["METADATA_CACHE"]
+    return MetadataStore(
+        config["journal"], float(config["refresh"]), int(config["max_bytes"])
+    )
+
 
 @profile
 def post_metadata(payload: dict) -> Response:
     """Upload metadata in Fink"""
-    client = connect_to_hbase_table("ztf.metadata")
     encoded = payload["internal_name"].replace(" ", "")
-    client.put(
+    metadata_store().put(
         payload["objectId"].strip(),
-        [
-            "d:internal_name:{}".format(payload["internal_name"]),
-            f"d:internal_name_encoded:{encoded}",
-            "d:comments:{}".format(payload["comments"]),
-            "d:username:{}".format(payload["username"]),
-        ],
+        {
+            "d:internal_name": payload["internal_name"],
+            "d:internal_name_encoded": encoded,
+            "d:comments": payload["comments"],
+            "d:username": payload["username"],
+        },
     )
-    client.close()
 
     config = extract_configuration("config.yml")
 
@@ -52,53 +232,10 @@ def post_metadata(payload: dict) -> Response:
 @profile
 def retrieve_metadata(objectId: str) -> pd.DataFrame:
     """Retrieve metadata in Fink given a ZTF object ID"""
-    client = connect_to_hbase_table("ztf.metadata")
-    if objectId.startswith("ZTF"):
-        to_evaluate = f"key:key:{objectId}"
-    elif objectId == "all":
-        to_evaluate = "key:key:ZTF"
-    results = client.scan(
-        "",
-        to_evaluate,
-        "*",
-        0,
-        True,
-        True,
-    )
-
-    if len(results) == 0:
-        pdf = pd.DataFrame()
-    else:
-        pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
-        pdf = pdf.rename(columns={"key:key": "i:objectId"})
-        pdf = pdf.drop(columns=["key:time"])
-
-    client.close()
-
-    return pdf
+    return metadata_store().get(objectId)
 
 
 @profile
 def retrieve_oid(metaname: str, field: str) -> pd.DataFrame:
     """Retrieve a ZTF object ID given metadata in Fink"""
-    client = connect_to_hbase_table("ztf.metadata")
-    to_evaluate = f"d:{field}:{metaname}:exact"
-    results = client.scan(
-        "",
-        to_evaluate,
-        "*",
-        0,
-        True,
-        True,
-    )
-
-    if len(results) == 0:
-        pdf = pd.DataFrame()
-    else:
-        pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
-        pdf = pdf.rename(columns={"key:key": "i:objectId"})
-        pdf = pdf.drop(columns=["key:time"])
-
-    client.close()
-
-    return pdf
+    return metadata_store().find(metaname, field)
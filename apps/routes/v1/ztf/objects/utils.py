@@ -13,11 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import pandas as pd
-from line_profiler import profile
+from flask import Response
 from numpy import array as nparray
 
 from apps.utils.client import connect_to_hbase_table
-from apps.utils.decoding import format_hbase_output, hbase_to_dict
+from apps.utils.decoding import hbase_to_dict
+from apps.utils.engine import ZTF, extract_objects, parse_ids
+from apps.utils.profiling import profile
 from apps.utils.utils import download_cutout
 
 
@@ -36,19 +38,6 @@ def extract_object_data(payload: dict) -> pd.DataFrame:
     ----------
     out: pandas dataframe
     """
-    if "columns" in payload:
-        cols = payload["columns"].replace(" ", "")
-    else:
-        cols = "*"
-
-    if "," in payload["objectId"]:
-        # multi-objects search
-        splitids = payload["objectId"].split(",")
-        objectids = [f"key:key:{i.strip()}" for i in splitids]
-    else:
-        # single object search
-        objectids = ["key:key:{}".format(payload["objectId"])]
-
     if "withcutouts" in payload and str(payload["withcutouts"]) == "True":
         withcutouts = True
     else:
@@ -59,34 +48,10 @@ def extract_object_data(payload: dict) -> pd.DataFrame:
     else:
         withupperlim = False
 
-    if cols == "*":
-        truncated = False
-    else:
-        truncated = True
-
-    client = connect_to_hbase_table("ztf")
-
-    # Get data from the main table
-    results = {}
-    for to_evaluate in objectids:
-        result = client.scan(
-            "",
-            to_evaluate,
-            cols,
-            0,
-            True,
-            True,
-        )
-        results.update(result)
-
-    schema_client = client.schema()
-
-    pdf = format_hbase_output(
-        results,
-        schema_client,
-        group_alerts=False,
-        truncated=truncated,
-    )
+    # One scan per object, and per table of upper limits
+    pdf = extract_objects(ZTF, payload, scans_per_object=3 if withupperlim else 1)
+    if isinstance(pdf, Response):
+        return pdf
 
     if withcutouts:
         # Default `None` returns all 3 cutouts
@@ -112,6 +77,7 @@ def extract_object_data(payload: dict) -> pd.DataFrame:
             )
 
     if withupperlim:
+        objectids = [f"key:key:{ZTF.rowkey(i)}" for i in parse_ids(payload["objectId"])]
         clientU = connect_to_hbase_table("ztf.upper")
         # upper limits
         resultsU = {}
@@ -173,6 +139,4 @@ def extract_object_data(payload: dict) -> pd.DataFrame:
         clientU.close()
         clientUV.close()
 
-    client.close()
-
     return pdf
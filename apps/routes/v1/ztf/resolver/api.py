@@ -38,6 +38,11 @@ ARGS = ns.model(
             example=False,
             required=False,
         ),
+        "bulk": fields.Boolean(
+            description="If True, `name` is a comma-separated list of names to resolve in one request (`simbad` only). A `query` column gives the name of each match. Default is False.",
+            example=False,
+            required=False,
+        ),
         "nmax": fields.Integer(
             description="Maximum number of match to return. Default is 10.",
             example=10,
@@ -12,15 +12,61 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import io
-
 import pandas as pd
-import requests
-from line_profiler import profile
+from flask import Response
 from numpy import unique as npunique
 
 from apps.utils.client import connect_to_hbase_table
 from apps.utils.decoding import hbase_to_dict
+from apps.utils.profiling import profile
+from apps.utils.resolver_index import resolver_index
+from apps.utils.sesame import format_resolutions, read_names, resolve_names
+
+
+@profile
+def scan_tns_resolver(name: str, nmax: int, reverse: bool):
+    """Search the TNS resolver table in HBase
+
+    Parameters
+    ----------
+    name: str
+        TNS name (prefix), internal name if `reverse`,
+        or empty string for the full table
+    nmax: int
+        Maximum number of rows
+    reverse: bool
+        If True, search internal names
+
+    Returns
+    -------
+    out: java.util.TreeMap
+        HBase rows, keyed by rowkey
+    """
+    client = connect_to_hbase_table("ztf.tns_resolver")
+    client.setLimit(nmax)
+    if name == "":
+        # return the full table
+        to_evaluate = ""
+    elif reverse:
+        # Prefix search on second part of the key which is `fullname_internalname`
+        to_evaluate = f"key:key:_{name}:substring"
+    else:
+        # indices are case-insensitive
+        to_evaluate = f"key:key:{name.lower()}"
+
+    results = client.scan(
+        "",
+        to_evaluate,
+        "*",
+        0,
+        False,
+        False,
+    )
+
+    # Restore default limits
+    client.close()
+
+    return results
 
 
 @profile
@@ -51,48 +97,27 @@ def resolve_name(payload: dict) -> pd.DataFrame:
             reverse = True
 
     if resolver == "tns":
-        client = connect_to_hbase_table("ztf.tns_resolver")
-        client.setLimit(nmax)
+        # Served from the in-memory index, with HBase as a fallback
+        index = resolver_index("ztf.tns_resolver")
         if name == "":
-            # return the full table
-            results = client.scan(
-                "",
-                "",
-                "*",
-                0,
-                False,
-                False,
-            )
+            results = index.prefix("", int(nmax))
         elif reverse:
-            # Prefix search on second part of the key which is `fullname_internalname`
-            to_evaluate = f"key:key:_{name}:substring"
-            results = client.scan(
-                "",
-                to_evaluate,
-                "*",
-                0,
-                False,
-                False,
-            )
+            results = index.substring(f"_{name}", int(nmax))
         else:
-            # indices are case-insensitive
-            to_evaluate = f"key:key:{name.lower()}"
-            results = client.scan(
-                "",
-                to_evaluate,
-                "*",
-                0,
-                False,
-                False,
-            )
+            results = index.prefix(name.lower(), int(nmax))
 
-        # Restore default limits
-        client.close()
+        if results is None:
+            results = hbase_to_dict(scan_tns_resolver(name, nmax, reverse))
+            if len(results) == 0:
+                if reverse:
+                    index.add_miss(f"_{name}", substring=True)
+                else:
+                    index.add_miss(name.lower())
 
-        pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
+        pdf = pd.DataFrame.from_dict(results, orient="index")
     elif resolver == "simbad":
-        client = connect_to_hbase_table("ztf")
         if reverse:
+            client = connect_to_hbase_table("ztf")
             to_evaluate = f"key:key:{name}"
             client.setLimit(nmax)
             results = client.scan(
@@ -106,15 +131,15 @@ def resolve_name(payload: dict) -> pd.DataFrame:
             client.close()
             pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
         else:
-            r = requests.get(
-                f"http://cds.unistra.fr/cgi-bin/nph-sesame/-oxp/~S?{name}",
-            )
+            names = read_names(payload, "name")
+            if isinstance(names, Response):
+                return names
 
-            check = pd.read_xml(io.BytesIO(r.content))
-            if "Resolver" in check.columns:
-                pdf = pd.read_xml(io.BytesIO(r.content), xpath=".//Resolver")
-            else:
-                pdf = pd.DataFrame()
+            pdf = format_resolutions(
+                resolve_names(names), str(payload.get("bulk", False)) == "True"
+            )
+            if isinstance(pdf, Response):
+                return pdf
     elif resolver == "ssodnet":
         if reverse:
             # ZTF alerts -> ssnmanenr
@@ -152,25 +177,34 @@ def resolve_name(payload: dict) -> pd.DataFrame:
         else:
             # MPC -> ssnamenr
             # keys follow the pattern <name>-<deduplication>
-            client = connect_to_hbase_table("ztf.sso_resolver")
-
             if nmax == 1:
-                # Prefix with internal marker
-                to_evaluate = f"key:key:{name.lower()}@"
+                # Prefix with internal marker, and all deduplicated entries
+                prefix = f"{name.lower()}@"
+                limit = None
             elif nmax > 1:
                 # This enables e.g. autocompletion tasks
-                client.setLimit(nmax)
-                to_evaluate = f"key:key:{name.lower()}"
+                prefix = name.lower()
+                limit = int(nmax)
 
-            results = client.scan(
-                "",
-                to_evaluate,
-                "i:ssnamenr,i:name,i:number",
-                0,
-                False,
-                False,
-            )
-            client.close()
-            pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
+            index = resolver_index("ztf.sso_resolver", "i:ssnamenr,i:name,i:number")
+            results = index.prefix(prefix, limit)
+            if results is None:
+                client = connect_to_hbase_table("ztf.sso_resolver")
+                if limit is not None:
+                    client.setLimit(limit)
+                results = hbase_to_dict(
+                    client.scan(
+                        "",
+                        f"key:key:{prefix}",
+                        "i:ssnamenr,i:name,i:number",
+                        0,
+                        False,
+                        False,
+                    )
+                )
+                client.close()
+                if len(results) == 0:
+                    index.add_miss(prefix)
+            pdf = pd.DataFrame.from_dict(results, orient="index")
 
     return pdf
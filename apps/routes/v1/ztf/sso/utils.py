@@ -14,14 +14,12 @@
 # limitations under the License.
 import numpy as np
 import pandas as pd
-import requests
-from fink_utils.sso.miriade import get_miriade_data
-from fink_utils.sso.spins import estimate_sso_params, func_shg1g2
 from flask import Response
-from line_profiler import profile
 
 from apps.utils.client import connect_to_hbase_table
 from apps.utils.decoding import format_hbase_output
+from apps.utils.profiling import profile
+from apps.utils.stages import stage, upstream_request
 from apps.utils.utils import (
     download_cutout,
     resolve_sso_name,
@@ -110,8 +108,9 @@ def extract_sso_data(payload: dict) -> pd.DataFrame:
         if id_.startswith("C/"):
             start = id_[0:6]
             stop = id_[6:]
-            r = requests.get(
-                f"https://api.ssodnet.imcce.fr/quaero/1/sso?q={start} {stop}&type=Comet"
+            r = upstream_request(
+                "get",
+                f"https://api.ssodnet.imcce.fr/quaero/1/sso?q={start} {stop}&type=Comet",
             )
             if r.status_code == 200 and r.json() != []:
                 sso_name = r.json()["data"][0]["name"]
@@ -202,7 +201,10 @@ def extract_sso_data(payload: dict) -> pd.DataFrame:
         #       the mandatory fields have been requested
         # TODO: We should probably add a timeout and try/except
         #       in case of miriade shutdown
-        pdf = get_miriade_data(pdf, survey="ztf", observer="I41", shift=15.0)
+        from fink_utils.sso.miriade import get_miriade_data
+
+        with stage("upstream-http"):
+            pdf = get_miriade_data(pdf, survey="ztf", observer="I41", shift=15.0)
         if "i:magpsf_red" not in pdf.columns:
             rep = {
                 "status": "error",
@@ -213,6 +215,7 @@ def extract_sso_data(payload: dict) -> pd.DataFrame:
     if with_residuals:
         # TODO: In case truncated is True, check (before DB call)
         #       the mandatory fields have been requested
+        from fink_utils.sso.spins import estimate_sso_params, func_shg1g2
 
         # Get phase curve parameters using the sHG1G2 model
         phase = np.deg2rad(pdf["Phase"].values)
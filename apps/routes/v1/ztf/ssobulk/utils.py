@@ -15,10 +15,11 @@
 import io
 
 import pandas as pd
-import requests
 import yaml
 from flask import Response
-from line_profiler import profile
+
+from apps.utils.profiling import profile
+from apps.utils.stages import upstream_request
 
 
 @profile
@@ -39,7 +40,8 @@ def get_lc(payload: dict) -> pd.DataFrame:
     # Need to profile compared to pyarrow
     with open("config.yml") as f:
         input_args = yaml.load(f, yaml.Loader)
-    r = requests.get(
+    r = upstream_request(
+        "get",
         "{}/sso_ztf_lc_aggregated_with_ssoft_202601_with_residuals_singlefile.parquet?op=OPEN&user.name={}&namenoderpcaddress={}".format(
             input_args["WEBHDFS"],
             input_args["USER"],
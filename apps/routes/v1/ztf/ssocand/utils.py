@@ -14,10 +14,10 @@
 # limitations under the License.
 import pandas as pd
 from astropy.time import Time
-from line_profiler import profile
 
 from apps.utils.client import connect_to_hbase_table
 from apps.utils.decoding import convert_datatype, hbase_to_dict, hbase_type_converter
+from apps.utils.profiling import profile
 
 
 @profile
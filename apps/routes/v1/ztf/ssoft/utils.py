@@ -17,17 +17,11 @@ import io
 import json
 
 import pandas as pd
-import requests
 import yaml
-from fink_utils.sso.ssoft import (
-    COLUMNS,
-    COLUMNS_HG,
-    COLUMNS_HG1G2,
-    COLUMNS_SHG1G2,
-    COLUMNS_SOCCA,
-)
 from flask import Response
-from line_profiler import profile
+
+from apps.utils.profiling import profile
+from apps.utils.stages import upstream_request
 
 
 @profile
@@ -48,6 +42,14 @@ def get_ssoft(payload: dict) -> pd.DataFrame:
     # Schema
     schema = payload.get("schema", False)
     if schema:
+        from fink_utils.sso.ssoft import (
+            COLUMNS,
+            COLUMNS_HG,
+            COLUMNS_HG1G2,
+            COLUMNS_SHG1G2,
+            COLUMNS_SOCCA,
+        )
+
         if "flavor" in payload:
             flavor = payload["flavor"]
             if flavor not in ["SOCCA", "SHG1G2", "HG1G2", "HG"]:
@@ -108,7 +110,8 @@ def get_ssoft(payload: dict) -> pd.DataFrame:
     # Need to profile compared to pyarrow
     with open("config.yml") as f:
         input_args = yaml.load(f, yaml.Loader)
-    r = requests.get(
+    r = upstream_request(
+        "get",
         "{}/SSOFT/ssoft_{}_{}.parquet?op=OPEN&user.name={}&namenoderpcaddress={}".format(
             input_args["WEBHDFS"],
             flavor,
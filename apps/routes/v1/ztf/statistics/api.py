@@ -28,7 +28,22 @@ ARGS = ns.model(
         "date": fields.String(
             description="Observing date. This can be either a given night (YYYYMMDD), month (YYYYMM), year (YYYY), or eveything (empty string).",
             example="20241104",
-            required=True,
+            required=False,
+        ),
+        "startdate": fields.String(
+            description="First observing night (YYYYMMDD), included. Can be combined with `date`.",
+            example="20241101",
+            required=False,
+        ),
+        "stopdate": fields.String(
+            description="Last observing night (YYYYMMDD), included. Can be combined with `date`.",
+            example="20241130",
+            required=False,
+        ),
+        "aggregate": fields.String(
+            description="If set, aggregate numerical columns over the nights: `sum` (one row), or `cumsum` (cumulative sum night after night).",
+            example="sum",
+            required=False,
         ),
         "schema": fields.Boolean(
             description="If True, return just the schema of statistics table instead of actual data",
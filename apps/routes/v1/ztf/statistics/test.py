@@ -21,12 +21,13 @@ import requests
 APIURL = sys.argv[1]
 
 
-def statstest(date="2021", columns="*", output_format="json"):
+def statstest(date="2021", columns="*", output_format="json", **kwargs):
     """Perform a stats search in the Science Portal using the Fink REST API"""
     payload = {
         "date": date,
         "columns": columns,
         "output-format": output_format,
+        **kwargs,
     }
 
     r = requests.post(f"{APIURL}/api/v1/statistics", json=payload)
@@ -87,6 +88,34 @@ def test_cols() -> None:
     assert len(pdf.columns) == 2 + 2, pdf.columns
 
 
+def test_aggregate() -> None:
+    """
+    Examples
+    --------
+    >>> test_aggregate()
+    """
+    pdf = statstest(columns="basic:sci")
+    total = statstest(columns="basic:sci", aggregate="sum")
+    cumulative = statstest(columns="basic:sci", aggregate="cumsum")
+
+    assert len(total) == 1, len(total)
+    assert total["basic:sci"].to_numpy()[0] == pdf["basic:sci"].astype(int).sum()
+
+    assert len(cumulative) == len(pdf), len(cumulative)
+    assert cumulative["basic:sci"].to_numpy()[-1] == total["basic:sci"].to_numpy()[0]
+
+
+def test_range() -> None:
+    """
+    Examples
+    --------
+    >>> test_range()
+    """
+    pdf = statstest(date="", startdate="20210101", stopdate="20211231")
+
+    assert len(pdf) == len(statstest(date="2021")), len(pdf)
+
+
 if __name__ == "__main__":
     """ Execute the test suite """
     import doctest
@@ -13,10 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import pandas as pd
-from line_profiler import profile
+from flask import Response
 
 from apps.utils.client import connect_to_hbase_table
-from apps.utils.decoding import hbase_to_dict
+from apps.utils.profiling import profile
+from apps.utils.statistics import read_nights, statistics_store
 
 
 @profile
@@ -34,33 +35,23 @@ def get_statistics(payload: dict) -> pd.DataFrame:
     ----------
     out: pandas dataframe
     """
-    cols = payload.get("columns", "*")
-
-    client = connect_to_hbase_table("statistics_class")
     if "schema" in payload and str(payload["schema"]) == "True":
         # TODO: change the strategy to get the schema
         # The table schema changes everyday, so it is not very useful
         # Schema should use 3 things: /classes, basic:, and date
+        client = connect_to_hbase_table("statistics_class")
         schema = client.schema()
         results = list(schema.columnNames())
-        pdf = pd.DataFrame({"schema": results})
-    else:
-        payload_date = payload["date"]
+        client.close()
+        return pd.DataFrame({"schema": results})
 
-        to_evaluate = f"key:key:ztf_{payload_date}"
-        results = client.scan(
-            "",
-            to_evaluate,
-            cols,
-            0,
-            True,
-            True,
-        )
-        pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
+    nights = read_nights(payload)
+    if isinstance(nights, Response):
+        return nights
 
-        # See https://github.com/astrolabsoftware/fink-science-portal/issues/579
-        pdf = pdf.replace(regex={r"^\x00.*$": 0})
-
-    client.close()
+    cols = payload.get("columns", "*")
+    columns = None if cols in ["*", ""] else cols.split(",")
 
-    return pdf
+    return statistics_store("statistics_class", "ztf_").query(
+        *nights, columns=columns, aggregate=payload.get("aggregate") or None
+    )
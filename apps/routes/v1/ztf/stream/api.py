@@ -0,0 +1,51 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from flask import Response, request
+from flask_restx import Namespace, Resource, fields
+
+from apps.routes.v1.ztf.stream.utils import stream_class
+from apps.utils.utils import check_args
+
+ns = Namespace(
+    "api/v1/stream",
+    "Stream new alerts of a class, as server-sent events (text/event-stream)",
+)
+
+ARGS = ns.model(
+    "stream",
+    {
+        "class": fields.String(
+            description="Fink derived label. See https://api.ztf.fink-portal.org/api/v1/classes for available tags.",
+            example="Early SN Ia candidate",
+            required=True,
+        ),
+    },
+)
+
+
+@ns.route("")
+@ns.doc(params={k: ARGS[k].description for k in ARGS})
+class Stream(Resource):
+    def get(self):
+        """Stream new alerts from the Fink/ZTF database based on their Fink derived class"""
+        payload = request.args
+        if len(payload) == 0:
+            return Response(ns.description, 200)
+
+        rep = check_args(ARGS, payload)
+        if rep["status"] != "ok":
+            return Response(str(rep), 400)
+
+        return stream_class(payload)
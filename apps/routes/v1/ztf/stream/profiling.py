@@ -0,0 +1,28 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Call poll_class"""
+
+from astropy.time import Time
+
+from apps.routes.v1.ztf.latests.utils import class_scan_bounds
+from apps.routes.v1.ztf.stream.utils import poll_class
+
+CLASS = "Early SN Ia candidate"
+
+# Poll all alerts of the last 30 days
+jd_start = Time.now().jd - 30
+_, since, _, _, _ = class_scan_bounds(CLASS, jd_start, jd_start)
+
+poll_class(CLASS, since, 1000)
@@ -0,0 +1,214 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Admission control of the queries, before scanning HBase
+
+Routes estimate the cost of a query before issuing any scan, from the
+number of pixels, of rowkey ranges, and from cached statistics (e.g.
+number of alerts per class and per night). As for the choice of the
+pixel table (see `apps.utils.healpix.select_pixel_table`), the cost is
+the number of rows read plus SCAN_COST times the number of scans.
+
+Given the `ADMISSION` section of config.yml, a query is:
+
+- downgraded if it asks for more than `max_rows` rows: only `max_rows`
+  rows are returned, and the next ones can be read page by page with the
+  cursor. The `X-Fink-Row-Limit` header is then set.
+- rejected (400) if its cost exceeds `budget`, or `job_budget` for
+  asynchronous jobs (see `apps.utils.jobs`), which run outside of requests.
+- queued if its cost exceeds `heavy`: only `heavy_slots` such queries
+  run at the same time per worker. The others wait for a slot up to
+  `queue_timeout` seconds, and are then rejected (429) with a
+  `Retry-After` header.
+"""
+
+import threading
+
+from astropy.time import Time
+from flask import Response, g, has_request_context
+from prometheus_client import Counter
+
+from apps.utils.stages import current_route
+from apps.utils.utils import extract_configuration
+
+ADMISSIONS = Counter(
+    "fink_admission",
+    "Decisions of the admission control",
+    ["route", "decision"],
+)
+
+_SLOTS = None
+_SLOTS_LOCK = threading.Lock()
+
+
+def admission_config() -> dict:
+    """Return the `ADMISSION` section of config.yml, and SCAN_COST"""
+    config = extract_configuration("config.yml")
+    return {**config["ADMISSION"], "scan_cost": float(config["SCAN_COST"])}
+
+
+def heavy_slots() -> threading.BoundedSemaphore:
+    """Return the slots for heavy queries of this process"""
+    global _SLOTS
+    with _SLOTS_LOCK:
+        if _SLOTS is None:
+            _SLOTS = threading.BoundedSemaphore(int(admission_config()["heavy_slots"]))
+    return _SLOTS
+
+
+def query_cost(rows: float, scans: int, scan_cost: float = None) -> float:
+    """Cost of a query, in number of rows read
+
+    Parameters
+    ----------
+    rows: float
+        Estimated number of rows read
+    scans: int
+        Number of scans issued
+    scan_cost: float, optional
+        Cost of issuing one scan. Default is SCAN_COST from config.yml.
+
+    Examples
+    --------
+    >>> query_cost(1000, 10, scan_cost=50)
+    1500.0
+    """
+    if scan_cost is None:
+        scan_cost = admission_config()["scan_cost"]
+    return float(rows + scans * scan_cost)
+
+
+def pixel_rows(
+    npix: int, nside: int, density: float, days: float = None, survey: str = None
+) -> float:
+    """Estimated number of rows in pixels of a pixel table
+
+    Parameters
+    ----------
+    npix: int
+        Number of pixels
+    nside: int
+        Resolution of the pixels
+    density: float
+        Mean number of rows per square degree of the table (see PIXEL_TABLES)
+    days: float, optional
+        If set, only rows within a time window of `days` days are counted,
+        assuming a constant rate since the start of the survey.
+    survey: str, optional
+        Survey of the table (ztf, lsst), required if `days` is set.
+
+    Examples
+    --------
+    >>> round(pixel_rows(100, 128, 5000))
+    104912
+    """
+    from healpy import nside2pixarea
+
+    rows = npix * nside2pixarea(nside, degrees=True) * density
+    if days is not None:
+        start = Time(admission_config()["survey_start"][survey])
+        rows *= min(1.0, days / max(1.0, Time.now().jd - start.jd))
+    return rows
+
+
+def cap_rows(n: int) -> int:
+    """Limit the number of rows requested to `max_rows`
+
+    The next rows can be read page by page with the cursor.
+    """
+    max_rows = int(admission_config()["max_rows"])
+    if n <= max_rows:
+        return n
+
+    if has_request_context():
+        g.row_limit = max_rows
+    ADMISSIONS.labels(current_route(), "downgraded").inc()
+    return max_rows
+
+
+def admit(cost: float, hint: str):
+    """Reject or queue a query, given its estimated cost
+
+    Outside of a request (e.g. in a job), only `job_budget` is checked.
+
+    Parameters
+    ----------
+    cost: float
+        Estimated cost of the query, see `query_cost`
+    hint: str
+        How to make the query cheaper, e.g. `Reduce the radius.`
+
+    Returns
+    -------
+    out: Response or None
+        Response with the error, or None if the query can run
+    """
+    config = admission_config()
+    route = current_route()
+    if has_request_context():
+        g.query_cost = cost
+
+    budget = float(config["budget" if has_request_context() else "job_budget"])
+    if cost > budget:
+        ADMISSIONS.labels(route, "rejected").inc()
+        rep = {
+            "status": "error",
+            "text": f"The estimated cost of this query ({cost:,.0f} rows read) exceeds the budget of the API ({budget:,.0f}). {hint}\n",
+        }
+        return Response(str(rep), 400)
+
+    if cost <= float(config["heavy"]) or not has_request_context():
+        ADMISSIONS.labels(route, "admitted").inc()
+        return None
+
+    if "admission_slot" in g:
+        # Already holding a slot, e.g. a route calling another one
+        return None
+
+    slots = heavy_slots()
+    if not slots.acquire(timeout=float(config["queue_timeout"])):
+        ADMISSIONS.labels(route, "throttled").inc()
+        rep = {
+            "status": "error",
+            "text": f"Too many expensive queries are running. Retry later, or make the query cheaper. {hint}\n",
+        }
+        return Response(
+            str(rep),
+            429,
+            headers={"Retry-After": str(max(1, round(float(config["queue_timeout"]))))},
+        )
+
+    g.admission_slot = slots
+    ADMISSIONS.labels(route, "queued").inc()
+    return None
+
+
+def release_slot(exception=None):
+    """Release the slot of the current request for heavy queries, if any"""
+    slots = g.pop("admission_slot", None)
+    if slots is not None:
+        slots.release()
+
+
+def add_row_limit_header(response):
+    """Set the `X-Fink-Row-Limit` header if the query was downgraded"""
+    if "row_limit" in g:
+        response.headers.set("X-Fink-Row-Limit", str(g.row_limit))
+    return response
+
+
+def register_admission(app):
+    """Release the slots of heavy queries of `app` at the end of requests"""
+    app.after_request(add_row_limit_header)
+    app.teardown_request(release_slot)
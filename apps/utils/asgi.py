@@ -0,0 +1,266 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""ASGI serving path for the applications (asgi_ztf.py, asgi_lsst.py)
+
+Connections are handled by an event loop, and the routes, which block on
+py4j (HBase) and on upstream HTTP services (cutouts, Miriade, ...), run
+in a pool of `ASGI.threads` threads per process. A slow client, or a
+request waiting for a thread, then costs a coroutine instead of a worker.
+
+At most `ASGI.max_in_flight` requests are accepted per process. Others
+wait up to `ASGI.queue_timeout` seconds, and are then rejected (503)
+with a `Retry-After` header.
+
+When the client disconnects, the response is closed at its next chunk,
+e.g. within a heartbeat for server-sent events (/api/v1/stream), which
+releases the thread and the slot of the request.
+
+    gunicorn -c config_prometheus.py -k uvicorn.workers.UvicornWorker asgi_ztf:app
+"""
+
+import asyncio
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from prometheus_client import Counter
+
+from apps.utils.utils import extract_configuration
+
+ASGI_REJECTED = Counter(
+    "fink_asgi_rejected",
+    "Requests rejected by the ASGI entry points, with too many requests in flight",
+)
+
+
+def wsgi_environ(scope: dict, body: bytes) -> dict:
+    """Return the WSGI environ of an ASGI HTTP request
+
+    Examples
+    --------
+    >>> scope = {
+    ...     "type": "http", "http_version": "1.1", "method": "GET",
+    ...     "path": "/api/v1/objects", "query_string": b"objectId=ZTF21",
+    ...     "headers": [(b"content-type", b"application/json"), (b"x-a", b"1")],
+    ...     "server": ("localhost", 32000), "client": ("127.0.0.1", 5000),
+    ... }
+    >>> environ = wsgi_environ(scope, b"")
+    >>> environ["PATH_INFO"], environ["QUERY_STRING"], environ["CONTENT_TYPE"]
+    ('/api/v1/objects', 'objectId=ZTF21', 'application/json')
+    >>> environ["HTTP_X_A"], environ["SERVER_PORT"]
+    ('1', '32000')
+    """
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf8").decode("latin1"),
+        "PATH_INFO": scope["path"].encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("ascii"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+        environ["REMOTE_PORT"] = str(scope["client"][1])
+
+    for name, value in scope["headers"]:
+        name = name.decode("latin1").upper().replace("-", "_")
+        value = value.decode("latin1")
+        if name in ["CONTENT_TYPE", "CONTENT_LENGTH"]:
+            environ[name] = value
+            continue
+        name = f"HTTP_{name}"
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+class AsgiApplication:
+    """Serve a WSGI application with ASGI, running it in a thread pool
+
+    Parameters
+    ----------
+    wsgi_app: callable
+        WSGI application, e.g. `app_ztf.app`
+    threads: int
+        Number of threads running the WSGI application
+    max_in_flight: int
+        Maximum number of requests accepted at the same time
+    queue_timeout: float
+        Maximum time waiting to be accepted, in second
+    """
+
+    def __init__(
+        self, wsgi_app, threads: int, max_in_flight: int, queue_timeout: float
+    ):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        # Created in the event loop, after the server forks
+        self.pool = None
+        self.in_flight = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self.http(scope, receive, send)
+        else:
+            raise NotImplementedError(f"Unsupported ASGI scope {scope['type']}")
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.pool is not None:
+                    self.pool.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def startup(self):
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(self.threads, thread_name_prefix="asgi")
+            self.in_flight = asyncio.Semaphore(self.max_in_flight)
+
+    async def http(self, scope, receive, send):
+        self.startup()
+        try:
+            await asyncio.wait_for(self.in_flight.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            ASGI_REJECTED.inc()
+            await self.reject(send)
+            return
+
+        try:
+            body = b""
+            more_body = True
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                body += message.get("body", b"")
+                more_body = message.get("more_body", False)
+
+            loop = asyncio.get_running_loop()
+
+            def send_from_thread(message):
+                asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+            disconnected = threading.Event()
+            watcher = asyncio.create_task(self.watch(receive, disconnected))
+            try:
+                await loop.run_in_executor(
+                    self.pool,
+                    self.run,
+                    wsgi_environ(scope, body),
+                    send_from_thread,
+                    disconnected,
+                )
+            finally:
+                watcher.cancel()
+        finally:
+            self.in_flight.release()
+
+    async def watch(self, receive, disconnected: threading.Event):
+        """Set `disconnected` when the client disconnects"""
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+                return
+
+    async def reject(self, send):
+        rep = {
+            "status": "error",
+            "text": "Too many requests are in flight. Retry later.\n",
+        }
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"text/html; charset=utf-8"),
+                    (b"retry-after", str(max(1, round(self.queue_timeout))).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": str(rep).encode()})
+
+    def run(self, environ: dict, send, disconnected: threading.Event):
+        """Run the WSGI application, and send its response (in a thread)
+
+        The response is closed as soon as `disconnected` is set.
+        """
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and response.get("started"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [
+                (name.lower().encode("latin1"), value.encode("latin1"))
+                for name, value in headers
+            ]
+
+        def start():
+            if not response.get("started"):
+                response["started"] = True
+                send(
+                    {
+                        "type": "http.response.start",
+                        "status": response["status"],
+                        "headers": response["headers"],
+                    }
+                )
+
+        chunks = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in chunks:
+                if disconnected.is_set():
+                    return
+                if len(chunk) > 0:
+                    start()
+                    send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+            start()
+            send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+
+def asgi_application(wsgi_app) -> AsgiApplication:
+    """Return the ASGI application of `wsgi_app`, configured by config.yml"""
+    config = extract_configuration("config.yml")["ASGI"]
+    return AsgiApplication(
+        wsgi_app,
+        int(config["threads"]),
+        int(config["max_in_flight"]),
+        float(config["queue_timeout"]),
+    )
@@ -15,12 +15,29 @@
 """Utilities to work with the Fink HBase client"""
 
 import numpy as np
-from line_profiler import profile
 from py4j.java_gateway import JavaGateway
 
+from apps.utils.profiling import profile
+from apps.utils.stages import stage
 from apps.utils.utils import extract_configuration
 
 
+class TimedClient:
+    """HBase client whose scans are timed (see `apps.utils.stages`)"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        """Forward all other methods to the Lomikel client"""
+        return getattr(self._client, name)
+
+    def scan(self, key, search, *args):
+        with stage("scan") as record:
+            record.detail = search
+            return self._client.scan(key, search, *args)
+
+
 @profile
 def connect_to_hbase_table(
     tablename: str,
@@ -53,7 +70,7 @@ def connect_to_hbase_table(
     client.connect(tablename, schema_name)
     client.setLimit(config["NLIMIT"])
 
-    return client
+    return TimedClient(client)
 
 
 @profile
@@ -70,7 +87,8 @@ def create_or_update_hbase_table(
     otherwise it will create the table in HBase and push the schema. The schema
     has a rowkey `schema`.
 
-    Currently accepts only a single family name
+    Column names can be given without family if the table has a single
+    family name. Otherwise they must be prefixed by their family, e.g. `r:ra`.
 
     Parameters
     ----------
@@ -87,8 +105,11 @@ def create_or_update_hbase_table(
     config_path: str, optional
         Path to the config file. Default is None (relative to the apps/ folder)
     """
-    if len(np.unique(families)) != 1:
-        raise NotImplementedError("`create_hbase_table` only accepts one family name")
+    prefixed = all(":" in colname for colname in schema)
+    if len(np.unique(families)) != 1 and not prefixed:
+        raise NotImplementedError(
+            "`create_hbase_table` only accepts one family name, unless column names are prefixed by their family"
+        )
 
     config = extract_configuration("config.yml")
 
@@ -106,7 +127,12 @@ def create_or_update_hbase_table(
         client.connect(tablename, None)
 
     # Push the schema
-    out = [f"{families[0]}:{colname}:{coltype}" for colname, coltype in schema.items()]
+    if prefixed:
+        out = [f"{colname}:{coltype}" for colname, coltype in schema.items()]
+    else:
+        out = [
+            f"{families[0]}:{colname}:{coltype}" for colname, coltype in schema.items()
+        ]
     client.put(schema_name, out)
 
     client.close()
@@ -0,0 +1,77 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Vectorised spherical geometry on ICRS coordinates"""
+
+import numpy as np
+
+
+def radec2vec(ra, dec):
+    """Convert equatorial coordinates into unit vectors
+
+    Parameters
+    ----------
+    ra: float or array of float
+        Right Ascension, in degree
+    dec: float or array of float
+        Declination, in degree
+
+    Returns
+    -------
+    out: np.array
+        Unit vectors, with shape (..., 3)
+    """
+    ra = np.radians(np.asarray(ra, dtype=float))
+    dec = np.radians(np.asarray(dec, dtype=float))
+    cos_dec = np.cos(dec)
+    return np.stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)], axis=-1)
+
+
+def angular_separation(vec1, vec2):
+    """Great-circle distance between unit vectors
+
+    The angle is computed as atan2(|v1 x v2|, v1 . v2), which is
+    accurate at all separations (unlike arccos for small angles).
+
+    Parameters
+    ----------
+    vec1: np.array
+        Unit vectors, with shape (..., 3)
+    vec2: np.array
+        Unit vectors, with shape (..., 3), broadcastable with `vec1`
+
+    Returns
+    -------
+    out: np.array
+        Angular separation, in degree
+
+    Examples
+    --------
+    >>> from astropy.coordinates import SkyCoord
+    >>> ra, dec = np.array([10.0, 193.82, 359.9]), np.array([-89.0, 2.89, 0.1])
+    >>> sep = angular_separation(radec2vec(193.8217, 2.897), radec2vec(ra, dec))
+    >>> ref = SkyCoord(193.8217, 2.897, unit="deg").separation(
+    ...     SkyCoord(ra, dec, unit="deg")
+    ... )
+    >>> bool(np.all(np.abs(sep - ref.deg) < 1e-10))
+    True
+    """
+    x1, y1, z1 = np.moveaxis(np.asarray(vec1), -1, 0)
+    x2, y2, z2 = np.moveaxis(np.asarray(vec2), -1, 0)
+
+    cross = np.sqrt(
+        (y1 * z2 - z1 * y2) ** 2 + (z1 * x2 - x1 * z2) ** 2 + (x1 * y2 - y1 * x2) ** 2
+    )
+    dot = x1 * x2 + y1 * y2 + z1 * z2
+    return np.degrees(np.arctan2(cross, dot))
@@ -0,0 +1,265 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Utilities to crossmatch user catalogs with pixel tables"""
+
+import ast
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from flask import Response
+
+from apps.utils.client import connect_to_hbase_table
+from apps.utils.coordinates import angular_separation, radec2vec
+from apps.utils.healpix import scan_pixels, select_pixel_table
+from apps.utils.profiling import profile
+from apps.utils.utils import extract_configuration
+
+
+def read_catalog(payload: dict, files) -> pd.DataFrame:
+    """Read the user catalog, with columns id, ra, dec and optionally radius
+
+    Parameters
+    ----------
+    payload: dict
+        See https://api.ztf.fink-portal.org
+    files: dict
+        Uploaded files (`request.files`)
+
+    Returns
+    -------
+    out: pd.DataFrame or Response
+        Catalog, or a Response in case of error
+    """
+    config = extract_configuration("config.yml")
+    catalog_format = payload.get("catalog-format", "csv")
+
+    if "catalog" in files:
+        data = files["catalog"].read()
+    elif "catalog" in payload:
+        data = payload["catalog"]
+    else:
+        rep = {
+            "status": "error",
+            "text": "You need to upload a `catalog` with columns id, ra, dec, and optionally radius.\n",
+        }
+        return Response(str(rep), 400)
+
+    try:
+        if isinstance(data, str):
+            if catalog_format == "csv":
+                data = data.encode()
+            else:
+                # binary content sent as str(bytes), as for /api/v1/skymap
+                data = ast.literal_eval(data)
+        if catalog_format == "csv":
+            catalog = pd.read_csv(io.BytesIO(data))
+        elif catalog_format == "parquet":
+            catalog = pd.read_parquet(io.BytesIO(data))
+        elif catalog_format == "arrow":
+            try:
+                catalog = pa.ipc.open_file(pa.BufferReader(data)).read_pandas()
+            except pa.ArrowInvalid:
+                catalog = pa.ipc.open_stream(pa.BufferReader(data)).read_pandas()
+        else:
+            rep = {
+                "status": "error",
+                "text": f"Catalog format `{catalog_format}` is not supported. Choose among csv, parquet, or arrow\n",
+            }
+            return Response(str(rep), 400)
+    except (ValueError, SyntaxError, TypeError, OSError, pa.ArrowException) as e:
+        rep = {
+            "status": "error",
+            "text": f"Could not read the catalog: {e}\n",
+        }
+        return Response(str(rep), 400)
+
+    if "radius" not in catalog.columns and "radius" in payload:
+        catalog["radius"] = float(payload["radius"])
+
+    missing = [c for c in ["id", "ra", "dec", "radius"] if c not in catalog.columns]
+    if len(missing) > 0:
+        rep = {
+            "status": "error",
+            "text": f"Missing column(s) in the catalog: {missing}\n",
+        }
+        return Response(str(rep), 400)
+
+    if len(catalog) == 0:
+        rep = {
+            "status": "error",
+            "text": "The catalog is empty.\n",
+        }
+        return Response(str(rep), 400)
+
+    if len(catalog) > config["CROSSMATCH_MAX_SOURCES"]:
+        rep = {
+            "status": "error",
+            "text": f"The catalog cannot contain more than {config['CROSSMATCH_MAX_SOURCES']} sources.\n",
+        }
+        return Response(str(rep), 400)
+
+    try:
+        coordinates = catalog[["ra", "dec", "radius"]].astype(float)
+    except (ValueError, TypeError) as e:
+        rep = {
+            "status": "error",
+            "text": f"`ra`, `dec` and `radius` must be numbers: {e}\n",
+        }
+        return Response(str(rep), 400)
+
+    if coordinates.isna().any().any():
+        rep = {
+            "status": "error",
+            "text": "`ra`, `dec` and `radius` cannot be empty or NaN.\n",
+        }
+        return Response(str(rep), 400)
+
+    if (coordinates["radius"] <= 0).any():
+        rep = {
+            "status": "error",
+            "text": "`radius` must be positive.\n",
+        }
+        return Response(str(rep), 400)
+
+    if (coordinates["dec"].abs() > 90).any():
+        rep = {
+            "status": "error",
+            "text": "`dec` must be between -90 and 90 degrees.\n",
+        }
+        return Response(str(rep), 400)
+
+    catalog[["ra", "dec", "radius"]] = coordinates
+
+    if catalog["radius"].max() > 18000.0:
+        rep = {
+            "status": "error",
+            "text": "`radius` cannot be bigger than 18,000 arcseconds (5 degrees).\n",
+        }
+        return Response(str(rep), 400)
+
+    return catalog[["id", "ra", "dec", "radius"]].reset_index(drop=True)
+
+
+@profile
+def crossmatch_catalog(
+    catalog: pd.DataFrame,
+    pixel_tables: list,
+    decode,
+    cols: str,
+    ra_col: str,
+    dec_col: str,
+    nmax: int,
+):
+    """Crossmatch a catalog with alerts stored in a pixel table
+
+    All pixels intersecting the cones are deduplicated and scanned once,
+    then alerts are matched to sources with a vectorised join on pixel
+    and angular separation.
+
+    Parameters
+    ----------
+    catalog: pd.DataFrame
+        Catalog returned by `read_catalog`
+    pixel_tables: list of dict
+        Available pixel tables (see `select_pixel_table`)
+    decode: callable
+        Function to decode the HBase output, e.g. `format_hbase_output`
+    cols: str
+        Comma-separated columns to transfer, or `*`
+    ra_col: str
+        Name of the Right Ascension column in the table
+    dec_col: str
+        Name of the Declination column in the table
+    nmax: int
+        Maximum number of rows to read from the table
+
+    Returns
+    -------
+    pdf: pd.DataFrame
+        Matched alerts, with the source `v:id` and `v:separation_degree`
+    truncated: bool
+        True if the row budget has been exhausted
+    """
+    from healpy import ang2pix, query_disc
+
+    config = extract_configuration("config.yml")
+
+    vecs = radec2vec(catalog["ra"].to_numpy(), catalog["dec"].to_numpy())
+    radius_deg = catalog["radius"].to_numpy() / 3600.0
+
+    # The resolution is chosen for the typical cone of the catalog
+    typical = int(np.argsort(radius_deg)[len(radius_deg) // 2])
+    pixel_table, _, _ = select_pixel_table(
+        pixel_tables,
+        vecs[typical],
+        np.radians(radius_deg[typical]),
+        config["SCAN_COST"],
+    )
+    nside = int(pixel_table["nside"])
+
+    cone_pixs = [
+        query_disc(nside, vec, np.radians(radius), inclusive=True)
+        for vec, radius in zip(vecs, radius_deg, strict=True)
+    ]
+    pairs = pd.DataFrame(
+        {
+            "source": np.repeat(np.arange(len(catalog)), [len(p) for p in cone_pixs]),
+            "pixel": np.concatenate(cone_pixs),
+        }
+    )
+
+    client = connect_to_hbase_table(pixel_table["table"])
+    client.setLimit(nmax)
+    results = scan_pixels(client, pairs["pixel"].unique(), nside, cols, nmax=nmax)
+    truncated = len(results) >= nmax
+
+    schema_client = client.schema()
+    client.close()
+
+    pdf = decode(
+        results,
+        schema_client,
+        truncated=True,
+        group_alerts=True,
+        extract_color=False,
+    )
+
+    if pdf.empty:
+        return pdf, truncated
+
+    pdf = pdf.reset_index(drop=True)
+    ra = pdf[ra_col].to_numpy(dtype=float)
+    dec = pdf[dec_col].to_numpy(dtype=float)
+
+    # Candidate pairs share the same pixel
+    candidates = pd.DataFrame(
+        {
+            "row": np.arange(len(pdf)),
+            "pixel": ang2pix(nside, ra, dec, lonlat=True),
+        }
+    ).merge(pairs, on="pixel")
+
+    row = candidates["row"].to_numpy()
+    source = candidates["source"].to_numpy()
+    sep = angular_separation(radec2vec(ra[row], dec[row]), vecs[source])
+    mask = sep <= radius_deg[source]
+
+    out = pdf.iloc[row[mask]].reset_index(drop=True)
+    out.insert(0, "v:id", catalog["id"].to_numpy()[source[mask]])
+    out["v:separation_degree"] = sep[mask]
+
+    return out.sort_values(["v:id", "v:separation_degree"]), truncated
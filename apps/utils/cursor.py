@@ -0,0 +1,191 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Continuation cursors for paginated scans
+
+A cursor encodes the first rowkey left out of a page and the scan
+direction. The next page resumes the range scan from that rowkey, such that large
+result sets can be walked in pages of constant size. Routes read one
+row more than requested to know whether a next page exists, and return
+the cursor in the `X-Fink-Cursor` header.
+"""
+
+import base64
+import json
+
+from flask import Response
+
+
+def encode_cursor(key: str, reverse: bool) -> str:
+    """Encode a rowkey and a scan direction into an opaque cursor
+
+    Examples
+    --------
+    >>> cursor = encode_cursor("Early SN Ia candidate_2460000.5", True)
+    >>> decode_cursor(cursor)
+    ('Early SN Ia candidate_2460000.5', True)
+    """
+    content = json.dumps({"k": key, "r": reverse}).encode()
+    return base64.urlsafe_b64encode(content).decode()
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor
+
+    Parameters
+    ----------
+    cursor: str
+        Cursor returned by `encode_cursor`
+
+    Returns
+    -------
+    key: str
+        First rowkey of the next page
+    reverse: bool
+        True if the scan is reversed
+
+    Raises
+    ------
+    ValueError
+        If the cursor is malformed
+    """
+    try:
+        content = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(content["k"]), bool(content["r"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Malformed cursor: {e}") from e
+
+
+def read_cursor(payload: dict, reverse: bool, lower: str = None, upper: str = None):
+    """Return the rowkey to resume the scan from
+
+    Parameters
+    ----------
+    payload: dict
+        User payload, with an optional `cursor`
+    reverse: bool
+        Direction of the scan
+    lower: str, optional
+        If set, lower rowkey bound of the query
+    upper: str, optional
+        If set, upper rowkey bound of the query
+
+    Returns
+    -------
+    out: str, None, or Response
+        Rowkey, None if no cursor is given, or
+        a Response if the cursor does not match the query.
+    """
+    if payload.get("cursor", "") in ["", None]:
+        return None
+
+    try:
+        key, direction = decode_cursor(payload["cursor"])
+    except ValueError as e:
+        rep = {
+            "status": "error",
+            "text": f"{e}\n",
+        }
+        return Response(str(rep), 400)
+
+    out_of_bounds = (lower is not None and key < lower) or (
+        upper is not None and key > upper
+    )
+    if direction != reverse or out_of_bounds:
+        rep = {
+            "status": "error",
+            "text": "The cursor does not match this query. Use the cursor returned by the previous page with the same parameters.\n",
+        }
+        return Response(str(rep), 400)
+
+    return key
+
+
+def first_key(results):
+    """Smallest rowkey of HBase results (dict or TreeMap)"""
+    if isinstance(results, dict):
+        return min(results)
+    return results.firstKey()
+
+
+def last_key(results):
+    """Largest rowkey of HBase results (dict or TreeMap)"""
+    if isinstance(results, dict):
+        return max(results)
+    return results.lastKey()
+
+
+def paginate(results, n: int, reverse: bool = False):
+    """Trim scan results to a page, and return the cursor of the next page
+
+    The scan must have read (at most) `n + 1` rows, from the rowkey of
+    the cursor included. The cursor of the next page is the first rowkey
+    left out of this page. Results are modified in place.
+
+    Parameters
+    ----------
+    results: dict or java.util.TreeMap
+        HBase rows, keyed by rowkey
+    n: int
+        Page size
+    reverse: bool, optional
+        Direction of the scan. Default is False.
+
+    Returns
+    -------
+    out: str or None
+        Cursor for the next page, or None if this is the last page
+
+    Examples
+    --------
+    Walk all pages of a table of 10 rows, 3 rows at a time, newest first
+
+    >>> table = {f"key_{i:02d}": {} for i in range(10)}
+    >>> def scan(upper, nmax):
+    ...     keys = sorted(k for k in table if upper is None or k <= upper)
+    ...     return {k: table[k] for k in keys[::-1][:nmax]}
+    >>> pages, cursor = [], None
+    >>> while True:
+    ...     upper = None if cursor is None else decode_cursor(cursor)[0]
+    ...     results = scan(upper, 3 + 1)
+    ...     cursor = paginate(results, 3, reverse=True)
+    ...     pages.append(sorted(results, reverse=True))
+    ...     if cursor is None:
+    ...         break
+    >>> [[key[-2:] for key in page] for page in pages]
+    [['09', '08', '07'], ['06', '05', '04'], ['03', '02', '01'], ['00']]
+    """
+    if len(results) <= n:
+        return None
+
+    while len(results) > n + 1:
+        if reverse:
+            del results[first_key(results)]
+        else:
+            del results[last_key(results)]
+
+    # The row left out starts the next page
+    if reverse:
+        key = first_key(results)
+    else:
+        key = last_key(results)
+    del results[key]
+    return encode_cursor(key, reverse)
+
+
+def add_cursor_header(response: Response, pdf) -> Response:
+    """Set the `X-Fink-Cursor` header if a next page exists"""
+    if pdf.attrs.get("cursor") is not None:
+        response.headers.set("X-Fink-Cursor", pdf.attrs["cursor"])
+    return response
@@ -0,0 +1,234 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cutouts of the alerts, requested from the Fink cutout API"""
+
+import io
+import json
+
+import numpy as np
+from flask import Response, jsonify, send_file
+
+from apps.utils.client import connect_to_hbase_table
+from apps.utils.plotting import convolve, legacy_normalizer, sigmoid_normalizer
+from apps.utils.profiling import profile
+from apps.utils.stages import upstream_request
+from apps.utils.utils import extract_configuration
+
+
+@profile
+def send_cutout(survey, payload: dict):
+    """Send the cutouts of an alert, e.g. for /api/v1/cutouts
+
+    The HDFS path of the alert is read from the cutouts table of the
+    survey, and the cutouts are requested from the Fink cutout API.
+
+    Parameters
+    ----------
+    survey: apps.utils.engine.Survey
+        Survey of the alert
+    payload: dict
+        User payload, see /api/v1/cutouts
+
+    Returns
+    -------
+    out: Response
+        PNG, FITS, or JSON arrays
+    """
+    output_format = payload.get("output-format", "PNG")
+    id_column = survey.cutouts["id"]
+    id_arg = id_column.split(":")[1]
+
+    # default stretch is sigmoid
+    if "stretch" in payload:
+        stretch = payload["stretch"]
+    else:
+        stretch = "sigmoid"
+
+    if payload["kind"] == "All" and payload["output-format"] != "array":
+        rep = {
+            "status": "error",
+            "text": "The option `kind=All` is only compatible with `output-format=array`.\n",
+        }
+        return Response(str(rep), 400)
+
+    # default name based on parameters
+    filename = "{}_{}".format(
+        payload[id_arg],
+        payload["kind"],
+    )
+
+    if output_format == "PNG":
+        filename = filename + ".png"
+    elif output_format == "FITS":
+        filename = filename + ".fits"
+    elif output_format == "array":
+        pass
+    else:
+        rep = {
+            "status": "error",
+            "text": "output-format must be one of: PNG, FITS, or array.\n",
+        }
+        return Response(str(rep), 400)
+
+    # Query the Database (object query)
+    client = connect_to_hbase_table(survey.tables["cutouts"])
+    candidate = survey.cutouts.get("candidate")
+    cols = [survey.cutouts["path"], survey.time_column, id_column]
+    if candidate is not None:
+        cols.append(candidate)
+    results = client.scan(
+        "",
+        "key:key:{}".format(survey.rowkey(payload[id_arg])),
+        ",".join(cols),
+        0,
+        False,
+        False,
+    )
+
+    # Format the results
+    schema_client = client.schema()
+    client.close()
+
+    pdf = survey.decode(
+        results,
+        schema_client,
+        group_alerts=False,
+        truncated=True,
+        extract_color=False,
+        escape_slash=False,
+    )
+
+    if pdf.empty:
+        return send_file(
+            io.BytesIO(),
+            mimetype="image/png",
+            as_attachment=True,
+            download_name=filename,
+        )
+
+    json_payload = {}
+    # Extract only the alert of interest
+    if candidate is not None and candidate.split(":")[1] in payload:
+        name = candidate.split(":")[1]
+        mask = pdf[candidate].astype(str) == str(payload[name])
+        json_payload.update({name: str(payload[name])})
+        pos_target = np.where(mask)[0][0]
+    else:
+        # pdf has been sorted by time when decoding
+        pos_target = 0
+
+    json_payload.update(
+        {
+            "hdfsPath": pdf[survey.cutouts["path"]]
+            .to_numpy()[pos_target]
+            .split(":8020")[1],
+            "kind": payload["kind"],
+            id_arg: str(pdf[id_column].to_numpy()[pos_target]),
+        }
+    )
+
+    # Extract cutouts
+    user_config = extract_configuration("config.yml")
+    cutout = request_cutout(json_payload, output_format, user_config["CUTOUTAPIURL"])
+
+    # send the FITS file
+    if output_format == "FITS":
+        return send_file(
+            cutout,
+            mimetype="application/octet-stream",
+            as_attachment=True,
+            download_name=filename,
+        )
+    # send the array
+    elif output_format == "array":
+        suffix = survey.cutouts["suffix"]
+        if payload["kind"] != "All":
+            return jsonify({f"b:cutout{payload['kind']}{suffix}": cutout[0]})
+        else:
+            out = {
+                f"b:cutoutScience{suffix}": cutout[0],
+                f"b:cutoutTemplate{suffix}": cutout[1],
+                f"b:cutoutDifference{suffix}": cutout[2],
+            }
+            return jsonify(out)
+
+    array = np.nan_to_num(np.array(cutout[0], dtype=float))
+    if stretch == "sigmoid":
+        array = sigmoid_normalizer(array, 0, 1)
+    elif stretch is not None:
+        pmin = 0.5
+        if "pmin" in payload:
+            pmin = float(payload["pmin"])
+        pmax = 99.5
+        if "pmax" in payload:
+            pmax = float(payload["pmax"])
+        array = legacy_normalizer(array, stretch=stretch, pmin=pmin, pmax=pmax)
+
+    if "convolution_kernel" in payload:
+        assert payload["convolution_kernel"] in ["gauss", "box"]
+        array = convolve(array, smooth=1, kernel=payload["convolution_kernel"])
+
+    # colormap
+    if "colormap" in payload:
+        from matplotlib import cm
+
+        colormap = getattr(cm, payload["colormap"])
+    else:
+        colormap = lambda x: x
+    array = np.uint8(colormap(array) * 255)
+
+    # Convert to PNG
+    from PIL import Image
+
+    data = Image.fromarray(array)
+    datab = io.BytesIO()
+    data.save(datab, format="PNG")
+    datab.seek(0)
+    return send_file(
+        datab, mimetype="image/png", as_attachment=True, download_name=filename
+    )
+
+
+@profile
+def request_cutout(json_payload, output_format, cutout_api_url):
+    """Request a cutout from the Fink cutout API
+
+    Parameters
+    ----------
+    json_payload: dict
+        Dictionary with arguments for /api/v1/cutouts
+    output_format: str
+        Among: FITS, PNG, array
+    cutout_api_url: str
+        URL of the Fink cutout API service.
+
+    Returns
+    -------
+    cutout: Any
+        Output type depends on the `output_format` argument
+    """
+    if output_format == "FITS":
+        json_payload.update({"return_type": "FITS"})
+        r0 = upstream_request(
+            "post", f"{cutout_api_url}/api/v1/cutouts", json=json_payload
+        )
+        cutout = io.BytesIO(r0.content)
+    elif output_format in ["PNG", "array"]:
+        json_payload.update({"return_type": "array"})
+        r0 = upstream_request(
+            "post", f"{cutout_api_url}/api/v1/cutouts", json=json_payload
+        )
+        cutout = json.loads(r0.content)
+    return cutout
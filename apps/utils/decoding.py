@@ -19,12 +19,12 @@ import logging
 
 import numpy as np
 import pandas as pd
-from astropy.coordinates import SkyCoord, get_constellation
 from astropy.time import Time
-from fink_filters.ztf.classification import extract_fink_classification_
-from line_profiler import profile
 from py4j.java_gateway import JavaGateway
 
+from apps.utils.profiling import profile
+from apps.utils.stages import stage, timed
+
 _LOG = logging.getLogger(__name__)
 
 pd.set_option("future.no_silent_downcasting", True)
@@ -42,6 +42,7 @@ hbase_type_converter = {
 }
 
 
+@timed("decode")
 @profile
 def format_hbase_output(
     hbase_output,
@@ -123,55 +124,52 @@ def format_hbase_output(
     pdfs = pdfs.copy()  # Fix Pandas' "DataFrame is highly fragmented" warning
 
     if not truncated:
-        # Fink final classification
-        classifications = extract_fink_classification_(
-            pdfs["d:cdsxmatch"],
-            pdfs["d:roid"],
-            pdfs["d:mulens"],
-            pdfs["d:snn_snia_vs_nonia"],
-            pdfs["d:snn_sn_vs_all"],
-            pdfs["d:rf_snia_vs_nonia"],
-            pdfs["i:ndethist"],
-            pdfs["i:drb"],
-            pdfs["i:classtar"],
-            pdfs["i:jd"],
-            pdfs["i:jdstarthist"],
-            pdfs["d:rf_kn_vs_nonkn"],
-            pdfs["d:tracklet"],
-        )
-
-        pdfs["v:classification"] = classifications.to_numpy()
-
-        if extract_color:
-            # Extract color evolution
-            pdfs = extract_rate_and_color(pdfs)
-
-        # Human readable time
-        pdfs["v:lastdate"] = convert_jd(pdfs["i:jd"])
-        pdfs["v:firstdate"] = convert_jd(pdfs["i:jdstarthist"])
-        pdfs["v:lapse"] = pdfs["i:jd"] - pdfs["i:jdstarthist"]
-
-        if with_constellation:
-            coords = SkyCoord(
-                pdfs["i:ra"],
-                pdfs["i:dec"],
-                unit="deg",
+        from fink_filters.ztf.classification import extract_fink_classification_
+
+        with stage("enrich"):
+            # Fink final classification
+            classifications = extract_fink_classification_(
+                pdfs["d:cdsxmatch"],
+                pdfs["d:roid"],
+                pdfs["d:mulens"],
+                pdfs["d:snn_snia_vs_nonia"],
+                pdfs["d:snn_sn_vs_all"],
+                pdfs["d:rf_snia_vs_nonia"],
+                pdfs["i:ndethist"],
+                pdfs["i:drb"],
+                pdfs["i:classtar"],
+                pdfs["i:jd"],
+                pdfs["i:jdstarthist"],
+                pdfs["d:rf_kn_vs_nonkn"],
+                pdfs["d:tracklet"],
             )
-            constellations = get_constellation(coords)
-            pdfs["v:constellation"] = constellations
 
-    # Display only the last alert
-    if group_alerts and ("i:jd" in pdfs.columns) and ("i:objectId" in pdfs.columns):
-        pdfs["i:jd"] = pdfs["i:jd"].astype(float)
-        pdfs = pdfs.loc[pdfs.groupby("i:objectId")["i:jd"].idxmax()]
+            pdfs["v:classification"] = classifications.to_numpy()
 
-    # sort values by time
-    if "i:jd" in pdfs.columns:
-        pdfs = pdfs.sort_values("i:jd", ascending=False)
+            if extract_color:
+                # Extract color evolution
+                pdfs = extract_rate_and_color(pdfs)
 
-    return pdfs
+            # Human readable time
+            pdfs["v:lastdate"] = convert_jd(pdfs["i:jd"])
+            pdfs["v:firstdate"] = convert_jd(pdfs["i:jdstarthist"])
+            pdfs["v:lapse"] = pdfs["i:jd"] - pdfs["i:jdstarthist"]
+
+            if with_constellation:
+                from astropy.coordinates import SkyCoord, get_constellation
+
+                coords = SkyCoord(
+                    pdfs["i:ra"],
+                    pdfs["i:dec"],
+                    unit="deg",
+                )
+                constellations = get_constellation(coords)
+                pdfs["v:constellation"] = constellations
+
+    return last_alerts(pdfs, "i:objectId", "i:jd", group_alerts)
 
 
+@timed("decode")
 @profile
 def format_lsst_hbase_output(
     hbase_output,
@@ -231,18 +229,41 @@ def format_lsst_hbase_output(
         if col in pdfs.columns:
             pdfs[col] = pdfs[col].replace("nan", "[]")
 
+    return last_alerts(pdfs, "r:diaObjectId", "r:midpointMjdTai", group_alerts)
+
+
+def last_alerts(
+    pdfs: pd.DataFrame, id_column: str, time_column: str, group_alerts: bool
+) -> pd.DataFrame:
+    """Sort alerts by decreasing time, keeping only the last one per object
+
+    Parameters
+    ----------
+    pdfs: pd.DataFrame
+        Decoded alerts
+    id_column: str
+        Column of the object identifier, e.g. `i:objectId`
+    time_column: str
+        Column of the time of the alerts, e.g. `i:jd`
+    group_alerts: bool
+        If True, keep only the last alert of each object
+
+    Examples
+    --------
+    >>> pdf = pd.DataFrame({"id": ["a", "a", "b"], "t": ["1", "3", "2"]})
+    >>> last_alerts(pdf, "id", "t", group_alerts=True)
+      id    t
+    1  a  3.0
+    2  b  2.0
+    """
     # Display only the last alert
-    if (
-        group_alerts
-        and ("r:midpointMjdTai" in pdfs.columns)
-        and ("r:diaObjectId" in pdfs.columns)
-    ):
-        pdfs["r:midpointMjdTai"] = pdfs["r:midpointMjdTai"].astype(float)
-        pdfs = pdfs.loc[pdfs.groupby("r:diaObjectId")["r:midpointMjdTai"].idxmax()]
+    if group_alerts and (time_column in pdfs.columns) and (id_column in pdfs.columns):
+        pdfs[time_column] = pdfs[time_column].astype(float)
+        pdfs = pdfs.loc[pdfs.groupby(id_column)[time_column].idxmax()]
 
     # sort values by time
-    if "r:midpointMjdTai" in pdfs.columns:
-        pdfs = pdfs.sort_values("r:midpointMjdTai", ascending=False)
+    if time_column in pdfs.columns:
+        pdfs = pdfs.sort_values(time_column, ascending=False)
 
     return pdfs
 
@@ -255,9 +276,13 @@ def hbase_to_dict(hbase_output, escape_slash=False):
 
     # We do bulk export to JSON on Java side to avoid overheads of iterative access
     # and then parse it back to Dict in Python
-    if escape_slash:
-        hbase_output = str(hbase_output)
-    optimized = json.loads(GSONObject().toJson(hbase_output))
+    with stage("transfer") as record:
+        if escape_slash:
+            hbase_output = str(hbase_output)
+        content = GSONObject().toJson(hbase_output)
+        optimized = json.loads(content)
+        record.rows = len(optimized)
+        record.nbytes = len(content)
 
     return optimized
 
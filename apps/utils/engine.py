@@ -0,0 +1,663 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Survey-agnostic query engine
+
+Fink/ZTF and Fink/LSST store their alerts with the same layout: objects
+keyed by their (salted) identifier, and HEALPix pixel tables keyed
+`<pixel>_<time>...` (see `apps.utils.healpix` and `apps.utils.pixel_index`).
+A `Survey` describes the conventions of a survey (table names, rowkey
+salting, identifier, time and coordinate columns, decoding), and the
+functions of this module implement the scans, decoding and post-filters
+once for both surveys. Routes are thin configurations over them:
+
+    extract_objects(LSST, payload, table="sources")
+"""
+
+import astropy.units as u
+import numpy as np
+import pandas as pd
+from astropy.time import Time
+from flask import Response
+from numpy import pi as nppi
+
+from apps.utils.admission import (
+    admission_config,
+    admit,
+    cap_rows,
+    pixel_rows,
+    query_cost,
+)
+from apps.utils.client import connect_to_hbase_table
+from apps.utils.coordinates import angular_separation, radec2vec
+from apps.utils.crossmatch import crossmatch_catalog, read_catalog
+from apps.utils.cursor import paginate, read_cursor
+from apps.utils.decoding import format_hbase_output, format_lsst_hbase_output
+from apps.utils.healpix import scan_key_ranges, scan_pixels, select_pixel_table
+from apps.utils.pixel_index import format_mjd, scan_pixels_in_time
+from apps.utils.profiling import profile
+from apps.utils.skymap import load_credible_levels
+from apps.utils.utils import extract_configuration, isoify_time
+
+
+def lsst_salt(identifier: str) -> str:
+    """Rowkey prefix of a Rubin identifier, salted with its last 3 digits
+
+    Examples
+    --------
+    >>> lsst_salt("170032915988086819")
+    '819_170032915988086819'
+    """
+    return f"{identifier[-3:]}_{identifier}"
+
+
+def jd_from_iso(date: str) -> float:
+    """Julian date of an ISO date (UTC)
+
+    Examples
+    --------
+    >>> jd_from_iso("2021-06-10 12:00:00")
+    2459376.0
+    """
+    return float(Time(date).jd)
+
+
+def mjd_tai_from_iso(date: str) -> float:
+    """Modified Julian date (TAI) of an ISO date (UTC)
+
+    Examples
+    --------
+    >>> round(mjd_tai_from_iso("2025-10-01 00:00:00"), 6)
+    60949.000428
+    """
+    return float(Time(date, scale="utc").tai.mjd)
+
+
+class Survey:
+    """Tables and conventions of a survey
+
+    Parameters
+    ----------
+    name: str
+        Name of the survey (ztf, lsst), as used in config.yml
+    id_column: str
+        Column of the object identifier. The payload argument is
+        its name without family, e.g. `objectId` for `i:objectId`.
+    ra_column: str
+        Column of the Right Ascension, in degree
+    dec_column: str
+        Column of the Declination, in degree
+    time_column: str
+        Column of the time of the alerts
+    tables: dict
+        HBase tables, keyed by role: objects, cutouts, and optionally
+        sources and fp
+    salt: callable
+        Rowkey of an identifier, e.g. `lsst_salt`
+    decode: callable
+        Decoding of HBase rows, e.g. `format_hbase_output`
+    to_time: callable
+        Conversion of an ISO date to the unit of `time_column`
+    time_key: callable
+        Format of the times in the rowkeys of the time-keyed pixel tables
+    cutouts: dict
+        Columns of the cutouts table: `id` (identifier of the alert, also
+        the payload argument), `path` (HDFS path of the alert), and
+        optionally `candidate` (alert within the rows of `id`). `suffix` is
+        appended to the names of the cutouts returned as arrays.
+    first_detection_column: str, optional
+        If set, time-bounded conesearches only keep alerts first detected
+        after the start date, evaluated on this column.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        id_column: str,
+        ra_column: str,
+        dec_column: str,
+        time_column: str,
+        tables: dict,
+        salt,
+        decode,
+        to_time,
+        time_key,
+        cutouts: dict,
+        first_detection_column: str = None,
+    ):
+        self.name = name
+        self.id_column = id_column
+        self.ra_column = ra_column
+        self.dec_column = dec_column
+        self.time_column = time_column
+        self.tables = tables
+        self.salt = salt
+        self.decode = decode
+        self.to_time = to_time
+        self.time_key = time_key
+        self.cutouts = cutouts
+        self.first_detection_column = first_detection_column
+
+    @property
+    def id_arg(self) -> str:
+        """Name of the payload argument holding identifiers"""
+        return self.id_column.split(":")[1]
+
+    def rowkey(self, identifier: str, *suffixes) -> str:
+        """Rowkey (or rowkey prefix) of an identifier
+
+        Examples
+        --------
+        >>> LSST.rowkey("170032915988086819", "60000.5")
+        '819_170032915988086819_60000.5'
+        >>> ZTF.rowkey("ZTF21abfmbix")
+        'ZTF21abfmbix'
+        """
+        return "_".join([self.salt(identifier), *suffixes])
+
+    def pixel_tables(self) -> list:
+        """Pixel tables of the survey (`PIXEL_TABLES` in config.yml)"""
+        return extract_configuration("config.yml")["PIXEL_TABLES"][self.name]
+
+    def time_index(self) -> dict:
+        """Pixel table keyed `<pixel>_<time>`, for time-bounded scans
+
+        This is the time index of `PIXEL_TIME_INDEX` in config.yml if any,
+        or else the first pixel table, whose rows are already keyed by time.
+        """
+        config = extract_configuration("config.yml")
+        index = config.get("PIXEL_TIME_INDEX", {}).get(self.name)
+        if index is not None:
+            return index
+        table = config["PIXEL_TABLES"][self.name][0]
+        return {**table, "source": table["table"]}
+
+
+ZTF = Survey(
+    name="ztf",
+    id_column="i:objectId",
+    ra_column="i:ra",
+    dec_column="i:dec",
+    time_column="i:jd",
+    tables={"objects": "ztf", "cutouts": "ztf.cutouts"},
+    salt=str,
+    decode=format_hbase_output,
+    to_time=jd_from_iso,
+    time_key=str,
+    cutouts={
+        "id": "i:objectId",
+        "path": "d:hdfs_path",
+        "candidate": "i:candid",
+        "suffix": "_stampData",
+    },
+)
+
+LSST = Survey(
+    name="lsst",
+    id_column="r:diaObjectId",
+    ra_column="r:ra",
+    dec_column="r:dec",
+    time_column="r:midpointMjdTai",
+    tables={
+        "objects": "rubin.diaObject",
+        "sources": "rubin.diaSource_static",
+        "fp": "rubin.fp",
+        "cutouts": "rubin.cutouts",
+    },
+    salt=lsst_salt,
+    decode=format_lsst_hbase_output,
+    to_time=mjd_tai_from_iso,
+    time_key=format_mjd,
+    cutouts={"id": "r:diaSourceId", "path": "r:hdfs_path", "suffix": ""},
+    first_detection_column="f:firstDiaSourceMjdTaiFink",
+)
+
+SURVEYS = {"ztf": ZTF, "lsst": LSST}
+
+
+def requested_columns(payload: dict, required: list = ()) -> str:
+    """Columns to transfer, with the columns required by the route
+
+    Examples
+    --------
+    >>> requested_columns({"columns": "i:jd, i:magpsf"}, ["i:ra", "i:jd"])
+    'i:jd,i:magpsf,i:ra'
+    >>> requested_columns({}, ["i:ra"])
+    '*'
+    """
+    if "columns" not in payload:
+        return "*"
+
+    cols = payload["columns"].replace(" ", "")
+    for col in required:
+        if col not in cols:
+            cols = ",".join([cols, col])
+    return cols
+
+
+def parse_ids(value: str) -> list:
+    """Identifiers of a comma-separated list, in order and without duplicates
+
+    Examples
+    --------
+    >>> parse_ids("ZTF19acmdpyr, ZTF21aaxtctv,ZTF19acmdpyr")
+    ['ZTF19acmdpyr', 'ZTF21aaxtctv']
+    """
+    return list(dict.fromkeys(i.strip() for i in str(value).split(",")))
+
+
+def time_bounds(survey: Survey, payload: dict) -> tuple:
+    """Time range of `startdate`, `window` and `stopdate`, in the survey unit
+
+    Returns
+    -------
+    start: float or None
+        Lower bound, None if not bounded
+    stop: float or None
+        Upper bound, None if not bounded
+
+    Examples
+    --------
+    >>> time_bounds(ZTF, {"startdate": "2021-06-10 12:00:00", "window": 2})
+    (2459376.0, 2459378.0)
+    >>> time_bounds(ZTF, {})
+    (None, None)
+    """
+    start, stop = None, None
+    if "startdate" in payload:
+        start = survey.to_time(isoify_time(payload["startdate"]))
+        if "window" in payload:
+            stop = start + float(payload["window"])
+    if "stopdate" in payload:
+        stop = survey.to_time(isoify_time(payload["stopdate"]))
+    return start, stop
+
+
+@profile
+def scan_rowkeys(client, prefixes: list, cols: str) -> dict:
+    """Scan all rows of a list of rowkey prefixes, e.g. one per object
+
+    Parameters
+    ----------
+    client: com.Lomikel.HBaser.HBaseClient
+        Client connected to a table
+    prefixes: list of str
+        Rowkey prefixes, e.g. given by `Survey.rowkey`
+    cols: str
+        Comma-separated column names to transfer, or `*`
+
+    Returns
+    -------
+    results: dict
+        HBase rows, keyed by rowkey
+    """
+    bounds = [(prefix, None) for prefix in dict.fromkeys(prefixes)]
+    return scan_key_ranges(client, bounds, cols)
+
+
+@profile
+def extract_objects(
+    survey: Survey,
+    payload: dict,
+    table: str = "objects",
+    suffix: str = None,
+    scans_per_object: int = 1,
+):
+    """Rows of a list of objects, e.g. for /api/v1/objects
+
+    Parameters
+    ----------
+    survey: Survey
+        Survey of the objects
+    payload: dict
+        User payload, with a comma-separated list of identifiers
+        in `survey.id_arg`, and optionally `columns`
+    table: str, optional
+        Role of the table in `survey.tables`. Default is objects.
+    suffix: str, optional
+        If set, and for a single object only, appended to its rowkey
+        to select some of its rows (e.g. a time). Default is None.
+    scans_per_object: int, optional
+        Number of scans per object made by the route, for the admission
+        control (e.g. with upper limits). Default is 1.
+
+    Returns
+    -------
+    out: pd.DataFrame or Response
+        Rows of the objects, or a Response with the error
+    """
+    cols = requested_columns(payload)
+
+    ids = parse_ids(payload[survey.id_arg])
+    if len(ids) == 1 and suffix is not None:
+        prefixes = [survey.rowkey(ids[0], str(suffix))]
+    else:
+        prefixes = [survey.rowkey(i) for i in ids]
+
+    nscans = len(prefixes) * scans_per_object
+    rep = admit(
+        query_cost(nscans * admission_config()["rows_per_object"], nscans),
+        "Split the list of objects into several queries, or submit it as a job (/api/v1/jobs).",
+    )
+    if rep is not None:
+        return rep
+
+    client = connect_to_hbase_table(survey.tables[table])
+    results = scan_rowkeys(client, prefixes, cols)
+    schema_client = client.schema()
+    client.close()
+
+    return survey.decode(
+        results,
+        schema_client,
+        group_alerts=False,
+        truncated=cols != "*",
+    )
+
+
+@profile
+def conesearch(survey: Survey, payload: dict):
+    """Last alert of the objects within a cone, e.g. for /api/v1/conesearch
+
+    Pixels are scanned by rowkey ranges on the cheapest pixel table. With
+    a time range, pixels are scanned within the range on the time index
+    (see `Survey.time_index`).
+
+    Parameters
+    ----------
+    survey: Survey
+        Survey of the alerts
+    payload: dict
+        User payload, see /api/v1/conesearch
+
+    Returns
+    -------
+    out: pd.DataFrame or Response
+        Alerts sorted by distance to the center of the cone, or a
+        Response with the error
+    """
+    from astropy.coordinates import SkyCoord
+    from healpy import ang2vec, query_disc
+
+    # The time is used for grouping alerts
+    cols = requested_columns(
+        payload, [survey.ra_column, survey.dec_column, survey.time_column]
+    )
+
+    n = cap_rows(int(payload.get("n", 1000)))
+
+    # Interpret user input
+    ra, dec = payload["ra"], payload["dec"]
+    radius = payload["radius"]
+
+    if float(radius) > 18000.0:
+        rep = {
+            "status": "error",
+            "text": "`radius` cannot be bigger than 18,000 arcseconds (5 degrees).\n",
+        }
+        return Response(str(rep), 400)
+
+    try:
+        if "h" in str(ra):
+            coord = SkyCoord(ra, dec, frame="icrs")
+        elif ":" in str(ra) or " " in str(ra):
+            coord = SkyCoord(ra, dec, frame="icrs", unit=(u.hourangle, u.deg))
+        else:
+            coord = SkyCoord(ra, dec, frame="icrs", unit="deg")
+    except ValueError as e:
+        rep = {
+            "status": "error",
+            "text": e,
+        }
+        return Response(str(rep), 400)
+
+    start, stop = time_bounds(survey, payload)
+    bounded = start is not None or stop is not None
+
+    # Filter out alerts that vary in the past, during the scan
+    # FIXME: does not work yet for LSST as firstDiaSourceMjdTai is not populated
+    first = survey.first_detection_column
+    conditions = []
+    if bounded and first is not None:
+        if cols != "*" and first not in cols:
+            rep = {
+                "status": "error",
+                "text": f"You need to specify {first} in the columns to filter on dates.\n",
+            }
+            return Response(str(rep), 400)
+        if start is not None:
+            conditions.append(f"{first.split(':')[1]} >= {start}")
+
+    ra = coord.ra.deg
+    dec = coord.dec.deg
+    radius_deg = float(radius) / 3600.0
+
+    # angle to vec conversion
+    vec = ang2vec(nppi / 2.0 - nppi / 180.0 * dec, nppi / 180.0 * ra)
+
+    # Choose the resolution based on the radius
+    config = extract_configuration("config.yml")
+    pixel_table, pixs, cost_model = select_pixel_table(
+        survey.pixel_tables(),
+        vec,
+        nppi / 180 * radius_deg,
+        config["SCAN_COST"],
+        coalesce=not bounded,
+    )
+    nside = int(pixel_table["nside"])
+
+    # Scans stop after n + 1 rows. The time index is read with one
+    # scan per pixel.
+    estimate = next(c for c in cost_model if c["table"] == pixel_table["table"])
+    nscans = estimate["scans"]
+    if bounded:
+        pixel_table = survey.time_index()
+        if int(pixel_table["nside"]) != nside:
+            nside = int(pixel_table["nside"])
+            pixs = query_disc(nside, vec, nppi / 180 * radius_deg, inclusive=True)
+        nscans = len(np.unique(pixs))
+
+    rep = admit(
+        query_cost(min(estimate["rows"], n + 1), nscans),
+        "Reduce the `radius`, or the number of alerts `n`.",
+    )
+    if rep is not None:
+        return rep
+
+    # Resume from the previous page, if any
+    cursor_key = read_cursor(payload, reverse=False)
+    if isinstance(cursor_key, Response):
+        return cursor_key
+
+    # One more row is read to know if a next page exists.
+    client = connect_to_hbase_table(pixel_table["table"])
+    client.setLimit(n + 1)
+    if len(conditions) > 0:
+        client.setEvaluation(" && ".join(conditions))
+
+    if bounded:
+        results = scan_pixels_in_time(
+            client,
+            pixs,
+            cols,
+            start,
+            stop,
+            nmax=n + 1,
+            start_key=cursor_key,
+            time_key=survey.time_key,
+        )
+    else:
+        results = scan_pixels(
+            client, pixs, nside, cols, nmax=n + 1, start_key=cursor_key
+        )
+    cursor = paginate(results, n)
+
+    schema_client = client.schema()
+    client.close()
+
+    pdf = survey.decode(
+        results,
+        schema_client,
+        truncated=True,
+        group_alerts=True,
+        extract_color=False,
+    )
+
+    pdf.attrs["cost_model"] = cost_model
+    pdf.attrs["cursor"] = cursor
+
+    # Filter and sort by distance
+    if len(pdf) > 0:
+        sep = angular_separation(
+            vec,
+            radec2vec(
+                pdf[survey.ra_column].to_numpy(dtype=float),
+                pdf[survey.dec_column].to_numpy(dtype=float),
+            ),
+        )
+
+        mask = sep <= radius_deg
+        pdf = pdf[mask].assign(**{"v:separation_degree": sep[mask]})
+        pdf = pdf.sort_values("v:separation_degree", ascending=True)
+
+    return pdf
+
+
+@profile
+def search_skymap(survey: Survey, payload: dict) -> tuple:
+    """Last alert of the objects within a GW credible region and time window
+
+    Pixels of the credible region are scanned within the time window on
+    the time index (see `Survey.time_index`).
+
+    Parameters
+    ----------
+    survey: Survey
+        Survey of the alerts
+    payload: dict
+        User payload, see /api/v1/skymap
+
+    Returns
+    -------
+    out: pd.DataFrame or Response
+        Alerts, a DataFrame with the GraceDB error, or a Response
+        with the error
+    event_time: float or None
+        Time of the event in the unit of `survey.time_column`,
+        or None in case of error
+    """
+    # boundaries in day
+    n_day_before = float(payload.get("n_day_before", 1))
+    n_day_after = float(payload.get("n_day_after", 6))
+
+    index = survey.time_index()
+    nside = int(index["nside"])
+
+    # Interpret user input
+    credible_levels = load_credible_levels(payload, nside=nside)
+    if isinstance(credible_levels, (pd.DataFrame, Response)):
+        # GraceDB error propagation, or invalid upload
+        return credible_levels, None
+
+    pixs = credible_levels.pixels(float(payload["credible_level"]))
+    event_time = survey.to_time(credible_levels.date_obs)
+
+    # One scan per pixel, within the time range
+    density = next(
+        t["density"] for t in survey.pixel_tables() if t["table"] == index["source"]
+    )
+    npix = len(np.unique(pixs))
+    rows = pixel_rows(npix, nside, density, n_day_before + n_day_after, survey.name)
+    rep = admit(
+        query_cost(rows, npix),
+        "Lower the `credible_level`, reduce `n_day_before` and `n_day_after`, or submit the query as a job (/api/v1/jobs).",
+    )
+    if rep is not None:
+        return rep, None
+
+    client = connect_to_hbase_table(index["table"])
+    results = scan_pixels_in_time(
+        client,
+        pixs,
+        "*",
+        event_time - n_day_before,
+        event_time + n_day_after,
+        time_key=survey.time_key,
+    )
+    schema_client = client.schema()
+    client.close()
+
+    pdf = survey.decode(
+        results,
+        schema_client,
+        truncated=True,
+        group_alerts=True,
+        extract_color=False,
+    )
+
+    return pdf, event_time
+
+
+@profile
+def crossmatch(survey: Survey, payload: dict, files) -> tuple:
+    """Crossmatch a user catalog with the alerts, e.g. for /api/v1/crossmatch
+
+    Parameters
+    ----------
+    survey: Survey
+        Survey of the alerts
+    payload: dict
+        User payload, see /api/v1/crossmatch
+    files: dict
+        Uploaded files (`request.files`)
+
+    Returns
+    -------
+    out: pd.DataFrame or Response
+        Matched alerts, or a Response with the error
+    truncated: bool
+        True if the row budget has been exhausted
+    """
+    config = extract_configuration("config.yml")
+
+    catalog = read_catalog(payload, files)
+    if isinstance(catalog, Response):
+        return catalog, False
+
+    cols = requested_columns(
+        payload,
+        [survey.id_column, survey.ra_column, survey.dec_column, survey.time_column],
+    )
+
+    # The row budget cannot be raised above the server limit
+    nmax = min(
+        int(payload.get("n", config["CROSSMATCH_ROW_BUDGET"])),
+        config["CROSSMATCH_ROW_BUDGET"],
+    )
+    if nmax <= 0:
+        rep = {
+            "status": "error",
+            "text": "`n` must be a positive number of alerts.\n",
+        }
+        return Response(str(rep), 400), False
+
+    return crossmatch_catalog(
+        catalog,
+        survey.pixel_tables(),
+        survey.decode,
+        cols,
+        survey.ra_column,
+        survey.dec_column,
+        nmax,
+    )
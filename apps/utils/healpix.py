@@ -0,0 +1,335 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Utilities to scan HEALPix-indexed HBase tables
+
+Pixel tables (e.g. ztf.pixel128, rubin.pixel1024) have rowkeys starting
+with `<pixel>_`, where the pixel index (RING) is written in decimal. Rows
+are therefore sorted lexicographically, and not numerically: between
+`1234_` and `1235_` lie the rows of pixels 12340 to 12349 (and longer
+extensions), while pixel 123 lies between `1239_` and `1240_`.
+"""
+
+import numpy as np
+
+from apps.utils.profiling import profile
+
+
+def key_rank(pixs, nside: int):
+    """Return the position of pixels in the rowkey order of a pixel table
+
+    The rowkey order is the lexicographic order of `<pixel>_`. As `_` sorts
+    after digits, a pixel comes after all the pixels extending its decimal
+    representation (e.g. 12 comes after 120, 1200, ... but before 13).
+
+    Parameters
+    ----------
+    pixs: array of int
+        HEALPix pixel indices
+    nside: int
+        HEALPix resolution of the table
+
+    Returns
+    -------
+    out: np.array
+        Rank of each pixel among all the pixels of the sky, in rowkey order
+
+    Examples
+    --------
+    >>> nside = 4
+    >>> pixs = np.arange(12 * nside**2)
+    >>> by_key = sorted(pixs, key=lambda pix: f"{pix}_")
+    >>> np.array_equal(key_rank(by_key, nside), pixs)
+    True
+    """
+    pixs = np.asarray(pixs, dtype=np.int64)
+    npix = 12 * nside**2
+    ndigits = len(str(npix - 1))
+    powers = 10 ** np.arange(ndigits + 1, dtype=np.int64)
+
+    # number of digits of each pixel
+    digits = np.searchsorted(powers[1:], pixs, side="right") + 1
+
+    rank = np.zeros_like(pixs)
+    for e in range(1, ndigits + 1):
+        # pixels written with e digits are in [low, high)
+        low = 0 if e == 1 else powers[e - 1]
+        high = min(powers[e], npix)
+
+        # same length: numerical order
+        same = digits == e
+        rank[same] += pixs[same] - low
+
+        # shorter pixels come first if strictly below the pixel prefix
+        longer = digits > e
+        prefix = pixs[longer] // powers[digits[longer] - e]
+        rank[longer] += prefix - low
+
+        # longer pixels come first if their prefix is below or equal to the pixel
+        shorter = digits < e
+        bound = (pixs[shorter] + 1) * powers[e - digits[shorter]]
+        rank[shorter] += np.clip(bound, low, high) - low
+
+    return rank
+
+
+def pixels_to_key_ranges(pixs, nside: int, max_gap: int = 1):
+    """Coalesce pixels into contiguous rowkey ranges
+
+    Pixels that are adjacent in the rowkey order are grouped into a single
+    range. Two pixels separated by at most `max_gap` foreign pixels are also
+    grouped, and rows of foreign pixels must then be discarded after the
+    scan. This is required to coalesce runs of RING pixels, as a shorter
+    pixel is interleaved every 10 pixels (e.g. 123 between 1239 and 1240).
+
+    Parameters
+    ----------
+    pixs: array of int
+        HEALPix pixel indices
+    nside: int
+        HEALPix resolution of the table
+    max_gap: int, optional
+        Maximum number of foreign pixels allowed between
+        two consecutive pixels of a range. Default is 1.
+
+    Returns
+    -------
+    ranges: list of tuple
+        List of (first, last) pixels, in rowkey order
+    exact: bool
+        True if the ranges contain only the input pixels
+
+    Examples
+    --------
+    >>> pixels_to_key_ranges([1234, 1235, 1236], nside=1024)
+    ([(1234, 1234), (1235, 1235), (1236, 1236)], True)
+    >>> pixels_to_key_ranges([2345677, 2345678, 2345679], nside=1024)
+    ([(2345677, 2345679)], True)
+    >>> pixels_to_key_ranges([2345678, 2345679, 2345680], nside=1024)
+    ([(2345678, 2345680)], False)
+    """
+    pixs = np.unique(np.asarray(pixs, dtype=np.int64))
+    if len(pixs) == 0:
+        return [], True
+
+    rank = key_rank(pixs, nside)
+    order = np.argsort(rank)
+    pixs, rank = pixs[order], rank[order]
+
+    gaps = np.diff(rank) - 1
+    breaks = np.where(gaps > max_gap)[0]
+    firsts = np.concatenate([[0], breaks + 1])
+    lasts = np.concatenate([breaks, [len(pixs) - 1]])
+
+    ranges = [(int(pixs[i]), int(pixs[j])) for i, j in zip(firsts, lasts, strict=True)]
+    exact = bool(np.all(gaps[gaps <= max_gap] == 0))
+
+    return ranges, exact
+
+
+@profile
+def scan_key_ranges(
+    client, bounds: list, cols: str, nmax: int = None, start_key: str = None, keep=None
+) -> dict:
+    """Scan a list of rowkey ranges, in rowkey order
+
+    Parameters
+    ----------
+    client: com.Lomikel.HBaser.HBaseClient
+        Client connected to a table
+    bounds: list of tuple
+        List of (start, stop) rowkeys, sorted in rowkey order. If `stop`
+        is None, all rows prefixed by `start` are read.
+    cols: str
+        Comma-separated column names to transfer, or `*`
+    nmax: int, optional
+        If set, stop scanning once `nmax` rows have been read. It must
+        be the limit of the client: a range whose scan is cut off at
+        `nmax` rows is scanned again from its last rowkey, such that no
+        row is skipped when rows are removed by `keep`.
+        Default is None (scan all ranges).
+    start_key: str, optional
+        If set, skip all rows before this rowkey, and resume a previous
+        scan from it (see `apps.utils.cursor`).
+    keep: callable, optional
+        If set, only rows whose rowkey verifies `keep(rowkey)` are kept.
+
+    Returns
+    -------
+    results: dict
+        HBase rows, keyed by rowkey
+    """
+    results = {}
+    for start, stop in bounds:
+        if start_key is not None:
+            end = start + "~" if stop is None else stop
+            if end < start_key:
+                continue
+            if start < start_key:
+                start, stop = start_key, end
+
+        while True:
+            if stop is None:
+                client.setRangeScan(False)
+                to_search = f"key:key:{start}"
+            else:
+                client.setRangeScan(True)
+                to_search = f"key:key:{start},key:key:{stop}"
+            result = client.scan(
+                "",
+                to_search,
+                cols,
+                0,
+                True,
+                True,
+            )
+            if keep is not None:
+                results.update(
+                    {key: value for key, value in result.items() if keep(key)}
+                )
+            else:
+                results.update(result)
+            if nmax is None or len(results) >= nmax or len(result) < nmax:
+                break
+
+            # The scan was cut off by the limit: resume from its last row
+            last = max(result)
+            if last == start:
+                break
+            if stop is None:
+                stop = start + "~"
+            start = last
+        if nmax is not None and len(results) >= nmax:
+            break
+    client.setRangeScan(False)
+
+    return results
+
+
+@profile
+def scan_pixels(
+    client,
+    pixs,
+    nside: int,
+    cols: str,
+    max_gap: int = 1,
+    nmax: int = None,
+    start_key: str = None,
+) -> dict:
+    """Scan all rows of a set of pixels, using as few scans as possible
+
+    Parameters
+    ----------
+    client: com.Lomikel.HBaser.HBaseClient
+        Client connected to a pixel table
+    pixs: array of int
+        HEALPix pixel indices
+    nside: int
+        HEALPix resolution of the table
+    cols: str
+        Comma-separated column names to transfer, or `*`
+    max_gap: int, optional
+        See `pixels_to_key_ranges`. Default is 1.
+    nmax: int, optional
+        If set, stop scanning once `nmax` rows have been read. It must
+        be the limit of the client, see `scan_key_ranges`.
+        Default is None (scan all pixels).
+    start_key: str, optional
+        See `scan_key_ranges`. Default is None.
+
+    Returns
+    -------
+    results: dict
+        HBase rows, keyed by rowkey
+    """
+    ranges, exact = pixels_to_key_ranges(pixs, nside, max_gap=max_gap)
+    bounds = [
+        (f"{first}_", None) if first == last else (f"{first}_", f"{last}_~")
+        for first, last in ranges
+    ]
+
+    keep = None
+    if not exact:
+        # Remove rows from foreign pixels caught in the ranges
+        pixset = {str(pix) for pix in pixs}
+
+        def keep(key):
+            return key.split("_", 1)[0] in pixset
+
+    return scan_key_ranges(
+        client, bounds, cols, nmax=nmax, start_key=start_key, keep=keep
+    )
+
+
+@profile
+def select_pixel_table(
+    pixel_tables: list, vec, radius: float, scan_cost: float, coalesce: bool = True
+):
+    """Choose the pixel table minimising the cost of a conesearch
+
+    The cost of a conesearch at a given resolution is modelled as the number
+    of rows read (coarse pixels pull many rows outside the cone), plus the
+    number of scans issued (fine pixels need many scans for large cones)
+    weighted by `scan_cost`.
+
+    Parameters
+    ----------
+    pixel_tables: list of dict
+        Available pixel tables, with keys `table`, `nside` and
+        `density` (mean number of rows per square degree).
+    vec: np.array
+        Unit vector of the cone center
+    radius: float
+        Cone radius, in radian
+    scan_cost: float
+        Cost of issuing one scan, in number of rows read
+    coalesce: bool, optional
+        If True, pixels are scanned by rowkey ranges (see `scan_pixels`).
+        Otherwise one scan per pixel is issued. Default is True.
+
+    Returns
+    -------
+    table: dict
+        Entry of `pixel_tables` with the lowest cost
+    pixs: np.array
+        Pixels of the selected table intersecting the cone
+    cost_model: list of dict
+        Estimated pixels, scans, rows and cost for each table
+    """
+    from healpy import nside2pixarea, query_disc
+
+    cost_model = []
+    candidates = []
+    for entry in pixel_tables:
+        nside = int(entry["nside"])
+        pixs = query_disc(nside, vec, radius, inclusive=True)
+        if coalesce:
+            nscans = len(pixels_to_key_ranges(pixs, nside)[0])
+        else:
+            nscans = len(pixs)
+        nrows = len(pixs) * nside2pixarea(nside, degrees=True) * entry["density"]
+        cost_model.append(
+            {
+                "table": entry["table"],
+                "nside": nside,
+                "pixels": len(pixs),
+                "scans": nscans,
+                "rows": int(nrows),
+                "cost": float(nscans * scan_cost + nrows),
+            }
+        )
+        candidates.append(pixs)
+
+    best = int(np.argmin([c["cost"] for c in cost_model]))
+    return pixel_tables[best], candidates[best], cost_model
@@ -0,0 +1,576 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Asynchronous jobs, for queries too long for a synchronous request
+
+A job runs the function of a route (e.g. `search_in_skymap`) on a user
+payload, and writes the resulting table as parquet. Jobs are stored on
+the local disk, one folder per job, such that any worker of the machine
+can report their status and send their results:
+
+    <JOBS.path>/<survey>/<job id>/status.json
+    <JOBS.path>/<survey>/<job id>/result.parquet
+
+Queued jobs are run by a separate runner, such that they outlive the
+gunicorn workers, which are recycled and killed on timeouts (see
+install/fink_jobs@.service):
+
+    python -m apps.utils.jobs --survey ztf
+
+For small deployments, they can also run in `JOBS.threads` background
+threads of each API worker, started after gunicorn forks it. Jobs of a
+worker are then interrupted when the worker is recycled.
+
+The `/api/v1/jobs` namespace is the same for all surveys (see
+`jobs_namespace`). Routes that can run as jobs are listed in
+`apps/routes/v1/<survey>/jobs/utils.py`.
+
+At most `JOBS.limits[route]` jobs of a route run at the same time on the
+machine. Jobs are deleted `JOBS.ttl` seconds after their end.
+
+At most `JOBS.max_queued` jobs of a survey wait in the queue, of which
+`JOBS.max_queued_per_client` per client. Other submissions are rejected
+(429) with a `Retry-After` header, as expensive queries are (see
+apps/utils/admission.py).
+"""
+
+import argparse
+import fcntl
+import importlib
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+from flask import Response, request
+from flask_restx import Namespace, Resource, fields
+
+from apps.utils.utils import (
+    atomic_write,
+    check_args,
+    extract_configuration,
+    send_tabular_data,
+)
+
+_LOG = logging.getLogger(__name__)
+
+# Time between two cleanups of the expired jobs, in second
+CLEANUP_INTERVAL = 60
+
+# Time before submitting again when the queue is full, in second
+RETRY_AFTER = 60
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+# Surveys whose application serves /api/v1/jobs
+_SURVEYS = set()
+
+
+def pid_alive(pid: int) -> bool:
+    """Return True if a process of this machine is running"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """Queue, run and keep the results of the jobs of a survey
+
+    Parameters
+    ----------
+    directory: str
+        Folder of the jobs, created if needed
+    routes: dict
+        Functions that can run as jobs, keyed by route name. Functions
+        take a payload, and return a DataFrame or an error Response.
+    limits: dict
+        Maximum number of running jobs per route, on the machine
+    ttl: float
+        Lifetime of the jobs after their end, in second
+    poll_interval: float
+        Time between two looks for queued jobs, in second
+    max_queued: int
+        Maximum number of queued jobs
+    max_queued_per_client: int
+        Maximum number of queued jobs of a client
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        routes: dict,
+        limits: dict,
+        ttl: float,
+        poll_interval: float,
+        max_queued: int,
+        max_queued_per_client: int,
+    ):
+        self.directory = directory
+        self.routes = routes
+        self.limits = limits
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.max_queued = max_queued
+        self.max_queued_per_client = max_queued_per_client
+        self.hostname = socket.gethostname()
+        self.pid = None
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, job_id: str, name: str = "") -> str:
+        return os.path.join(self.directory, job_id, name)
+
+    @contextmanager
+    def locked(self):
+        """Exclusive access to the queue, among all processes"""
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def read(self, job_id: str):
+        """Return the status of a job, or None if it does not exist"""
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self.path(job_id, "status.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def write(self, status: dict):
+        content = json.dumps(status, default=str).encode()
+        atomic_write(self.path(status["id"], "status.json"), lambda f: f.write(content))
+
+    def jobs(self) -> list:
+        """Return the status of all jobs"""
+        out = []
+        for job_id in os.listdir(self.directory):
+            status = self.read(job_id)
+            if status is not None:
+                out.append(status)
+        return out
+
+    def submit(self, route: str, payload: dict, client: str = "") -> dict:
+        """Queue a job, and return its status
+
+        Returns
+        -------
+        out: dict or None
+            Status of the job, or None if the queue is full for `client`
+        """
+        with self.locked():
+            queued = [status for status in self.jobs() if status["status"] == "queued"]
+            mine = [status for status in queued if status.get("client") == client]
+            if (
+                len(queued) >= self.max_queued
+                or len(mine) >= self.max_queued_per_client
+            ):
+                return None
+
+            job_id = uuid.uuid4().hex
+            os.makedirs(self.path(job_id))
+            status = {
+                "id": job_id,
+                "route": route,
+                "status": "queued",
+                "payload": dict(payload),
+                "client": client,
+                "submitted": time.time(),
+            }
+            self.write(status)
+        return status
+
+    def claim(self):
+        """Mark the oldest queued job that can run as running, and return it
+
+        Returns
+        -------
+        out: dict or None
+            Status of the job, or None if no job can run
+        """
+        with self.locked():
+            jobs = self.jobs()
+            running = {}
+            for status in jobs:
+                if status["status"] == "running":
+                    running[status["route"]] = running.get(status["route"], 0) + 1
+
+            queued = [status for status in jobs if status["status"] == "queued"]
+            for status in sorted(queued, key=lambda status: status["submitted"]):
+                limit = int(self.limits.get(status["route"], 1))
+                if running.get(status["route"], 0) < limit:
+                    status.update(
+                        status="running",
+                        started=time.time(),
+                        host=self.hostname,
+                        pid=os.getpid(),
+                    )
+                    self.write(status)
+                    return status
+        return None
+
+    def run(self, status: dict):
+        """Run a claimed job, and write its result"""
+        try:
+            out = self.routes[status["route"]](status["payload"])
+            if isinstance(out, Response):
+                status.update(
+                    status="failed",
+                    code=out.status_code,
+                    error=out.get_data(as_text=True),
+                )
+            else:
+                atomic_write(
+                    self.path(status["id"], "result.parquet"),
+                    lambda f: out.to_parquet(f),
+                )
+                status.update(status="done", rows=len(out))
+        except Exception as e:
+            _LOG.exception(f"Job {status['id']} failed")
+            status.update(status="failed", code=500, error=str(e))
+        status.update(finished=time.time(), expires=time.time() + self.ttl)
+        self.write(status)
+
+    def cleanup(self):
+        """Delete expired jobs, and fail jobs whose process died"""
+        now = time.time()
+        with self.locked():
+            for status in self.jobs():
+                if status.get("expires", now + 1) < now or (
+                    status["status"] == "queued"
+                    and status["submitted"] + self.ttl < now
+                ):
+                    shutil.rmtree(self.path(status["id"]), ignore_errors=True)
+                elif (
+                    status["status"] == "running"
+                    and status["host"] == self.hostname
+                    and not pid_alive(status["pid"])
+                ):
+                    status.update(
+                        status="failed",
+                        code=500,
+                        error="The job was interrupted. Submit it again.",
+                        finished=now,
+                        expires=now + self.ttl,
+                    )
+                    self.write(status)
+
+    def work(self, threads: int, stop: threading.Event = None):
+        """Run queued jobs with `threads` threads, until `stop` is set"""
+        running = threading.BoundedSemaphore(threads)
+        last_cleanup = 0.0
+        while stop is None or not stop.is_set():
+            if time.time() - last_cleanup > CLEANUP_INTERVAL:
+                self.cleanup()
+                last_cleanup = time.time()
+
+            if not running.acquire(timeout=self.poll_interval):
+                continue
+            status = self.claim()
+            if status is None:
+                running.release()
+                time.sleep(self.poll_interval)
+                continue
+
+            def target(status=status):
+                try:
+                    self.run(status)
+                finally:
+                    running.release()
+
+            threading.Thread(target=target, daemon=True).start()
+
+    def start(self, threads: int):
+        """Run queued jobs in background threads of this process
+
+        Threads are started once per process, e.g. after gunicorn forks.
+        """
+        with self.lock:
+            if threads <= 0 or self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+        threading.Thread(target=self.work, args=(threads,), daemon=True).start()
+
+
+def job_routes(survey: str):
+    """Return the routes that can run as jobs, and their arguments
+
+    Returns
+    -------
+    routes: dict
+        Functions of the routes, keyed by route name
+    args: dict
+        flask-restx models of the arguments of the routes
+    """
+    module = importlib.import_module(f"apps.routes.v1.{survey}.jobs.utils")
+    return module.JOB_ROUTES, module.JOB_ARGS
+
+
+def job_store(survey: str) -> JobStore:
+    """Return the job store of a survey, shared by all requests"""
+    with _STORES_LOCK:
+        if survey not in _STORES:
+            config = extract_configuration("config.yml")["JOBS"]
+            _STORES[survey] = JobStore(
+                os.path.join(config["path"], survey),
+                job_routes(survey)[0],
+                config["limits"],
+                float(config["ttl"]),
+                float(config["poll_interval"]),
+                int(config["max_queued"]),
+                int(config["max_queued_per_client"]),
+            )
+    return _STORES[survey]
+
+
+def start_job_threads():
+    """Start the job threads of this process, if `JOBS.threads` > 0
+
+    Called after gunicorn forks a worker (see config_prometheus.py).
+    """
+    threads = int(extract_configuration("config.yml")["JOBS"]["threads"])
+    for survey in sorted(_SURVEYS):
+        job_store(survey).start(threads)
+
+
+def submit_job(survey: str, payload: dict) -> Response:
+    """Queue a job, and return its status
+
+    Parameters
+    ----------
+    survey: str
+        ztf or lsst
+    payload: dict
+        `route`, and the arguments of the route
+
+    Returns
+    -------
+    out: Response
+        Status of the job (202), or the error
+    """
+    routes, args = job_routes(survey)
+    payload = dict(payload)
+    route = payload.pop("route")
+    if route not in routes:
+        rep = {
+            "status": "error",
+            "text": f"`{route}` cannot run as a job. Choose among {', '.join(routes)}.\n",
+        }
+        return Response(str(rep), 400)
+
+    rep = check_args(args[route], payload)
+    if rep["status"] != "ok":
+        return Response(str(rep), 400)
+
+    status = job_store(survey).submit(route, payload, request.access_route[0])
+    if status is None:
+        rep = {
+            "status": "error",
+            "text": "Too many jobs are waiting in the queue. Retry later, or wait for your jobs to end.\n",
+        }
+        return Response(str(rep), 429, headers={"Retry-After": str(RETRY_AFTER)})
+
+    return Response(json.dumps(public_status(status)), 202, mimetype="application/json")
+
+
+def read_job(survey: str, job_id: str):
+    """Return the status of a job, or a Response if it does not exist"""
+    status = job_store(survey).read(job_id)
+    if status is None:
+        rep = {
+            "status": "error",
+            "text": f"Job `{job_id}` does not exist, or its results have expired.\n",
+        }
+        return Response(str(rep), 404)
+    return status
+
+
+def send_job_result(survey: str, job_id: str, output_format: str) -> Response:
+    """Send the result of a job
+
+    Parameters
+    ----------
+    survey: str
+        ztf or lsst
+    job_id: str
+        Identifier returned when submitting the job
+    output_format: str
+        Output format: parquet, json, csv, votable.
+
+    Returns
+    -------
+    out: Response
+        Result, or the error if the job is not done
+    """
+    status = read_job(survey, job_id)
+    if isinstance(status, Response):
+        return status
+
+    if status["status"] != "done":
+        rep = {
+            "status": "error",
+            "text": f"Job `{job_id}` is {status['status']}, its result is not available. {status.get('error', '')}\n",
+        }
+        return Response(str(rep), 409)
+
+    path = job_store(survey).path(job_id, "result.parquet")
+    if output_format == "parquet":
+        with open(path, "rb") as f:
+            response = Response(f.read(), 200)
+        response.headers.set("Content-Type", "parquet")
+        return response
+
+    return send_tabular_data(pd.read_parquet(path), output_format)
+
+
+def jobs_namespace(survey: str, data: str) -> Namespace:
+    """Return the `/api/v1/jobs` namespace of a survey
+
+    Parameters
+    ----------
+    survey: str
+        ztf or lsst
+    data: str
+        Name of the data in the description, e.g. `Fink/ZTF`
+    """
+    _SURVEYS.add(survey)
+    ns = Namespace(
+        "api/v1/jobs",
+        f"Run long queries (objects, skymap, sso) as asynchronous jobs on {data} data",
+    )
+
+    ARGS = ns.model(
+        "jobs",
+        {
+            "route": fields.String(
+                description="Route to run as a job, among objects, skymap, sso. Other arguments are the ones of the route, e.g. `n_or_d` and `withEphem` for sso.",
+                example="sso",
+                required=True,
+            ),
+        },
+    )
+
+    ARGS_STATUS = ns.model(
+        "jobs_status",
+        {
+            "id": fields.String(
+                description="Identifier of the job, returned when submitting it.",
+                example="6f1c0c2b5c0a4b7e9d4e8a1f3b2c9d70",
+                required=True,
+            ),
+        },
+    )
+
+    ARGS_RESULT = ns.model(
+        "jobs_result",
+        {
+            "id": fields.String(
+                description="Identifier of the job, returned when submitting it.",
+                example="6f1c0c2b5c0a4b7e9d4e8a1f3b2c9d70",
+                required=True,
+            ),
+            "output-format": fields.String(
+                description="Output format among json, csv, parquet[default], votable.",
+                example="parquet",
+                required=False,
+            ),
+        },
+    )
+
+    @ns.route("")
+    @ns.doc(params={k: ARGS_STATUS[k].description for k in ARGS_STATUS})
+    class Jobs(Resource):
+        def get(self):
+            """Return the status of a job: queued, running, done, or failed"""
+            payload = request.args
+            if len(payload) == 0:
+                return Response(ns.description, 200)
+
+            rep = check_args(ARGS_STATUS, payload)
+            if rep["status"] != "ok":
+                return Response(str(rep), 400)
+
+            status = read_job(survey, payload["id"])
+
+            # Error propagation
+            if isinstance(status, Response):
+                return status
+
+            return public_status(status)
+
+        @ns.expect(ARGS, location="json", as_dict=True)
+        def post(self):
+            """Submit a job, and return its identifier"""
+            payload = request.json
+
+            rep = check_args(ARGS, payload)
+            if rep["status"] != "ok":
+                return Response(str(rep), 400)
+
+            return submit_job(survey, payload)
+
+    @ns.route("/result")
+    @ns.doc(params={k: ARGS_RESULT[k].description for k in ARGS_RESULT})
+    class JobResult(Resource):
+        def get(self):
+            """Download the result of a job"""
+            payload = request.args
+
+            rep = check_args(ARGS_RESULT, payload)
+            if rep["status"] != "ok":
+                return Response(str(rep), 400)
+
+            output_format = payload.get("output-format", "parquet")
+            return send_job_result(survey, payload["id"], output_format)
+
+    return ns
+
+
+def public_status(status: dict) -> dict:
+    """Return the status of a job, as sent to users
+
+    Examples
+    --------
+    >>> public_status({"id": "a1", "status": "queued", "payload": {}, "client": "::1"})
+    {'id': 'a1', 'status': 'queued'}
+    """
+    return {
+        key: value
+        for key, value in status.items()
+        if key not in ["payload", "pid", "host", "client"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the queued jobs of a survey")
+    parser.add_argument("--survey", choices=["ztf", "lsst"], required=True)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    job_store(args.survey).work(args.threads)
+
+
+if __name__ == "__main__":
+    main()
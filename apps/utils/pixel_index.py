@@ -0,0 +1,257 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Time-partitioned pixel tables
+
+The time index of a pixel table (e.g. rubin.pixel1024_mjd for
+rubin.pixel1024) holds the same columns, but rows are keyed
+`<pixel>_<mjd>_<diaObjectId>`. All alerts of a pixel emitted within a
+time range are therefore contiguous, and can be read with a single
+range scan.
+
+The index is filled at ingestion time with `write_pixel_time_index`,
+and existing data can be migrated with:
+
+    python -m apps.utils.pixel_index --survey lsst --create
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from apps.utils.client import connect_to_hbase_table, create_or_update_hbase_table
+from apps.utils.healpix import key_rank, scan_key_ranges, scan_pixels
+from apps.utils.profiling import profile
+from apps.utils.utils import extract_configuration
+
+
+def format_mjd(mjd: float) -> str:
+    """Format a MJD such that the lexicographic order is the time order
+
+    Examples
+    --------
+    >>> format_mjd(60000.5)
+    '60000.500000'
+    >>> format_mjd(9999.5) < format_mjd(60000.5)
+    True
+    """
+    return f"{mjd:012.6f}"
+
+
+def time_rowkey(pix: int, mjd: float, objectid) -> str:
+    """Rowkey of an alert in a time index
+
+    Examples
+    --------
+    >>> time_rowkey(1234, 60000.5, 170032915988086819)
+    '1234_60000.500000_170032915988086819'
+    """
+    return f"{pix}_{format_mjd(mjd)}_{objectid}"
+
+
+@profile
+def scan_pixels_in_time(
+    client,
+    pixs,
+    cols: str,
+    mjd_start: float = None,
+    mjd_stop: float = None,
+    nmax: int = None,
+    start_key: str = None,
+    time_key=format_mjd,
+) -> dict:
+    """Scan all rows of a set of pixels within a time range
+
+    Parameters
+    ----------
+    client: com.Lomikel.HBaser.HBaseClient
+        Client connected to a time index
+    pixs: array of int
+        HEALPix pixel indices
+    cols: str
+        Comma-separated column names to transfer, or `*`
+    mjd_start: float, optional
+        Lower bound (included). Default is None (no bound).
+    mjd_stop: float, optional
+        Upper bound (included). Default is None (no bound).
+    nmax: int, optional
+        If set, stop scanning once `nmax` rows have been read.
+        Default is None (scan all pixels).
+    start_key: str, optional
+        See `apps.utils.healpix.scan_key_ranges`. Default is None.
+    time_key: callable, optional
+        Format of the times in the rowkeys. Default is `format_mjd`,
+        other tables are keyed e.g. by the raw Julian date (`str`).
+
+    Returns
+    -------
+    results: dict
+        HBase rows, keyed by rowkey
+    """
+    start = "" if mjd_start is None else time_key(mjd_start)
+    stop = "~" if mjd_stop is None else time_key(mjd_stop) + "~"
+
+    bounds = [
+        (f"{pix}_{start}", f"{pix}_{stop}")
+        for pix in sorted(np.unique(pixs), key=lambda pix: f"{pix}_")
+    ]
+
+    return scan_key_ranges(client, bounds, cols, nmax=nmax, start_key=start_key)
+
+
+@profile
+def write_pixel_time_index(
+    client,
+    rows: dict,
+    nside: int,
+    mjd_col: str = "r:midpointMjdTai",
+    id_col: str = "r:diaObjectId",
+    ra_col: str = "r:ra",
+    dec_col: str = "r:dec",
+) -> int:
+    """Write alerts in a time index
+
+    Parameters
+    ----------
+    client: com.Lomikel.HBaser.HBaseClient
+        Client connected to the time index
+    rows: dict
+        Alerts keyed by any identifier, with values being dictionaries
+        {family:column: value}, e.g. the output of a pixel table scan.
+        Entries from the `key` family are ignored.
+    nside: int
+        HEALPix resolution of the index
+    mjd_col: str, optional
+        Column containing the alert time
+    id_col: str, optional
+        Column containing the object identifier
+    ra_col: str, optional
+        Column containing the Right Ascension, in degree
+    dec_col: str, optional
+        Column containing the Declination, in degree
+
+    Returns
+    -------
+    out: int
+        Number of rows written
+    """
+    from healpy import ang2pix
+
+    for row in rows.values():
+        pix = ang2pix(nside, float(row[ra_col]), float(row[dec_col]), lonlat=True)
+        client.put(
+            time_rowkey(pix, float(row[mjd_col]), row[id_col]),
+            [
+                f"{col}:{value}"
+                for col, value in row.items()
+                if not col.startswith("key:") and value is not None
+            ],
+        )
+    return len(rows)
+
+
+def create_pixel_time_index(source: str, index: str, create: bool = True):
+    """Create a time index with the schema of its pixel table
+
+    Parameters
+    ----------
+    source: str
+        Name of the pixel table
+    index: str
+        Name of the time index
+    create: bool, optional
+        If True, create the table. Otherwise only update its schema.
+    """
+    config = extract_configuration("config.yml")
+
+    client = connect_to_hbase_table(source)
+    schema_client = client.schema()
+    schema = {col: schema_client.type(col) for col in schema_client.columnNames()}
+    client.close()
+
+    families = sorted({col.split(":")[0] for col in schema})
+    create_or_update_hbase_table(
+        index, families, config["SCHEMAVER"], schema, create=create
+    )
+
+
+def backfill(source: str, index: str, nside: int, chunk: int = 10000, first: int = 0):
+    """Copy all rows of a pixel table into its time index
+
+    Pixels are processed by chunks of consecutive rowkeys,
+    such that each chunk is read with a single range scan.
+
+    Parameters
+    ----------
+    source: str
+        Name of the pixel table
+    index: str
+        Name of the time index
+    nside: int
+        HEALPix resolution of both tables
+    chunk: int, optional
+        Number of pixels per chunk. Default is 10000.
+    first: int, optional
+        Rank of the first pixel to process, to resume an
+        interrupted backfill. Default is 0.
+    """
+    npix = 12 * nside**2
+    pixel_by_rank = np.empty(npix, dtype=np.int64)
+    pixel_by_rank[key_rank(np.arange(npix), nside)] = np.arange(npix)
+
+    source_client = connect_to_hbase_table(source)
+    source_client.setLimit(np.iinfo(np.int32).max)
+    index_client = connect_to_hbase_table(index)
+
+    t0 = time.time()
+    nrows = 0
+    for rank in range(first, npix, chunk):
+        results = scan_pixels(
+            source_client, pixel_by_rank[rank : rank + chunk], nside, "*"
+        )
+        nrows += write_pixel_time_index(index_client, results, nside)
+        print(
+            f"rank {min(rank + chunk, npix)}/{npix}: {nrows} rows "
+            f"({time.time() - t0:.0f}s)"
+        )
+
+    source_client.close()
+    index_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--survey", default="lsst", help="Entry in PIXEL_TIME_INDEX")
+    parser.add_argument(
+        "--create", action="store_true", help="Create the index before filling it"
+    )
+    parser.add_argument("--chunk", type=int, default=10000, help="Pixels per scan")
+    parser.add_argument(
+        "--first", type=int, default=0, help="Rank of the first pixel (resume)"
+    )
+    args = parser.parse_args()
+
+    config = extract_configuration("config.yml")
+    entry = config["PIXEL_TIME_INDEX"][args.survey]
+
+    if args.create:
+        create_pixel_time_index(entry["source"], entry["table"])
+    backfill(
+        entry["source"], entry["table"], int(entry["nside"]), args.chunk, args.first
+    )
+
+
+if __name__ == "__main__":
+    main()
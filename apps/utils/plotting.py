@@ -13,10 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import numpy as np
-from astropy.convolution import Box2DKernel, Gaussian2DKernel
-from astropy.convolution import convolve as astropy_convolve
-from astropy.visualization import AsymmetricPercentileInterval, simple_norm
-from line_profiler import profile
+
+from apps.utils.profiling import profile
 
 
 def sigmoid(img: list) -> list:
@@ -81,6 +79,9 @@ def legacy_normalizer(data: list, stretch="asinh", pmin=0.5, pmax=99.5) -> list:
 @profile
 def convolve(image, smooth=3, kernel="gauss"):
     """Convolve 2D image. Hacked from aplpy"""
+    from astropy.convolution import Box2DKernel, Gaussian2DKernel
+    from astropy.convolution import convolve as astropy_convolve
+
     if smooth is None and isinstance(kernel, str) and kernel in ["box", "gauss"]:
         return image
 
@@ -119,6 +120,8 @@ def _data_stretch(
     exponent=2,
 ):
     """Hacked from aplpy"""
+    from astropy.visualization import AsymmetricPercentileInterval, simple_norm
+
     if vmin is None or vmax is None:
         interval = AsymmetricPercentileInterval(pmin, pmax, n_samples=10000)
         try:
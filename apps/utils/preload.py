@@ -0,0 +1,68 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Heavy dependencies of the routes, imported on first use
+
+Routes import heavy dependencies (healpy, matplotlib, scipy through
+fink_utils, ...) in the functions that need them, such that importing
+the applications is fast, e.g. for the job runner or the benchmarks.
+`benchmarks/importtime.py` checks that they are not imported with the
+applications.
+
+Under gunicorn (see config_prometheus.py), the master imports the
+application and these modules once, then freezes the objects before
+forking the workers. Workers share these pages copy-on-write, instead
+of importing the modules each.
+"""
+
+import gc
+import importlib
+import logging
+
+_LOG = logging.getLogger(__name__)
+
+HEAVY_MODULES = (
+    "PIL.Image",
+    "astropy.convolution",
+    "astropy.coordinates",
+    "astropy.io.fits",
+    "astropy.io.votable",
+    "astropy.table",
+    "astropy.visualization",
+    "fink_filters.rubin.blocks",
+    "fink_filters.rubin.livestream",
+    "fink_filters.ztf.classification",
+    "fink_utils.sso.miriade",
+    "fink_utils.sso.spins",
+    "fink_utils.sso.ssoft",
+    "fink_utils.xmatch.simbad",
+    "healpy",
+    "matplotlib.cm",
+    "rocks",
+)
+
+
+def preload(modules: tuple = HEAVY_MODULES):
+    """Import `modules`, and freeze all objects before forking workers
+
+    Frozen objects are ignored by the garbage collector, such that their
+    pages are not written by the workers, and stay shared.
+    """
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            _LOG.warning(f"Cannot preload {name}: {e}")
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,122 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Opt-in line profiling of the hot functions
+
+Hot functions are decorated with `profile`. The behaviour is chosen
+with the environment variable FINK_PROFILE, when modules are imported:
+
+- unset (default): `profile` returns the function unchanged, without
+  importing line_profiler. There is no overhead.
+- `1`: `profile` is `line_profiler.profile`, e.g. to run `kernprof -l`
+  (see profile_route.sh).
+- `sample`: 1 request in FINK_PROFILE_RATE (default 100) is profiled,
+  and its line timings are written to
+  FINK_PROFILE_DIR/<route>/<time>_<pid>.lprof (default /tmp/fink_profiles).
+  Read them with `python -m line_profiler -rmt <file>.lprof`.
+
+The API itself only requires line_profiler if profiling is enabled.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+
+from flask import g, request
+
+_LOG = logging.getLogger(__name__)
+
+MODE = os.environ.get("FINK_PROFILE", "")
+
+
+def _identity(func):
+    return func
+
+
+class SampledProfiler:
+    """Profile a random sample of the requests
+
+    Only one request at a time is profiled per process.
+
+    Parameters
+    ----------
+    rate: int
+        One request in `rate` is profiled
+    directory: str
+        Folder receiving the `.lprof` files, one subfolder per route
+    """
+
+    def __init__(self, rate: int, directory: str):
+        # Fail when the API starts, rather than on a sampled request
+        from line_profiler import LineProfiler
+
+        self.line_profiler = LineProfiler
+        self.rate = rate
+        self.directory = directory
+        self.functions = []
+        self.lock = threading.Lock()
+
+    def __call__(self, func):
+        """Register `func`, and return it unchanged"""
+        self.functions.append(func)
+        return func
+
+    def before_request(self):
+        if random.random() * self.rate >= 1 or not self.lock.acquire(blocking=False):
+            return
+        try:
+            profiler = self.line_profiler(*self.functions)
+            profiler.enable_by_count()
+        except Exception:
+            self.lock.release()
+            raise
+        g.line_profiler = profiler
+
+    def teardown_request(self, exception=None):
+        profiler = g.pop("line_profiler", None)
+        if profiler is None:
+            return
+        try:
+            profiler.disable_by_count()
+            folder = os.path.join(
+                self.directory, request.path.strip("/").replace("/", "_")
+            )
+            os.makedirs(folder, exist_ok=True)
+            profiler.dump_stats(
+                os.path.join(folder, f"{time.time_ns()}_{os.getpid()}.lprof")
+            )
+        except OSError as e:
+            _LOG.warning(f"Cannot write the profile of {request.path}: {e}")
+        finally:
+            self.lock.release()
+
+
+if MODE == "1":
+    from line_profiler import profile
+elif MODE == "sample":
+    profile = SampledProfiler(
+        int(os.environ.get("FINK_PROFILE_RATE", "100")),
+        os.environ.get("FINK_PROFILE_DIR", "/tmp/fink_profiles"),
+    )
+else:
+    profile = _identity
+
+
+def register_profiler(app):
+    """Profile a sample of the requests of `app`, if FINK_PROFILE=sample"""
+    if isinstance(profile, SampledProfiler):
+        app.before_request(profile.before_request)
+        app.teardown_request(profile.teardown_request)
@@ -0,0 +1,128 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Record API traffic, to be replayed with `benchmarks/replay.py`
+
+Each request to /api/* is appended as one JSON line:
+
+    {"timestamp": 1760000000.1, "survey": "ztf", "method": "POST",
+     "route": "/api/v1/objects", "payload": {"objectId": "ZTF21abfmbix"},
+     "status": 200, "duration": 0.12, "bytes": 5321}
+
+All workers of a machine append to the same file. Each line is written
+with a single `write` on a file opened in append mode, such that lines
+of different workers are not interleaved.
+
+Streamed routes (server-sent events) are not recorded: their responses
+last until the client disconnects, and cannot be replayed.
+"""
+
+import json
+import logging
+import os
+import random
+import time
+
+from flask import g, request
+
+from apps.utils.utils import extract_configuration
+
+_LOG = logging.getLogger(__name__)
+
+# Routes whose responses are streams, excluded from records and replays
+STREAMED_ROUTES = ("/api/v1/stream",)
+
+
+def read_payload() -> dict:
+    """Return the payload of the current request, as sent by the user"""
+    if len(request.args) > 0:
+        return request.args.to_dict()
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        return payload
+    return request.form.to_dict()
+
+
+class TrafficRecorder:
+    """Append requests of a Flask application to a JSON lines file
+
+    Parameters
+    ----------
+    path: str
+        Output file, created if needed
+    survey: str
+        Name of the survey served by the application (ztf, lsst)
+    sample: float
+        Fraction of the requests to record, between 0 and 1
+    """
+
+    def __init__(self, path: str, survey: str, sample: float):
+        self.path = path
+        self.survey = survey
+        self.sample = sample
+        self.fd = None
+
+    def _write(self, line: bytes):
+        if self.fd is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        os.write(self.fd, line)
+
+    def before_request(self):
+        g.recorder_start = time.time()
+
+    def after_request(self, response):
+        start = g.pop("recorder_start", None)
+        if (
+            start is None
+            or not request.path.startswith("/api/")
+            or request.path in STREAMED_ROUTES
+            or random.random() >= self.sample
+        ):
+            return response
+
+        entry = {
+            "timestamp": start,
+            "survey": self.survey,
+            "method": request.method,
+            "route": request.path,
+            "payload": read_payload(),
+            "status": response.status_code,
+            "duration": time.time() - start,
+            "bytes": response.calculate_content_length(),
+        }
+        try:
+            self._write((json.dumps(entry, default=str) + "\n").encode())
+        except OSError as e:
+            _LOG.warning(f"Cannot record the request to {self.path}: {e}")
+        return response
+
+
+def register_recorder(app, survey: str):
+    """Record the traffic of `app` if enabled in the configuration
+
+    Parameters
+    ----------
+    app: flask.Flask
+        Application
+    survey: str
+        Name of the survey served by the application (ztf, lsst)
+    """
+    config = extract_configuration("config.yml")["TRAFFIC_RECORD"]
+    if not config["enabled"]:
+        return
+
+    recorder = TrafficRecorder(config["path"], survey, float(config["sample"]))
+    app.before_request(recorder.before_request)
+    app.after_request(recorder.after_request)
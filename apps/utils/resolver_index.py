@@ -0,0 +1,359 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Memory-mapped index of the resolver tables
+
+Resolver tables (e.g. ztf.tns_resolver) are small enough to be copied
+on disk as sorted arrays of rowkeys. Prefix lookups are then binary
+searches, and lookups of substrings starting with `_` (e.g. the internal
+name in `fullname_internalname`) are binary searches in the sorted array
+of all suffixes starting with `_`.
+
+Files are memory-mapped, such that all workers of a machine share the
+same pages. One worker at a time rebuilds the index in the background,
+and the new version replaces the previous one atomically. Lookups return
+None when the index is not available or when nothing matches, and callers
+then fall back to HBase, as names may have been added since the last
+rebuild. Patterns that HBase did not resolve either are remembered for a
+short time, such that repeated autocompletion misses do not reach HBase.
+"""
+
+import fcntl
+import glob
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from functools import cache
+
+import numpy as np
+
+from apps.utils.client import connect_to_hbase_table
+from apps.utils.decoding import hbase_to_dict
+from apps.utils.profiling import profile
+from apps.utils.utils import extract_configuration
+
+_LOG = logging.getLogger(__name__)
+
+SEPARATOR = b"_"
+
+
+@profile
+def build_index(tablename: str, cols: str, path: str, chunk: int):
+    """Copy a resolver table into index files
+
+    Parameters
+    ----------
+    tablename: str
+        Name of the HBase table
+    cols: str
+        Comma-separated columns to copy, or `*`
+    path: str
+        Folder of the index, created if needed
+    chunk: int
+        Number of rows per HBase scan
+
+    Returns
+    -------
+    out: int
+        Number of rows in the index
+    """
+    client = connect_to_hbase_table(tablename)
+    client.setRangeScan(True)
+    client.setLimit(chunk)
+
+    keys = []
+    rows = []
+    lower = ""
+    while True:
+        results = hbase_to_dict(
+            client.scan(
+                "", f"key:key:{lower},key:key:\U0010ffff", cols, 0, False, False
+            )
+        )
+        new = sorted(key for key in results if key != lower)
+        keys.extend(new)
+        rows.extend(results[key] for key in new)
+        if len(results) < chunk or len(new) == 0:
+            break
+        lower = new[-1]
+    client.close()
+
+    keys = np.array([key.encode() for key in keys], dtype=bytes)
+    blobs = [json.dumps(row).encode() for row in rows]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+
+    # All suffixes starting with the separator, with their row
+    suffixes = []
+    suffix_rows = []
+    for index, key in enumerate(keys):
+        position = key.find(SEPARATOR)
+        while position >= 0:
+            suffixes.append(key[position:])
+            suffix_rows.append(index)
+            position = key.find(SEPARATOR, position + 1)
+    order = np.argsort(np.array(suffixes, dtype=bytes), kind="stable")
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "keys.npy"), keys)
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    np.save(os.path.join(path, "suffixes.npy"), np.array(suffixes, dtype=bytes)[order])
+    np.save(
+        os.path.join(path, "suffix_rows.npy"),
+        np.array(suffix_rows, dtype=np.int64)[order],
+    )
+    with open(os.path.join(path, "rows.bin"), "wb") as f:
+        f.write(b"".join(blobs))
+
+    return len(keys)
+
+
+def prefix_range(array, prefix: bytes):
+    """Return the slice of a sorted array of bytes starting with `prefix`
+
+    Examples
+    --------
+    >>> array = np.array([b"a", b"ab", b"abc", b"b"])
+    >>> prefix_range(array, b"ab")
+    (1, 3)
+    >>> prefix_range(array, b"")
+    (0, 4)
+    """
+    # 0xff never appears in UTF-8
+    return (
+        int(np.searchsorted(array, prefix, side="left")),
+        int(np.searchsorted(array, prefix + b"\xff", side="left")),
+    )
+
+
+class ResolverIndex:
+    """Memory-mapped copy of a resolver table, refreshed in the background
+
+    Parameters
+    ----------
+    tablename: str
+        Name of the HBase table
+    cols: str
+        Comma-separated columns to copy, or `*`
+    directory: str
+        Folder containing the indices, shared by all workers
+    refresh_interval: float
+        Age of the index above which it is rebuilt, in second
+    chunk: int
+        Number of rows per HBase scan when building the index
+    negative_ttl: float
+        Time during which a pattern missing from HBase is not
+        searched again, in second
+    """
+
+    # Bound on the number of remembered misses, per process
+    MAX_MISSES = 100000
+
+    def __init__(
+        self,
+        tablename: str,
+        cols: str,
+        directory: str,
+        refresh_interval: float,
+        chunk: int,
+        negative_ttl: float,
+    ):
+        self.tablename = tablename
+        self.cols = cols
+        self.link = os.path.join(directory, tablename)
+        self.refresh_interval = refresh_interval
+        self.chunk = chunk
+        self.negative_ttl = negative_ttl
+        self.misses = {}
+
+        self.lock = threading.Lock()
+        self.building = False
+        self.version = None
+        self.arrays = None
+
+    def _load(self):
+        """Return the arrays of the current version, or None"""
+        try:
+            version = os.readlink(self.link)
+        except OSError:
+            return None
+
+        if version != self.version:
+            path = os.path.join(os.path.dirname(self.link), version)
+            try:
+                arrays = {
+                    name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                    for name in ["keys", "offsets", "suffixes", "suffix_rows"]
+                }
+                if arrays["offsets"][-1] > 0:
+                    arrays["rows"] = np.memmap(
+                        os.path.join(path, "rows.bin"), dtype=np.uint8, mode="r"
+                    )
+                else:
+                    arrays["rows"] = np.zeros(0, dtype=np.uint8)
+            except (OSError, ValueError) as e:
+                _LOG.warning(f"Cannot load the index of {self.tablename}: {e}")
+                return None
+            self.arrays, self.version = arrays, version
+
+        return self.arrays
+
+    def _is_stale(self) -> bool:
+        """True if the index is missing, or older than `refresh_interval`"""
+        try:
+            return time.time() - os.lstat(self.link).st_mtime > self.refresh_interval
+        except OSError:
+            return True
+
+    def _rebuild(self):
+        """Rebuild the index, unless another worker is doing it"""
+        directory = os.path.dirname(self.link)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(f"{self.link}.lock", "w") as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+
+                # Another worker may have finished just before
+                if not self._is_stale():
+                    return
+
+                version = f"{self.tablename}.{time.time_ns()}"
+                nrows = build_index(
+                    self.tablename,
+                    self.cols,
+                    os.path.join(directory, version),
+                    self.chunk,
+                )
+
+                # Swap the symbolic link atomically
+                os.symlink(version, f"{self.link}.new")
+                os.replace(f"{self.link}.new", self.link)
+                _LOG.info(f"Index of {self.tablename} rebuilt ({nrows} rows)")
+
+                # Workers still reading previous versions keep their mapping
+                for path in glob.glob(f"{self.link}.*"):
+                    if os.path.isdir(path) and os.path.basename(path) != version:
+                        shutil.rmtree(path, ignore_errors=True)
+        except Exception as e:
+            _LOG.warning(f"Cannot rebuild the index of {self.tablename}: {e}")
+        finally:
+            self.building = False
+
+    def refresh(self):
+        """Rebuild the index in the background if it is stale"""
+        with self.lock:
+            if self.building or not self._is_stale():
+                return
+            self.building = True
+        threading.Thread(
+            target=self._rebuild, name=f"index-{self.tablename}", daemon=True
+        ).start()
+
+    def add_miss(self, pattern: str, substring: bool = False):
+        """Remember that HBase has no row for a pattern missing from the index
+
+        Parameters
+        ----------
+        pattern: str
+            Pattern given to `prefix` or `substring`
+        substring: bool, optional
+            True if the pattern was given to `substring`. Default is False.
+        """
+        if len(self.misses) >= self.MAX_MISSES:
+            self.misses.clear()
+        self.misses[(pattern, substring)] = time.time() + self.negative_ttl
+
+    def _found(self, rows: dict, pattern: str, substring: bool):
+        """Return the rows found, {} for a known miss, or None"""
+        if len(rows) > 0:
+            return rows
+        if self.misses.get((pattern, substring), 0) > time.time():
+            return {}
+        return None
+
+    def _rows(self, arrays, indices) -> dict:
+        """Decode rows by their position in the index"""
+        keys, offsets, rows = arrays["keys"], arrays["offsets"], arrays["rows"]
+        return {
+            keys[i].decode(): json.loads(rows[offsets[i] : offsets[i + 1]].tobytes())
+            for i in indices
+        }
+
+    @profile
+    def prefix(self, prefix: str, nmax: int = None):
+        """Return the first `nmax` rows whose key starts with `prefix`
+
+        All matching rows are returned if `nmax` is None.
+
+        Returns
+        -------
+        out: dict or None
+            Rows keyed by rowkey, or None if the index is not available
+            or if nothing matches, unless HBase missed it recently
+            (see `add_miss`)
+        """
+        self.refresh()
+        arrays = self._load()
+        if arrays is None:
+            return None
+
+        start, stop = prefix_range(arrays["keys"], prefix.encode())
+        if nmax is not None:
+            stop = min(stop, start + nmax)
+        return self._found(self._rows(arrays, range(start, stop)), prefix, False)
+
+    @profile
+    def substring(self, pattern: str, nmax: int):
+        """Return the first `nmax` rows whose key contains `pattern`
+
+        `pattern` must start with `_`.
+
+        Returns
+        -------
+        out: dict or None
+            Rows keyed by rowkey, or None if the index is not available
+            or if nothing matches, unless HBase missed it recently
+            (see `add_miss`)
+        """
+        if not pattern.encode().startswith(SEPARATOR):
+            raise ValueError(f"{pattern} does not start with {SEPARATOR.decode()}")
+
+        self.refresh()
+        arrays = self._load()
+        if arrays is None:
+            return None
+
+        start, stop = prefix_range(arrays["suffixes"], pattern.encode())
+        indices = np.unique(arrays["suffix_rows"][start:stop])[:nmax]
+        return self._found(self._rows(arrays, indices), pattern, True)
+
+
+@cache
+def resolver_index(tablename: str, cols: str = "*") -> ResolverIndex:
+    """Return the index of a resolver table, shared by all requests"""
+    config = extract_configuration("config.yml")
+    return ResolverIndex(
+        tablename,
+        cols,
+        config["RESOLVER_INDEX"]["directory"],
+        float(config["RESOLVER_INDEX"]["refresh"]),
+        int(config["RESOLVER_INDEX"]["chunk"]),
+        float(config["RESOLVER_INDEX"]["negative_ttl"]),
+    )
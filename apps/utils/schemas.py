@@ -0,0 +1,206 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Local registry of alert schemas
+
+Alert schemas (avsc) are vendored per version under `assets/schemas`,
+and requests only read local files. A background thread refreshes the
+schemas from GitHub into `SCHEMA_CACHE_DIR`, whose files take precedence
+over the vendored ones, and caches built from the registry are cleared
+when a new schema arrives. `assets/` is never written. To refresh the
+schemas manually:
+
+    python -m apps.utils.schemas
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+from apps.utils.stages import upstream_request
+from apps.utils.utils import atomic_write, extract_configuration
+
+_LOG = logging.getLogger(__name__)
+
+SCHEMA_DIR = "assets/schemas"
+
+LSST_URL = "https://raw.githubusercontent.com/lsst/alert_packet/refs/heads/main/python/lsst/alert/packet/schema"
+LSST_SECTIONS = [
+    "alert",
+    "diaSource",
+    "diaForcedSource",
+    "diaObject",
+    "ssSource",
+    "mpc_orbits",
+]
+
+ZTF_URL = "https://raw.githubusercontent.com/ZwickyTransientFacility/ztf-avro-alert/master/schema"
+
+_CACHES = []
+_REFRESH_LOCK = threading.Lock()
+_REFRESH_THREAD = None
+
+
+def lsst_path(major: int, minor: int, section: str) -> str:
+    """Relative path of a LSST schema section in the registry"""
+    return f"lsst/{major}/{minor}/lsst.v{major}_{minor}.{section}.avsc"
+
+
+def cache_dir() -> str:
+    """Directory of the schemas refreshed from GitHub"""
+    return extract_configuration("config.yml")["SCHEMA_CACHE_DIR"]
+
+
+def _local_path(path: str) -> str:
+    """Path of a registry file, refreshed copy first, or None"""
+    for folder in [cache_dir(), SCHEMA_DIR]:
+        fullpath = os.path.join(folder, path)
+        if os.path.exists(fullpath):
+            return fullpath
+    return None
+
+
+def _read_json(path: str):
+    """Read a JSON file from the registry"""
+    fullpath = _local_path(path)
+    if fullpath is None:
+        raise FileNotFoundError(f"{path} is not in the schema registry")
+    with open(fullpath) as f:
+        return json.load(f)
+
+
+def latest_lsst_version():
+    """Return the latest LSST schema version in the registry
+
+    Returns
+    -------
+    major: int
+    minor: int
+    """
+    version = str(_read_json("lsst/latest.txt"))
+    major, minor = [int(i) for i in version.split(".")]
+    return major, minor
+
+
+def lsst_schema(major: int, minor: int) -> dict:
+    """Return all sections of a LSST schema version
+
+    Raises
+    ------
+    FileNotFoundError
+        If the version is not in the registry
+    """
+    return {
+        section: _read_json(lsst_path(major, minor, section))
+        for section in LSST_SECTIONS
+    }
+
+
+def ztf_candidate() -> dict:
+    """Return the ZTF candidate schema
+
+    Raises
+    ------
+    FileNotFoundError
+        If the schema is not in the registry
+    """
+    return _read_json("ztf/candidate.avsc")
+
+
+def register_cache(cached_fn):
+    """Clear a `functools.cache` function when the registry changes"""
+    _CACHES.append(cached_fn)
+    return cached_fn
+
+
+def _download(url: str, path: str, overwrite: bool) -> bool:
+    """Download a file into the cache of the registry. Return True if it changed."""
+    current = _local_path(path)
+    if current is not None and not overwrite:
+        return False
+
+    r = upstream_request("get", url, timeout=30)
+    r.raise_for_status()
+    # Check the content before storing it
+    json.loads(r.content)
+
+    if current is not None:
+        with open(current, "rb") as f:
+            if f.read() == r.content:
+                return False
+
+    fullpath = os.path.join(cache_dir(), path)
+    os.makedirs(os.path.dirname(fullpath), exist_ok=True)
+    atomic_write(fullpath, lambda f: f.write(r.content))
+    return True
+
+
+def snapshot() -> bool:
+    """Refresh the latest schemas from GitHub into the cache of the registry
+
+    Released LSST versions are immutable, and downloaded only once.
+
+    Returns
+    -------
+    out: bool
+        True if the registry has changed
+    """
+    changed = _download(f"{ZTF_URL}/candidate.avsc", "ztf/candidate.avsc", True)
+    changed |= _download(f"{LSST_URL}/latest.txt", "lsst/latest.txt", True)
+
+    major, minor = latest_lsst_version()
+    for section in LSST_SECTIONS:
+        path = lsst_path(major, minor, section)
+        changed |= _download(f"{LSST_URL}/{path[5:]}", path, False)
+
+    if changed:
+        _LOG.info(f"Schema registry updated (LSST {major}.{minor})")
+        for cached_fn in _CACHES:
+            cached_fn.cache_clear()
+
+    return changed
+
+
+def _refresh_forever(interval: float):
+    """Snapshot the schemas every `interval` seconds"""
+    while True:
+        try:
+            snapshot()
+        except (requests.RequestException, OSError, ValueError) as e:
+            _LOG.warning(f"Schema registry refresh failed: {e}")
+        time.sleep(interval)
+
+
+def start_refresh():
+    """Start the background refresh of the registry, once per process"""
+    global _REFRESH_THREAD
+    with _REFRESH_LOCK:
+        if _REFRESH_THREAD is not None:
+            return
+        config = extract_configuration("config.yml")
+        _REFRESH_THREAD = threading.Thread(
+            target=_refresh_forever,
+            args=(float(config["SCHEMA_REFRESH_INTERVAL"]),),
+            name="schema-refresh",
+            daemon=True,
+        )
+        _REFRESH_THREAD.start()
+
+
+if __name__ == "__main__":
+    print("Registry updated" if snapshot() else "Registry up to date")
@@ -0,0 +1,290 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cached name resolution with the CDS Sesame service
+
+Resolutions are stored in a SQLite database shared by all workers of a
+machine, with a time-to-live. Names that Sesame does not know are cached
+as well, with a shorter time-to-live. Names missing from the cache are
+sent to Sesame concurrently, with a bounded number of connections.
+"""
+
+import io
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import pandas as pd
+import requests
+from flask import Response
+from lxml import etree
+
+from apps.utils.profiling import profile
+from apps.utils.stages import upstream_request
+from apps.utils.utils import extract_configuration
+
+_LOG = logging.getLogger(__name__)
+
+SESAME_URL = "http://cds.unistra.fr/cgi-bin/nph-sesame/-oxp/~S"
+
+
+def parse_sesame(content: bytes) -> list:
+    """Extract all resolvers from a Sesame XML answer, in a single pass
+
+    Parameters
+    ----------
+    content: bytes
+        XML answer of Sesame
+
+    Returns
+    -------
+    out: list of dict
+        One entry per `Resolver` element, with its attributes and the
+        text of its children. Empty if the name is not resolved.
+
+    Examples
+    --------
+    >>> content = b'''<Sesame><Target option="S"><name>M31</name>
+    ...   <Resolver name="S=Simbad"><otype>AGN</otype>
+    ...   <jradeg>10.68470833</jradeg><Vel><v>-300</v></Vel></Resolver>
+    ... </Target></Sesame>'''
+    >>> parse_sesame(content)
+    [{'name': 'S=Simbad', 'otype': 'AGN', 'jradeg': '10.68470833', 'Vel': None}]
+    >>> parse_sesame(b"<Sesame><Target><INFO>*** Nothing found ***</INFO></Target></Sesame>")
+    []
+    """
+    rows = []
+    for _, element in etree.iterparse(
+        io.BytesIO(content), events=("end",), tag="Resolver"
+    ):
+        row = dict(element.attrib)
+        for child in element:
+            if isinstance(child.tag, str):
+                text = child.text.strip() if child.text is not None else ""
+                row[child.tag] = text if text != "" else None
+        rows.append(row)
+        element.clear()
+    return rows
+
+
+def to_dataframe(rows: list) -> pd.DataFrame:
+    """Format resolvers in a DataFrame, with numerical columns converted"""
+    pdf = pd.DataFrame(rows)
+    for col in pdf.columns:
+        try:
+            pdf[col] = pd.to_numeric(pdf[col])
+        except (ValueError, TypeError):
+            pass
+    return pdf
+
+
+class SesameCache:
+    """Persistent cache of Sesame resolutions
+
+    Parameters
+    ----------
+    path: str
+        SQLite database, created if needed
+    ttl: float
+        Lifetime of a resolution, in second
+    negative_ttl: float
+        Lifetime of an unresolved name, in second
+    """
+
+    def __init__(self, path: str, ttl: float, negative_ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sesame "
+                "(name TEXT PRIMARY KEY, rows TEXT, expires REAL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, names: list) -> dict:
+        """Return cached resolutions, keyed by name"""
+        out = {}
+        with self._connect() as connection:
+            # Bounded number of SQL variables per statement
+            for start in range(0, len(names), 500):
+                chunk = names[start : start + 500]
+                for name, rows in connection.execute(
+                    "SELECT name, rows FROM sesame WHERE expires > ? AND name IN ({})".format(
+                        ",".join("?" * len(chunk))
+                    ),
+                    [time.time(), *chunk],
+                ):
+                    out[name] = json.loads(rows)
+        return out
+
+    def put(self, resolutions: dict):
+        """Store resolutions, keyed by name"""
+        now = time.time()
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO sesame VALUES (?, ?, ?)",
+                [
+                    (
+                        name,
+                        json.dumps(rows),
+                        now + (self.ttl if len(rows) > 0 else self.negative_ttl),
+                    )
+                    for name, rows in resolutions.items()
+                ],
+            )
+
+
+def query_sesame(name: str, timeout: float) -> list:
+    """Resolve a name with Sesame. See `parse_sesame`."""
+    r = upstream_request("get", f"{SESAME_URL}?{quote(name)}", timeout=timeout)
+    r.raise_for_status()
+    return parse_sesame(r.content)
+
+
+@profile
+def resolve_names(names: list) -> dict:
+    """Resolve names with Sesame, using the cache
+
+    Names that cannot be resolved because of a network error
+    are returned with None instead of resolvers, and are not cached.
+
+    Parameters
+    ----------
+    names: list of str
+        Names to resolve
+
+    Returns
+    -------
+    out: dict
+        List of resolvers (see `parse_sesame`), keyed by name.
+        None if Sesame could not be reached.
+    """
+    config = extract_configuration("config.yml")["SESAME"]
+    cache = SesameCache(
+        config["cache"], float(config["ttl"]), float(config["negative_ttl"])
+    )
+
+    names = list(dict.fromkeys(names))
+    out = cache.get(names)
+    missing = [name for name in names if name not in out]
+
+    if len(missing) > 0:
+        resolved = {}
+        with ThreadPoolExecutor(max_workers=int(config["pool"])) as pool:
+            futures = {
+                name: pool.submit(query_sesame, name, float(config["timeout"]))
+                for name in missing
+            }
+            for name, future in futures.items():
+                try:
+                    resolved[name] = future.result()
+                except (requests.RequestException, etree.XMLSyntaxError) as e:
+                    _LOG.warning(f"Sesame failed for {name}: {e}")
+                    out[name] = None
+        cache.put(resolved)
+        out.update(resolved)
+
+    return {name: out[name] for name in names}
+
+
+def format_resolutions(resolutions: dict, bulk: bool):
+    """Format the output of `resolve_names` in a DataFrame
+
+    Parameters
+    ----------
+    resolutions: dict
+        Output of `resolve_names`
+    bulk: bool
+        If True, resolvers of all names are returned, with the name in
+        the `query` column. Names that could not be resolved because of
+        a network error have an `error` column instead of resolvers.
+
+    Returns
+    -------
+    out: pd.DataFrame or Response
+        Resolvers, or a 503 Response if the single name could not
+        be resolved because of a network error
+
+    Examples
+    --------
+    >>> resolutions = {"M31": [{"name": "S=Simbad", "jradeg": "10.68"}], "M1": None}
+    >>> pdf = format_resolutions(resolutions, bulk=True)
+    >>> pdf["query"].tolist(), pdf["error"].fillna("").tolist()
+    (['M31', 'M1'], ['', 'Sesame is unavailable'])
+    >>> format_resolutions({"M1": None}, bulk=False).status_code
+    503
+    """
+    error = "Sesame is unavailable"
+    if not bulk:
+        (rows,) = resolutions.values()
+        if rows is None:
+            rep = {"status": "error", "text": f"{error}, try again later\n"}
+            return Response(str(rep), 503)
+        return to_dataframe(rows)
+
+    return to_dataframe(
+        [
+            row
+            for name, rows in resolutions.items()
+            for row in (
+                [{"query": name, "error": error}]
+                if rows is None
+                else [{"query": name, **row} for row in rows]
+            )
+        ]
+    )
+
+
+def read_names(payload: dict, key: str = "name"):
+    """Return the list of names to resolve
+
+    Parameters
+    ----------
+    payload: dict
+        User payload. If `bulk` is True, `payload[key]` is a list of
+        names, or a comma-separated string of names.
+    key: str, optional
+        Field containing the name(s). Default is `name`.
+
+    Returns
+    -------
+    out: list of str, or Response
+        Names, or a Response if there are too many names
+    """
+    if str(payload.get("bulk", False)) != "True":
+        return [payload[key]]
+
+    names = payload[key]
+    if isinstance(names, str):
+        names = names.split(",")
+    names = [name.strip() for name in names if name.strip() != ""]
+
+    nmax = int(extract_configuration("config.yml")["SESAME"]["bulk_max"])
+    if len(names) > nmax:
+        rep = {
+            "status": "error",
+            "text": f"Too many names: {len(names)} (maximum is {nmax})\n",
+        }
+        return Response(str(rep), 400)
+
+    return names
@@ -0,0 +1,280 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Utilities to extract credible regions from GW skymaps"""
+
+import ast
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from flask import Response
+
+from apps.utils.profiling import profile
+from apps.utils.stages import upstream_request
+from apps.utils.utils import atomic_write, extract_configuration
+
+_LOG = logging.getLogger(__name__)
+
+GRACEDB_URL = "https://gracedb.ligo.org/api/superevents/{}/files/bayestar.fits.gz"
+
+
+class CredibleLevels:
+    """Credible level map of a GW event, sorted by increasing credible level
+
+    Parameters
+    ----------
+    order: np.array
+        HEALPix pixel indices (RING) sorted by increasing credible level
+    levels: np.array
+        Credible levels for `order`, sorted in increasing order
+    date_obs: str
+        Date of the event, as given by the FITS header
+    """
+
+    def __init__(self, order, levels, date_obs):
+        self.order = order
+        self.levels = levels
+        self.date_obs = date_obs
+
+    def pixels(self, credible_level: float):
+        """Return the pixels within a credible level, sorted by index
+
+        Parameters
+        ----------
+        credible_level: float
+            GW credible region threshold
+
+        Returns
+        -------
+        out: np.array
+            HEALPix pixel indices (RING) whose credible
+            level is lower or equal to `credible_level`
+        """
+        last = np.searchsorted(self.levels, credible_level, side="right")
+        return np.sort(self.order[:last])
+
+
+def _cache_path(cache_dir: str, name: str) -> str:
+    """Return a path in the cache folder, with a sanitized filename"""
+    return os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", name))
+
+
+def _read_manifest(path: str, ttl: float):
+    """Return the last known checksum of an event, or None if stale"""
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if time.time() - manifest.get("fetched", 0) > ttl:
+        return None
+    return manifest.get("checksum")
+
+
+def _load_cached(path: str):
+    """Return the cached credible level map, or None if not available
+
+    Arrays are memory-mapped: only the pixels of the requested credible
+    level are read, and pages are shared among workers. The entry is
+    marked as used, see `_evict`.
+    """
+    if not os.path.isdir(path):
+        return None
+    try:
+        os.utime(path)
+        with open(os.path.join(path, "date_obs.txt")) as f:
+            date_obs = f.read()
+        return CredibleLevels(
+            np.load(os.path.join(path, "order.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "levels.npy"), mmap_mode="r"),
+            date_obs,
+        )
+    except (OSError, ValueError):
+        _LOG.warning(f"Corrupted skymap cache entry {path} -- recomputing")
+        return None
+
+
+def _store_cached(path: str, credible_levels: CredibleLevels):
+    """Write a credible level map to the cache, as a folder of .npy files"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    np.save(os.path.join(tmp, "order.npy"), credible_levels.order)
+    np.save(os.path.join(tmp, "levels.npy"), credible_levels.levels)
+    with open(os.path.join(tmp, "date_obs.txt"), "w") as f:
+        f.write(credible_levels.date_obs)
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        # Written by another worker in the meantime
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _evict(cache_dir: str, max_bytes: float, ttl: float):
+    """Bound the size of the cache
+
+    Least recently used entries are removed until the cache holds at most
+    `max_bytes`, and manifests older than `ttl` are removed. Workers that
+    still read a removed entry keep their memory map.
+    """
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    size = sum(
+                        f.stat().st_size for f in os.scandir(entry.path) if f.is_file()
+                    )
+                    entries.append((entry.stat().st_mtime, size, entry.path))
+                elif time.time() - entry.stat().st_mtime > ttl:
+                    os.remove(entry.path)
+            except OSError:
+                # Removed by another worker in the meantime
+                continue
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+@profile
+def compute_credible_levels(bayestar_bytes: bytes, nside: int) -> CredibleLevels:
+    """Compute the sorted credible level map at a given resolution
+
+    Parameters
+    ----------
+    bayestar_bytes: bytes
+        Gzipped FITS file (bayestar.fits.gz)
+    nside: int
+        Target HEALPix resolution
+
+    Returns
+    -------
+    out: CredibleLevels
+    """
+    import healpy as hp
+    from astropy.io import fits
+
+    with gzip.open(io.BytesIO(bayestar_bytes), "rb") as f:
+        with fits.open(io.BytesIO(f.read())) as hdul:
+            data = hdul[1].data
+            header = hdul[1].header
+
+    hpx = data["PROB"]
+    if header["ORDERING"] == "NESTED":
+        hpx = hp.reorder(hpx, n2r=True)
+
+    i = np.flipud(np.argsort(hpx))
+    sorted_credible_levels = np.cumsum(hpx[i])
+    credible_levels = np.empty_like(sorted_credible_levels)
+    credible_levels[i] = sorted_credible_levels
+
+    # TODO: use that to define the max skyfrac (in conjunction with level)
+    # npix = len(hpx)
+    # nside = hp.npix2nside(npix)
+    # skyfrac = np.sum(credible_levels <= 0.1) * hp.nside2pixarea(nside, degrees=True)
+
+    credible_levels_nside = hp.ud_grade(credible_levels, nside)
+
+    order = np.argsort(credible_levels_nside, kind="stable")
+
+    return CredibleLevels(order, credible_levels_nside[order], header["DATE-OBS"])
+
+
+@profile
+def load_credible_levels(payload: dict, nside: int):
+    """Return the credible level map for the skymap requested by the user
+
+    For `event_name`, the sorted credible level map is cached on disk, and
+    shared among workers. Entries are keyed by event name, file checksum
+    and resolution such that a new skymap version for the same event is
+    never served from a stale entry. The checksum of the last download
+    is remembered for `SKYMAP_CACHE_TTL` seconds to avoid contacting GraceDB.
+    Least recently used entries are removed above `SKYMAP_CACHE_MAX_BYTES`.
+    Uploaded skymaps (`bayestar`) are not cached.
+
+    Parameters
+    ----------
+    payload: dict
+        User payload, containing either `bayestar` or `event_name`
+    nside: int
+        Target HEALPix resolution
+
+    Returns
+    -------
+    out: CredibleLevels, pd.DataFrame or Response
+        Credible level map, a DataFrame containing the GraceDB
+        error message, or a Response if the upload is not valid.
+    """
+    config = extract_configuration("config.yml")
+    cache_dir = config["SKYMAP_CACHE_DIR"]
+    os.makedirs(cache_dir, exist_ok=True)
+
+    if "bayestar" in payload:
+        # Uploads are not cached, as any client could fill the cache
+        try:
+            bayestar_bytes = ast.literal_eval(payload["bayestar"])
+            return compute_credible_levels(bayestar_bytes, nside)
+        except (ValueError, SyntaxError, TypeError, OSError, KeyError) as e:
+            rep = {
+                "status": "error",
+                "text": f"`bayestar` is not a valid gzipped FITS skymap: {e}\n",
+            }
+            return Response(str(rep), 400)
+
+    name = payload["event_name"]
+    manifest_path = _cache_path(cache_dir, f"{name}.json")
+    checksum = _read_manifest(manifest_path, float(config["SKYMAP_CACHE_TTL"]))
+
+    if checksum is not None:
+        path = _cache_path(cache_dir, f"{name}_{checksum}_{nside}")
+        credible_levels = _load_cached(path)
+        if credible_levels is not None:
+            return credible_levels
+
+    r = upstream_request("get", GRACEDB_URL.format(name))
+    if r.status_code != 200:
+        return pd.DataFrame([{"status": r.content}])
+    bayestar_bytes = r.content
+    checksum = hashlib.sha256(bayestar_bytes).hexdigest()
+    manifest = json.dumps({"checksum": checksum, "fetched": time.time()})
+    atomic_write(manifest_path, lambda f: f.write(manifest.encode()))
+
+    # The same file may have been processed before the manifest expired
+    path = _cache_path(cache_dir, f"{name}_{checksum}_{nside}")
+    credible_levels = _load_cached(path)
+    if credible_levels is not None:
+        return credible_levels
+
+    credible_levels = compute_credible_levels(bayestar_bytes, nside)
+    _store_cached(path, credible_levels)
+    _evict(
+        cache_dir,
+        float(config["SKYMAP_CACHE_MAX_BYTES"]),
+        float(config["SKYMAP_CACHE_TTL"]),
+    )
+
+    return credible_levels
@@ -0,0 +1,305 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Log of the slow requests, and command line to find top offenders
+
+Requests slower than `SLOW_QUERY_LOG.threshold` (config.yml) are written
+as JSON lines, with their normalised payload, their estimated cost (see
+`apps.utils.admission`), the HBase scans and the upstream requests they
+made, the rows and bytes per stage (see `apps.utils.stages`), and the
+size of the response. All workers of a machine append to the same file,
+which is rotated when it exceeds `max_bytes`, keeping `backups` previous
+files.
+
+Top offenders:
+
+    python -m apps.utils.slowlog --by route
+    python -m apps.utils.slowlog --by payload --since 24 --top 20
+"""
+
+import argparse
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+from flask import g, request
+
+from apps.utils.recorder import read_payload
+from apps.utils.stages import request_stages
+from apps.utils.utils import extract_configuration
+
+_LOG = logging.getLogger(__name__)
+
+# Longest string kept in payloads and details
+MAX_LENGTH = 200
+
+
+def shorten(value: str, max_length: int = MAX_LENGTH) -> str:
+    """Truncate long strings, keeping their length
+
+    Examples
+    --------
+    >>> shorten("abc", 10)
+    'abc'
+    >>> shorten("a" * 30, 10)
+    'aaaaaaaaaa... (30 characters)'
+    """
+    if len(value) <= max_length:
+        return value
+    return f"{value[:max_length]}... ({len(value)} characters)"
+
+
+def normalise_payload(payload: dict) -> dict:
+    """Return the payload with sorted keys, and stripped and shortened values
+
+    Examples
+    --------
+    >>> normalise_payload({"radius": 18000, "ra": " 10.5 ", "dec": "2"})
+    {'dec': '2', 'ra': '10.5', 'radius': '18000'}
+    """
+    return {key: shorten(str(payload[key]).strip()) for key in sorted(payload)}
+
+
+class SlowQueryLog:
+    """Append slow requests to a JSON lines file, shared by all workers
+
+    Parameters
+    ----------
+    path: str
+        Log file, created if needed
+    survey: str
+        Name of the survey served by the application (ztf, lsst)
+    threshold: float
+        Minimum duration of a logged request, in second
+    max_bytes: int
+        Size above which the file is rotated
+    backups: int
+        Number of rotated files to keep (path.1, path.2, ...)
+    """
+
+    def __init__(
+        self, path: str, survey: str, threshold: float, max_bytes: int, backups: int
+    ):
+        self.path = path
+        self.survey = survey
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.lock = threading.Lock()
+        self.fd = None
+
+    def _open(self):
+        """(Re)open the file if needed, e.g. after a rotation by another worker"""
+        try:
+            current = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            current = None
+        if self.fd is not None and os.fstat(self.fd).st_ino != current:
+            os.close(self.fd)
+            self.fd = None
+        if self.fd is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def _rotate(self):
+        """Shift path -> path.1 -> path.2 ..., unless another worker did it"""
+        with open(f"{self.path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if os.stat(self.path).st_size <= self.max_bytes:
+                    return
+            except FileNotFoundError:
+                return
+            for index in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{index}"):
+                    os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+            if self.backups > 0:
+                os.replace(self.path, f"{self.path}.1")
+            else:
+                os.remove(self.path)
+
+    def write(self, entry: dict):
+        line = (json.dumps(entry, default=str) + "\n").encode()
+        with self.lock:
+            self._open()
+            os.write(self.fd, line)
+            if os.fstat(self.fd).st_size > self.max_bytes:
+                self._rotate()
+
+    def before_request(self):
+        g.slowlog_start = time.time()
+
+    def after_request(self, response):
+        start = g.pop("slowlog_start", None)
+        if start is None:
+            return response
+        duration = time.time() - start
+        if duration < self.threshold or not request.path.startswith("/api/"):
+            return response
+
+        stages = request_stages()
+        entry = {
+            "timestamp": start,
+            "survey": self.survey,
+            "method": request.method,
+            "route": request.path,
+            "payload": normalise_payload(read_payload()),
+            "status": response.status_code,
+            "duration": duration,
+            "response_bytes": response.calculate_content_length(),
+            "rows": stages.get("encode", {}).get("rows"),
+            "transferred_bytes": stages.get("transfer", {}).get("bytes"),
+            "estimated_cost": g.get("query_cost"),
+            "stages": {
+                name: {
+                    **{key: value for key, value in totals.items() if key != "details"},
+                    "details": [shorten(detail) for detail in totals["details"]],
+                }
+                for name, totals in stages.items()
+            },
+        }
+        try:
+            self.write(entry)
+        except OSError as e:
+            _LOG.warning(f"Cannot write the slow-query log {self.path}: {e}")
+        return response
+
+
+def register_slowlog(app, survey: str):
+    """Log the slow requests of `app`, if enabled in the configuration
+
+    Parameters
+    ----------
+    app: flask.Flask
+        Application
+    survey: str
+        Name of the survey served by the application (ztf, lsst)
+    """
+    config = extract_configuration("config.yml")["SLOW_QUERY_LOG"]
+    if not config["enabled"]:
+        return
+
+    slowlog = SlowQueryLog(
+        config["path"],
+        survey,
+        float(config["threshold"]),
+        int(config["max_bytes"]),
+        int(config["backups"]),
+    )
+    app.before_request(slowlog.before_request)
+    app.after_request(slowlog.after_request)
+
+
+def read_log(path: str, since: float = None) -> list:
+    """Return entries of the log and of its rotated files, newer than `since`"""
+    entries = []
+    for filename in [path, *glob.glob(f"{path}.[0-9]*")]:
+        try:
+            with open(filename) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if since is None or entry["timestamp"] >= since:
+                        entries.append(entry)
+        except FileNotFoundError:
+            continue
+    return entries
+
+
+def top_offenders(entries: list, by: str = "route", top: int = 10) -> list:
+    """Group entries, and sort groups by total time
+
+    Parameters
+    ----------
+    entries: list of dict
+        Entries of the log
+    by: str
+        `route`, or `payload` (route and normalised payload)
+    top: int
+        Number of groups to return
+
+    Returns
+    -------
+    out: list of dict
+        One entry per group
+
+    Examples
+    --------
+    >>> cone, obj = "/api/v1/conesearch", "/api/v1/objects"
+    >>> big, one = {"radius": "18000"}, {"objectId": "ZTF21"}
+    >>> entries = [
+    ...     {"route": cone, "payload": big, "duration": 8.0, "rows": 10},
+    ...     {"route": cone, "payload": big, "duration": 6.0, "rows": 20},
+    ...     {"route": obj, "payload": one, "duration": 5.0, "rows": None},
+    ... ]
+    >>> [(o["group"], o["count"], o["total"]) for o in top_offenders(entries)]
+    [('/api/v1/conesearch', 2, 14.0), ('/api/v1/objects', 1, 5.0)]
+    """
+    groups = defaultdict(list)
+    for entry in entries:
+        if by == "payload":
+            key = f"{entry['route']} {json.dumps(entry['payload'], sort_keys=True)}"
+        else:
+            key = entry["route"]
+        groups[key].append(entry)
+
+    out = []
+    for key, selected in groups.items():
+        durations = np.array([entry["duration"] for entry in selected])
+        rows = [entry["rows"] for entry in selected if entry.get("rows") is not None]
+        out.append(
+            {
+                "group": key,
+                "count": len(selected),
+                "total": float(durations.sum()),
+                "median": float(np.median(durations)),
+                "max": float(durations.max()),
+                "rows": float(np.mean(rows)) if len(rows) > 0 else None,
+            }
+        )
+    return sorted(out, key=lambda group: group["total"], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top offenders of the slow-query log")
+    parser.add_argument("--path", help="Log file. Default is given by config.yml")
+    parser.add_argument("--by", choices=["route", "payload"], default="route")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--since", type=float, help="Only the last hours")
+    args = parser.parse_args()
+
+    path = args.path or extract_configuration("config.yml")["SLOW_QUERY_LOG"]["path"]
+    since = None if args.since is None else time.time() - args.since * 3600
+    entries = read_log(path, since)
+
+    print(f"{len(entries)} slow requests in {path}")
+    print(f"{'count':>6} {'total':>9} {'median':>8} {'max':>8} {'rows':>8}  group")
+    for group in top_offenders(entries, args.by, args.top):
+        rows = "" if group["rows"] is None else f"{group['rows']:.0f}"
+        print(
+            f"{group['count']:>6} {group['total']:>8.1f}s {group['median']:>7.1f}s "
+            f"{group['max']:>7.1f}s {rows:>8}  {group['group']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Time the stages of a request, as Prometheus histograms
+
+Stages are labelled by route (the Flask endpoint, or `background` outside
+of a request) and by name:
+
+- scan: HBase scan, on the JVM side
+- transfer: export of the scan results from the JVM to Python
+- decode: conversion of the results into a DataFrame
+- enrich: added values (classification, colours, dates, ...)
+- encode: serialisation of the response
+- upstream-http: requests to other services
+
+Stages can be nested, and the time of a stage excludes the time of the
+stages nested in it, such that stages of a request add up. Histograms
+are written with the other metrics of the application, and are served
+on the same port. Totals per stage are also kept for the current request
+(see `request_stages`), e.g. for the slow-query log.
+
+    >>> with stage("decode") as record:
+    ...     record.rows = 3
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from flask import g, has_request_context, request
+from prometheus_client import Histogram
+
+STAGE_SECONDS = Histogram(
+    "fink_stage_seconds",
+    "Time spent per stage of a request, excluding nested stages",
+    ["route", "stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+STAGE_ROWS = Histogram(
+    "fink_stage_rows",
+    "Number of rows processed per stage of a request",
+    ["route", "stage"],
+    buckets=(0, 1, 10, 100, 1e3, 1e4, 1e5, 1e6),
+)
+STAGE_BYTES = Histogram(
+    "fink_stage_bytes",
+    "Number of bytes processed per stage of a request",
+    ["route", "stage"],
+    buckets=(1e2, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9),
+)
+
+# Maximum number of details (e.g. HBase scans) kept per stage of a request
+MAX_DETAILS = 20
+
+_LOCAL = threading.local()
+
+
+class StageRecord:
+    """Measurements of a running stage
+
+    `rows`, `nbytes`, and `detail` (e.g. the HBase search) can be set.
+    """
+
+    __slots__ = ("name", "nested", "rows", "nbytes", "detail")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.nested = 0.0
+        self.rows = None
+        self.nbytes = None
+        self.detail = None
+
+
+def current_route() -> str:
+    """Return the endpoint of the current request, or `background`"""
+    if has_request_context():
+        return request.endpoint or "unknown"
+    return "background"
+
+
+def request_stages() -> dict:
+    """Return the totals per stage of the current request
+
+    Returns
+    -------
+    out: dict
+        {stage: {"seconds", "calls", "rows", "bytes", "details"}}
+    """
+    if not has_request_context():
+        return {}
+    return g.setdefault("stages", {})
+
+
+def observe(
+    name: str,
+    seconds: float,
+    rows: int = None,
+    nbytes: int = None,
+    detail: str = None,
+):
+    """Record a stage measured by the caller"""
+    route = current_route()
+    STAGE_SECONDS.labels(route, name).observe(seconds)
+    if rows is not None:
+        STAGE_ROWS.labels(route, name).observe(rows)
+    if nbytes is not None:
+        STAGE_BYTES.labels(route, name).observe(nbytes)
+
+    if route != "background":
+        totals = request_stages().setdefault(
+            name, {"seconds": 0.0, "calls": 0, "rows": 0, "bytes": 0, "details": []}
+        )
+        totals["seconds"] += seconds
+        totals["calls"] += 1
+        totals["rows"] += rows or 0
+        totals["bytes"] += nbytes or 0
+        if detail is not None and len(totals["details"]) < MAX_DETAILS:
+            totals["details"].append(detail)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as stage `name`
+
+    Yields
+    ------
+    record: StageRecord
+        Set `record.rows` and `record.nbytes` to record them as well
+    """
+    if not hasattr(_LOCAL, "stack"):
+        _LOCAL.stack = []
+    stack = _LOCAL.stack
+
+    record = StageRecord(name)
+    stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        if len(stack) > 0:
+            stack[-1].nested += elapsed
+        observe(
+            name, elapsed - record.nested, record.rows, record.nbytes, record.detail
+        )
+
+
+def timed(name: str):
+    """Decorator timing all calls of a function as stage `name`
+
+    Place it above `@profile`, such that line_profiler sees the function itself.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_chunks(name: str, chunks, rows: int = None):
+    """Time the production of chunks of a streamed response as one stage
+
+    Time spent by the server to send chunks is not included.
+    """
+    iterator = iter(chunks)
+    elapsed = 0.0
+    nbytes = 0
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            break
+        finally:
+            elapsed += time.perf_counter() - start
+        nbytes += len(chunk)
+        yield chunk
+    observe(name, elapsed, rows, nbytes)
+
+
+def upstream_request(method: str, url: str, **kwargs) -> requests.Response:
+    """`requests.request`, timed as an upstream-http stage"""
+    with stage("upstream-http") as record:
+        record.detail = f"{method.upper()} {url}"
+        r = requests.request(method, url, **kwargs)
+        record.nbytes = len(r.content)
+    return r
@@ -0,0 +1,275 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""In-process store of the nightly statistics tables
+
+Statistics tables hold one row per night, keyed `<prefix>YYYYMMDD`.
+Each worker keeps a copy of the whole table in memory, and refreshes
+it incrementally: only nights from the last one stored are read again
+from HBase. Rows are cleaned once when they are ingested, and queries
+are answered from sorted NumPy arrays.
+"""
+
+import threading
+import time
+from functools import cache
+
+import numpy as np
+import pandas as pd
+from flask import Response
+
+from apps.utils.client import connect_to_hbase_table
+from apps.utils.decoding import hbase_to_dict
+from apps.utils.profiling import profile
+from apps.utils.utils import extract_configuration
+
+
+def night_range(date: str):
+    """Return the first and last nights (YYYYMMDD) matching a date prefix
+
+    Parameters
+    ----------
+    date: str
+        Night (YYYYMMDD), month (YYYYMM), year (YYYY), or empty string
+
+    Returns
+    -------
+    out: tuple of int
+
+    Raises
+    ------
+    ValueError
+        If the date is not a prefix of YYYYMMDD
+
+    Examples
+    --------
+    >>> night_range("2024")
+    (20240000, 20249999)
+    >>> night_range("20241104")
+    (20241104, 20241104)
+    >>> night_range("")
+    (0, 99999999)
+    """
+    if len(date) > 8 or (date != "" and not date.isdigit()):
+        raise ValueError(f"{date} is not a valid date (YYYY, YYYYMM or YYYYMMDD)")
+    return int(date.ljust(8, "0")), int(date.ljust(8, "9"))
+
+
+def read_nights(payload: dict):
+    """Return the range of nights requested by the user
+
+    Parameters
+    ----------
+    payload: dict
+        User payload, with a `date` prefix, or
+        `startdate` and/or `stopdate` (YYYYMMDD, included)
+
+    Returns
+    -------
+    out: tuple of int, or Response
+        First and last nights, or a Response if dates are malformed
+    """
+    try:
+        first_night, last_night = night_range(payload.get("date", ""))
+        if payload.get("startdate", "") != "":
+            first_night = max(first_night, night_range(payload["startdate"])[0])
+        if payload.get("stopdate", "") != "":
+            last_night = min(last_night, night_range(payload["stopdate"])[1])
+    except ValueError as e:
+        rep = {
+            "status": "error",
+            "text": f"{e}\n",
+        }
+        return Response(str(rep), 400)
+
+    if payload.get("aggregate", "") not in ["", "sum", "cumsum"]:
+        rep = {
+            "status": "error",
+            "text": "aggregate must be one of: sum, cumsum\n",
+        }
+        return Response(str(rep), 400)
+
+    return first_night, last_night
+
+
+class StatisticsStore:
+    """Copy of a statistics table, refreshed incrementally
+
+    Parameters
+    ----------
+    tablename: str
+        Name of the HBase table
+    prefix: str
+        Prefix of the rowkeys before the night, e.g. `ztf_`
+    refresh_interval: float
+        Minimum time between two reads of HBase, in second
+    """
+
+    def __init__(self, tablename: str, prefix: str, refresh_interval: float):
+        self.tablename = tablename
+        self.prefix = prefix
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.last_refresh = -np.inf
+
+        # Replaced at once on refresh, such that readers never see
+        # a partially updated store.
+        self.snapshot = (np.array([], dtype=np.int64), pd.DataFrame(), {})
+        self.warming = None
+
+    @property
+    def loaded(self) -> bool:
+        """True once the table has been read from HBase"""
+        return self.last_refresh > -np.inf
+
+    def warm(self):
+        """Read the table in a background thread, if not loaded yet
+
+        Callers that can do without statistics use it instead of `query`,
+        to not wait for the first full scan of the table.
+        """
+        with self.lock:
+            if self.loaded or self.warming is not None:
+                return
+            self.warming = threading.Thread(target=self._warm, daemon=True)
+            self.warming.start()
+
+    def _warm(self):
+        try:
+            self.refresh()
+        finally:
+            self.warming = None
+
+    @profile
+    def _scan(self, first_night: int) -> pd.DataFrame:
+        """Read all nights from `first_night` included"""
+        client = connect_to_hbase_table(self.tablename)
+        client.setRangeScan(True)
+        results = client.scan(
+            "",
+            f"key:key:{self.prefix}{first_night:08d},key:key:{self.prefix}99999999",
+            "*",
+            0,
+            True,
+            True,
+        )
+        pdf = pd.DataFrame.from_dict(hbase_to_dict(results), orient="index")
+        client.close()
+
+        # See https://github.com/astrolabsoftware/fink-science-portal/issues/579
+        return pdf.replace(regex={r"^\x00.*$": 0})
+
+    @profile
+    def refresh(self, force: bool = False):
+        """Read new nights from HBase
+
+        The last night stored is read again, as it can still be updated.
+        Nothing is done if the store was refreshed less than
+        `refresh_interval` seconds ago, unless `force` is True.
+        """
+        with self.lock:
+            if not force and time.time() - self.last_refresh < self.refresh_interval:
+                return
+
+            nights, pdf, _ = self.snapshot
+            first_night = int(nights[-1]) if len(nights) > 0 else 0
+            new = self._scan(first_night)
+
+            if not new.empty:
+                pdf = pd.concat([pdf[~pdf.index.isin(new.index)], new]).sort_index()
+                nights = np.array(
+                    [key[len(self.prefix) :][:8] for key in pdf.index], dtype=np.int64
+                )
+                # Numerical view of each column, for aggregates
+                values = {
+                    col: pd.to_numeric(pdf[col], errors="coerce").to_numpy(
+                        dtype=np.float64, na_value=np.nan
+                    )
+                    for col in pdf.columns
+                    if not col.startswith("key:")
+                }
+                self.snapshot = (nights, pdf, values)
+
+            self.last_refresh = time.time()
+
+    @profile
+    def query(
+        self,
+        first_night: int,
+        last_night: int,
+        columns: list = None,
+        aggregate: str = None,
+    ) -> pd.DataFrame:
+        """Return statistics for a range of nights
+
+        Parameters
+        ----------
+        first_night: int
+            First night (YYYYMMDD), included
+        last_night: int
+            Last night (YYYYMMDD), included
+        columns: list of str, optional
+            Columns to return, in addition to the `key` family.
+            Default is None (all columns).
+        aggregate: str, optional
+            `sum` to return the sum over all nights (one row), or
+            `cumsum` to return the cumulative sum night after night.
+            Only numerical columns are aggregated. Default is None.
+
+        Returns
+        -------
+        out: pd.DataFrame
+            Columns without data for these nights are dropped.
+        """
+        self.refresh()
+        nights, pdf, values = self.snapshot
+
+        start = np.searchsorted(nights, first_night, side="left")
+        stop = np.searchsorted(nights, last_night, side="right")
+
+        if columns is None:
+            columns = list(pdf.columns)
+        else:
+            columns = [col for col in pdf.columns if col in columns]
+
+        if aggregate is None:
+            keys = [col for col in pdf.columns if col.startswith("key:")]
+            out = pdf.iloc[start:stop][keys + [c for c in columns if c not in keys]]
+            return out.dropna(axis=1, how="all")
+
+        columns = [
+            col
+            for col in columns
+            if col in values and not np.all(np.isnan(values[col][start:stop]))
+        ]
+        if aggregate == "sum":
+            return pd.DataFrame(
+                {col: [np.nansum(values[col][start:stop])] for col in columns}
+            )
+
+        out = pd.DataFrame(
+            {col: np.nancumsum(values[col][start:stop]) for col in columns},
+            index=pdf.index[start:stop],
+        )
+        out.insert(0, "key:key", pdf.index[start:stop])
+        return out
+
+
+@cache
+def statistics_store(tablename: str, prefix: str) -> StatisticsStore:
+    """Return the store of a statistics table, shared by all requests"""
+    config = extract_configuration("config.yml")
+    return StatisticsStore(
+        tablename, prefix, float(config["STATISTICS_REFRESH_INTERVAL"])
+    )
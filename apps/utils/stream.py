@@ -0,0 +1,278 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Server-sent events of new alerts, shared among subscribers
+
+Each worker polls HBase once per topic (e.g. a class or a tag), whatever
+the number of subscribers. New rows are decoded once, and fanned out to
+the queue of each subscriber. Queues are bounded: a subscriber that does
+not keep up loses its oldest rows, and is told how many were dropped.
+
+Rowkeys sort by observation time, not by ingestion time. Each poll reads
+again a lookback window of observations, and skips the rows already
+seen (see `unseen_rows`), such that rows ingested late are streamed too.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from flask import Response, stream_with_context
+
+_LOG = logging.getLogger(__name__)
+
+_TOPICS = {}
+_TOPICS_LOCK = threading.Lock()
+
+
+class Subscription:
+    """Bounded queue of rows for one subscriber
+
+    Parameters
+    ----------
+    backlog: int
+        Maximum number of rows waiting to be sent
+    """
+
+    def __init__(self, backlog: int):
+        self.rows = deque(maxlen=backlog)
+        self.dropped = 0
+        self.condition = threading.Condition()
+
+    def push(self, rows: list, dropped: int = 0):
+        """Add rows, dropping the oldest ones if the queue is full
+
+        `dropped` rows were already lost before reaching the queue.
+        """
+        with self.condition:
+            overflow = len(self.rows) + len(rows) - self.rows.maxlen
+            self.dropped += dropped + max(0, overflow)
+            self.rows.extend(rows)
+            self.condition.notify()
+
+    def pop(self, timeout: float):
+        """Return all waiting rows and the number of dropped rows
+
+        Wait at most `timeout` seconds if the queue is empty.
+        """
+        with self.condition:
+            if len(self.rows) == 0:
+                self.condition.wait(timeout)
+            rows = list(self.rows)
+            self.rows.clear()
+            dropped, self.dropped = self.dropped, 0
+        return rows, dropped
+
+
+class Topic:
+    """Poll new rows for a topic, and fan them out to subscribers
+
+    Parameters
+    ----------
+    name: str
+        Name of the topic, e.g. `ztf/Early SN Ia candidate`
+    poll: callable
+        Function taking the rowkeys seen (None at start), and returning
+        the list of new rows (JSON str), the rowkeys seen, and the number
+        of new rows dropped because there were too many.
+    interval: float
+        Time between two polls, in second
+    """
+
+    def __init__(self, name: str, poll, interval: float):
+        self.name = name
+        self.poll = poll
+        self.interval = interval
+        self.subscribers = set()
+        self.thread = threading.Thread(
+            target=self._run, name=f"stream-{name}", daemon=True
+        )
+
+    def _run(self):
+        """Poll until the last subscriber leaves"""
+        seen = None
+        while True:
+            with _TOPICS_LOCK:
+                if len(self.subscribers) == 0:
+                    _TOPICS.pop(self.name, None)
+                    return
+                subscribers = list(self.subscribers)
+
+            try:
+                rows, seen, dropped = self.poll(seen)
+            except Exception as e:
+                _LOG.warning(f"Polling {self.name} failed: {e}")
+                rows, dropped = [], 0
+
+            if len(rows) > 0 or dropped > 0:
+                for subscriber in subscribers:
+                    subscriber.push(rows, dropped)
+
+            time.sleep(self.interval)
+
+
+def unseen_rows(results, seen: set, lower: str, nmax: int):
+    """Keep the rows not seen yet, at most the `nmax` most recent ones
+
+    Results are modified in place.
+
+    Parameters
+    ----------
+    results: dict or java.util.TreeMap
+        HBase rows of the lookback window, keyed by rowkey
+    seen: set
+        Rowkeys seen by the previous polls
+    lower: str
+        Lower rowkey of the lookback window. Older rowkeys are forgotten.
+    nmax: int
+        Maximum number of rows to keep
+
+    Returns
+    -------
+    seen: set
+        Rowkeys seen, including this poll
+    dropped: int
+        Number of new rows removed, beyond `nmax`
+
+    Examples
+    --------
+    >>> results = {"c_2": {}, "c_3": {}, "c_4": {}, "c_5": {}}
+    >>> seen, dropped = unseen_rows(results, {"c_1", "c_3"}, "c_2", 2)
+    >>> sorted(results), sorted(seen), dropped
+    (['c_4', 'c_5'], ['c_2', 'c_3', 'c_4', 'c_5'], 1)
+    """
+    window = {key for key in seen if key >= lower}
+    new = sorted(key for key in results if key not in window)
+    dropped = max(0, len(new) - nmax)
+
+    keep = set(new[dropped:])
+    for key in list(results):
+        if key not in keep:
+            del results[key]
+
+    return window | set(new), dropped
+
+
+def subscribe(name: str, poll, interval: float, backlog: int, max_subscribers: int):
+    """Subscribe to a topic, starting its poller if needed
+
+    Parameters
+    ----------
+    name: str
+        Name of the topic
+    poll: callable
+        See `Topic`
+    interval: float
+        Time between two polls, in second
+    backlog: int
+        Maximum number of rows waiting to be sent to the subscriber
+    max_subscribers: int
+        Maximum number of subscribers for all topics in this worker
+
+    Returns
+    -------
+    out: tuple or None
+        (Topic, Subscription), or None if the worker is full
+    """
+    subscription = Subscription(backlog)
+    with _TOPICS_LOCK:
+        if sum(len(t.subscribers) for t in _TOPICS.values()) >= max_subscribers:
+            return None
+
+        topic = _TOPICS.get(name)
+        if topic is None:
+            topic = Topic(name, poll, interval)
+            _TOPICS[name] = topic
+            topic.thread.start()
+        topic.subscribers.add(subscription)
+
+    return topic, subscription
+
+
+def unsubscribe(topic: Topic, subscription: Subscription):
+    """Remove a subscriber. The poller stops after the last one leaves."""
+    with _TOPICS_LOCK:
+        topic.subscribers.discard(subscription)
+
+
+def event_stream(topic, subscription, heartbeat: float, max_duration: float):
+    """Generate server-sent events for a subscriber
+
+    Each row is sent as an `alert` event. A `dropped` event is sent if
+    rows were lost because the subscriber did not keep up. Comments are
+    sent every `heartbeat` seconds to keep the connection open. The
+    stream ends after `max_duration` seconds, and clients are expected
+    to reconnect.
+    """
+    start = time.time()
+    try:
+        yield f"retry: {int(heartbeat * 1000)}\n\n"
+        while time.time() - start < max_duration:
+            rows, dropped = subscription.pop(heartbeat)
+            if dropped > 0:
+                yield f"event: dropped\ndata: {json.dumps({'dropped': dropped})}\n\n"
+            for row in rows:
+                yield f"event: alert\ndata: {row}\n\n"
+            if len(rows) == 0 and dropped == 0:
+                yield ": keep-alive\n\n"
+    finally:
+        unsubscribe(topic, subscription)
+
+
+def stream_topic(name: str, poll, config: dict) -> Response:
+    """Return a server-sent events Response for a topic
+
+    Parameters
+    ----------
+    name: str
+        Name of the topic
+    poll: callable
+        See `Topic`
+    config: dict
+        Configuration, with STREAM_* entries
+
+    Returns
+    -------
+    out: Response
+        text/event-stream Response, or 503 if the worker is full
+    """
+    out = subscribe(
+        name,
+        poll,
+        float(config["STREAM_POLL_INTERVAL"]),
+        int(config["STREAM_BACKLOG"]),
+        int(config["STREAM_MAX_SUBSCRIBERS"]),
+    )
+    if out is None:
+        rep = {
+            "status": "error",
+            "text": "Too many streams are open. Try again later.\n",
+        }
+        return Response(str(rep), 503)
+
+    topic, subscription = out
+    return Response(
+        stream_with_context(
+            event_stream(
+                topic,
+                subscription,
+                float(config["STREAM_HEARTBEAT"]),
+                float(config["STREAM_MAX_DURATION"]),
+            )
+        ),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
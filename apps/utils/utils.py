@@ -14,19 +14,22 @@
 # limitations under the License.
 """Various utilities"""
 
+import hashlib
 import io
 import json
 import logging
+import os
+import tempfile
 
 import numpy as np
-import requests
-import rocks
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yaml
-from astropy.io import votable
-from astropy.table import Table
 from astropy.time import Time
-from flask import Response
-from line_profiler import profile
+from flask import Response, request, stream_with_context
+
+from apps.utils.profiling import profile
+from apps.utils.stages import stage, timed_chunks, upstream_request
 
 _LOG = logging.getLogger(__name__)
 
@@ -53,12 +56,34 @@ def extract_configuration(filename):
     return config
 
 
+def atomic_write(path: str, write_fn):
+    """Write a file such that concurrent readers never see partial content
+
+    Parameters
+    ----------
+    path: str
+        Path to the file
+    write_fn: callable
+        Function writing the content, given the file object (binary mode)
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_fn(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
 @profile
 def download_cutout(objectId, candid, kind):
     """Wrapper around /api/v1/cutouts"""
     config = extract_configuration("config.yml")
 
-    r = requests.post(
+    r = upstream_request(
+        "post",
         "{}/api/v1/cutouts".format(config["APIURL"]),
         json={
             "objectId": objectId,
@@ -112,37 +137,180 @@ def send_tabular_data(pdf, output_format):
         Depends on the `output_format` chosen. In
         case of error, returns `Response` object.
     """
+    with stage("encode") as record:
+        if output_format == "json":
+            body = pdf.to_json(orient="records")
+            content_type = "application/json"
+        elif output_format == "csv":
+            # TODO: set header?
+            body = pdf.to_csv(index=False)
+            content_type = "application/csv"
+        elif output_format == "votable":
+            from astropy.io import votable
+            from astropy.table import Table
+
+            f = io.BytesIO()
+            table = Table.from_pandas(pdf)
+            vt = votable.from_table(table)
+            votable.writeto(vt, f)
+            body = f.getvalue()
+            content_type = "text/xml"
+        elif output_format == "parquet":
+            f = io.BytesIO()
+            pdf.to_parquet(f)
+            body = f.getvalue()
+            content_type = "parquet"
+        else:
+            rep = {
+                "status": "error",
+                "text": f"Output format `{output_format}` is not supported. Choose among json, csv, votable, or parquet\n",
+            }
+            return Response(str(rep), 400)
+        record.rows = len(pdf)
+        record.nbytes = len(body)
+
+    response = Response(body, 200)
+    response.headers.set("Content-Type", content_type)
+    return response
+
+
+def json_body(data) -> tuple:
+    """Serialise data once, to be sent with `send_json_body`
+
+    Parameters
+    ----------
+    data: Any
+        JSON serialisable data
+
+    Returns
+    -------
+    body: bytes
+        JSON encoded data
+    etag: str
+        Strong validator for the body
+    """
+    body = json.dumps(data).encode()
+    return body, hashlib.sha256(body).hexdigest()
+
+
+def send_json_body(body: bytes, etag: str) -> Response:
+    """Send a precomputed JSON body, or 304 if the client has it already
+
+    Parameters
+    ----------
+    body: bytes
+        JSON encoded data
+    etag: str
+        Strong validator for the body
+
+    Returns
+    -------
+    out: Response
+    """
+    response = Response(body, 200, mimetype="application/json")
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+class _ChunkSink:
+    """Write-only file object whose content is drained by chunks"""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        out = b"".join(self.chunks)
+        self.chunks = []
+        return out
+
+
+def stream_tabular_data(pdf, output_format, chunksize=10000, headers=None):
+    """Send tabular data over HTTP, by chunks of rows
+
+    Unlike `send_tabular_data`, the body is never fully materialised
+    in memory. VOTable cannot be streamed, and is sent in one go.
+
+    Parameters
+    ----------
+    pdf: pd.DataFrame
+        Pandas DataFrame with data to be sent
+    output_format: str
+        Output format: json, csv, parquet, arrow, votable.
+    chunksize: int, optional
+        Number of rows per chunk. Default is 10000.
+    headers: dict, optional
+        Additional headers for the response
+
+    Returns
+    -------
+    out: Response
+    """
+    chunks = range(0, len(pdf), chunksize)
+
     if output_format == "json":
-        response = Response(pdf.to_json(orient="records"), 200)
-        response.headers.set("Content-Type", "application/json")
-        return response
+
+        def generate():
+            yield "["
+            for i, start in enumerate(chunks):
+                records = pdf.iloc[start : start + chunksize].to_json(orient="records")
+                yield ("," if i > 0 else "") + records[1:-1]
+            yield "]"
+
+        content_type = "application/json"
     elif output_format == "csv":
-        # TODO: set header?
-        response = Response(pdf.to_csv(index=False), 200)
-        response.headers.set("Content-Type", "application/csv")
-        return response
-    elif output_format == "votable":
-        f = io.BytesIO()
-        table = Table.from_pandas(pdf)
-        vt = votable.from_table(table)
-        votable.writeto(vt, f)
-        f.seek(0)
-        response = Response(f.read(), 200)
-        response.headers.set("Content-Type", "text/xml")
-        return response
-    elif output_format == "parquet":
-        f = io.BytesIO()
-        pdf.to_parquet(f)
-        f.seek(0)
-        response = Response(f.read(), 200)
-        response.headers.set("Content-Type", "parquet")
+
+        def generate():
+            yield pdf.iloc[:0].to_csv(index=False)
+            for start in chunks:
+                yield pdf.iloc[start : start + chunksize].to_csv(
+                    index=False, header=False
+                )
+
+        content_type = "application/csv"
+    elif output_format in ["parquet", "arrow"]:
+        table = pa.Table.from_pandas(pdf, preserve_index=False)
+
+        def generate():
+            sink = _ChunkSink()
+            if output_format == "parquet":
+                writer = pq.ParquetWriter(sink, table.schema)
+            else:
+                writer = pa.ipc.new_stream(sink, table.schema)
+            with writer:
+                for start in chunks:
+                    writer.write_table(table.slice(start, chunksize))
+                    yield sink.drain()
+            yield sink.drain()
+
+        content_type = (
+            "parquet"
+            if output_format == "parquet"
+            else "application/vnd.apache.arrow.stream"
+        )
+    else:
+        response = send_tabular_data(pdf, output_format)
+        for key, value in (headers or {}).items():
+            response.headers.set(key, value)
         return response
 
-    rep = {
-        "status": "error",
-        "text": f"Output format `{output_format}` is not supported. Choose among json, csv, votable, or parquet\n",
-    }
-    return Response(str(rep), 400)
+    response = Response(
+        stream_with_context(timed_chunks("encode", generate(), len(pdf))), 200
+    )
+    response.headers.set("Content-Type", content_type)
+    for key, value in (headers or {}).items():
+        response.headers.set(key, value)
+    return response
 
 
 def isoify_time(t):
@@ -186,7 +354,8 @@ def resolve_sso_name_to_ssnamenr(sso_name):
     config = extract_configuration("config.yml")
 
     # search all ssnamenr corresponding quaero -> ssnamenr
-    r = requests.post(
+    r = upstream_request(
+        "post",
         "{}/api/v1/resolver".format(config["APIURL"]),
         json={"resolver": "ssodnet", "name": sso_name, "nmax": 1},
     )
@@ -214,5 +383,8 @@ def resolve_sso_name(sso_name):
     number: str
         UAI number. NaN if does not exist.
     """
-    sso_name, sso_number = rocks.identify(sso_name)
+    import rocks
+
+    with stage("upstream-http"):
+        sso_name, sso_number = rocks.identify(sso_name)
     return sso_name, sso_number
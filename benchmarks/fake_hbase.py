@@ -0,0 +1,308 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Python stand-in for the py4j gateway and the Lomikel HBaseClient
+
+Tables are read from local parquet fixtures (see `benchmarks.fixtures`),
+with one row per HBase row, a `key:key` column, and all values stored as
+strings like in HBase. `install` replaces the py4j gateway used by
+`apps.utils.client` and `apps.utils.decoding`, such that route utilities
+run unchanged without a JVM.
+
+Supported subset of the HBaseClient:
+- prefix scans `key:key:<prefix>`, several of them being OR-ed
+- range scans `key:key:<lower>,key:key:<upper>` with `setRangeScan`
+- column filters `<family>:<column>:<value>[:exact|:substring]`
+- `setEvaluation` formulae on bare column names (&&, ||, comparisons)
+- `setLimit`, `setReversed`, `schema`, `put`
+"""
+
+import bisect
+import json
+import os
+import re
+import time
+
+import pandas as pd
+
+_TABLES = {}
+
+
+class FakeTable:
+    """Rows of a table, sorted by rowkey"""
+
+    def __init__(self, rows: dict, types: dict):
+        self.rows = rows
+        self.keys = sorted(rows)
+        self.types = types
+
+    @classmethod
+    def from_parquet(cls, path: str, types: dict):
+        pdf = pd.read_parquet(path)
+        rows = {}
+        for record in pdf.to_dict(orient="records"):
+            key = record.pop("key:key")
+            rows[key] = {
+                col: value for col, value in record.items() if value is not None
+            }
+        return cls(rows, types)
+
+    def put(self, key: str, row: dict):
+        if key not in self.rows:
+            bisect.insort(self.keys, key)
+            self.rows[key] = {}
+        self.rows[key].update(row)
+
+
+class FakeTreeMap(dict):
+    """Rows returned by a scan, with the java.util.TreeMap methods used"""
+
+    def isEmpty(self):  # noqa: N802
+        return len(self) == 0
+
+
+class FakeSchema:
+    """Stand-in for the schema of a table"""
+
+    def __init__(self, types: dict):
+        self.types = types
+
+    def columnNames(self):  # noqa: N802
+        return list(self.types)
+
+    def type(self, col):
+        # HBaseClient returns null for unknown columns
+        return self.types.get(col)
+
+
+def _to_python(formula: str) -> str:
+    """Translate a Lomikel (Java) evaluation formula into Python
+
+    Examples
+    --------
+    >>> _to_python("a >= 1 && b.equals('x') || !c")
+    "a >= 1  and  b == ('x')  or  not c"
+    """
+    formula = formula.replace("&&", " and ").replace("||", " or ")
+    formula = formula.replace(".equals(", " == (")
+    return re.sub(r"!(?!=)", " not ", formula).replace("  not ", " not ")
+
+
+class FakeHBaseClient:
+    """Stand-in for com.Lomikel.HBaser.HBaseClient
+
+    Parameters
+    ----------
+    fixtures: str
+        Folder containing `<table>.parquet` files and `schema.json`
+    latency: float
+        Time spent per scan, in second, to mimic the py4j and RPC costs
+    """
+
+    def __init__(self, fixtures: str, latency: float = 0.0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.table = None
+        self.limit = 0
+        self.range_scan = False
+        self.reversed = False
+        self.evaluation = None
+        self.nscans = 0
+
+    def connect(self, tablename: str, schema_name=None):
+        path = os.path.join(self.fixtures, f"{tablename}.parquet")
+        if path not in _TABLES:
+            with open(os.path.join(self.fixtures, "schema.json")) as f:
+                types = json.load(f).get(tablename, {})
+            if os.path.exists(path):
+                _TABLES[path] = FakeTable.from_parquet(path, types)
+            else:
+                _TABLES[path] = FakeTable({}, types)
+        self.table = _TABLES[path]
+
+    def setLimit(self, limit):  # noqa: N802
+        self.limit = int(limit)
+
+    def setRangeScan(self, flag):  # noqa: N802
+        self.range_scan = flag
+
+    def setReversed(self, flag):  # noqa: N802
+        self.reversed = flag
+
+    def setEvaluation(self, formula):  # noqa: N802
+        self.evaluation = formula
+
+    def schema(self):
+        return FakeSchema(self.table.types)
+
+    def close(self):
+        pass
+
+    def put(self, key, values):
+        row = {}
+        for value in values:
+            family, col, content = value.split(":", 2)
+            row[f"{family}:{col}"] = content
+        self.table.put(key, row)
+
+    def _candidates(self, terms):
+        """Rowkeys matching the rowkey terms, in ascending order"""
+        keys = self.table.keys
+        if len(terms) == 0:
+            return keys
+        if self.range_scan and len(terms) == 2:
+            (lower, _), (upper, _) = terms
+            return keys[
+                bisect.bisect_left(keys, lower) : bisect.bisect_right(keys, upper)
+            ]
+
+        out = set()
+        for value, operation in terms:
+            if operation == "substring":
+                out.update(key for key in keys if value in key)
+            elif operation == "exact":
+                if value in self.table.rows:
+                    out.add(value)
+            else:
+                start = bisect.bisect_left(keys, value)
+                stop = bisect.bisect_left(keys, value + "\U0010ffff")
+                out.update(keys[start:stop])
+        return sorted(out)
+
+    def _evaluate(self, row) -> bool:
+        names = {}
+        for col, value in row.items():
+            try:
+                names[col.split(":")[-1]] = float(value)
+            except ValueError:
+                names[col.split(":")[-1]] = value
+        try:
+            return bool(eval(_to_python(self.evaluation), {}, names))  # noqa: S307
+        except Exception:
+            return False
+
+    def scan(self, key, search, cols, delay, ifkey, iftime):
+        self.nscans += 1
+        time.sleep(self.latency)
+
+        key_terms, col_terms = [], []
+        for term in [t for t in search.split(",") if t != ""]:
+            family, col, value = term.split(":", 2)
+            operation = None
+            if value.rsplit(":", 1)[-1] in ["exact", "substring"]:
+                value, operation = value.rsplit(":", 1)
+            if (family, col) == ("key", "key"):
+                key_terms.append((value, operation))
+            else:
+                col_terms.append((f"{family}:{col}", value, operation))
+
+        keys = self._candidates(key_terms)
+        if self.reversed:
+            keys = keys[::-1]
+
+        wanted = None if cols in ["*", ""] else cols.split(",")
+
+        out = {}
+        for rowkey in keys:
+            row = self.table.rows[rowkey]
+            if any(
+                not (
+                    (operation == "exact" and row.get(col) == value)
+                    or (operation == "substring" and value in row.get(col, ""))
+                    or (operation is None and row.get(col, "").startswith(value))
+                )
+                for col, value, operation in col_terms
+            ):
+                continue
+            if self.evaluation is not None and not self._evaluate(row):
+                continue
+
+            if wanted is None:
+                selected = dict(row)
+            else:
+                selected = {
+                    col: value
+                    for col, value in row.items()
+                    if col in wanted or col.split(":")[0] in wanted
+                }
+            if ifkey:
+                selected["key:key"] = rowkey
+            if iftime:
+                selected["key:time"] = "1700000000000"
+            out[rowkey] = selected
+
+            if self.limit > 0 and len(out) >= self.limit:
+                break
+
+        # Results are a TreeMap on the Java side
+        return FakeTreeMap(sorted(out.items()))
+
+
+class _Namespace:
+    """Attribute access on nested dictionaries, like `gateway.jvm.com...`"""
+
+    def __init__(self, content):
+        self.content = content
+
+    def __getattr__(self, name):
+        value = self.content[name]
+        return _Namespace(value) if isinstance(value, dict) else value
+
+
+class FakeGson:
+    def toJson(self, obj):  # noqa: N802
+        return json.dumps(obj)
+
+
+class FakeGateway:
+    """Stand-in for py4j.java_gateway.JavaGateway"""
+
+    fixtures = None
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        self.jvm = _Namespace(
+            {
+                "com": {
+                    "Lomikel": {
+                        "HBaser": {
+                            "HBaseClient": lambda *args: FakeHBaseClient(
+                                FakeGateway.fixtures, FakeGateway.latency
+                            )
+                        }
+                    },
+                    "google": {"gson": {"Gson": FakeGson}},
+                }
+            }
+        )
+
+
+def install(fixtures: str, latency: float = 0.0):
+    """Serve HBase tables from `fixtures` to all route utilities
+
+    Parameters
+    ----------
+    fixtures: str
+        Folder containing the parquet fixtures
+    latency: float, optional
+        Time spent per scan, in second. Default is 0.
+    """
+    import apps.utils.client
+    import apps.utils.decoding
+
+    _TABLES.clear()
+    FakeGateway.fixtures = fixtures
+    FakeGateway.latency = latency
+    apps.utils.client.JavaGateway = FakeGateway
+    apps.utils.decoding.JavaGateway = FakeGateway
@@ -0,0 +1,516 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Synthetic HBase tables for the offline benchmarks
+
+Tables are written as parquet files, one per HBase table, with rowkeys
+following the layout of the production tables. Objects are spread
+over a 2 degree wide patch of sky around (RA, Dec) = (CENTER_RA,
+CENTER_DEC), such that conesearches return a realistic number of rows.
+
+Usage:
+    python -m benchmarks.fixtures --nobjects 1000 --output /tmp/fixtures
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from healpy import ang2pix
+
+CENTER_RA = 193.822
+CENTER_DEC = 2.896
+
+# Incremented when tables are added or changed, to rebuild old fixtures
+VERSION = 2
+
+ZTF_CLASSES = [
+    "Early SN Ia candidate",
+    "SN candidate",
+    "Kilonova candidate",
+    "Microlensing candidate",
+    "Solar System MPC",
+    "RRLyr",
+]
+
+ZTF_TYPES = {
+    "i:objectId": "string",
+    "i:candid": "long",
+    "i:jd": "double",
+    "i:jdstarthist": "double",
+    "i:ra": "double",
+    "i:dec": "double",
+    "i:fid": "integer",
+    "i:magpsf": "float",
+    "i:sigmapsf": "float",
+    "i:ndethist": "integer",
+    "i:drb": "float",
+    "i:classtar": "float",
+    "i:ssnamenr": "string",
+    "d:cdsxmatch": "string",
+    "d:roid": "integer",
+    "d:mulens": "double",
+    "d:snn_snia_vs_nonia": "double",
+    "d:snn_sn_vs_all": "double",
+    "d:rf_snia_vs_nonia": "double",
+    "d:rf_kn_vs_nonkn": "double",
+    "d:anomaly_score": "double",
+    "d:tracklet": "string",
+    "d:tns": "string",
+    "d:blazar_stats_m0": "double",
+    "d:blazar_stats_m1": "double",
+    "d:blazar_stats_m2": "double",
+    "d:blazar_stats_instantness_low": "double",
+    "d:blazar_stats_robustness_low": "double",
+    "d:blazar_stats_instantness_high": "double",
+    "d:blazar_stats_robustness_high": "double",
+}
+
+LSST_TYPES = {
+    "r:diaSourceId": "long",
+    "r:diaObjectId": "long",
+    "r:midpointMjdTai": "double",
+    "r:ra": "double",
+    "r:dec": "double",
+    "r:band": "string",
+    "r:psfFlux": "float",
+    "r:psfFluxErr": "float",
+    "r:snr": "float",
+    "f:xm_tns_fullname": "string",
+    "f:xm_tns_type": "string",
+    "f:main_label_crossmatch": "string",
+    "f:firstDiaSourceMjdTaiFink": "double",
+}
+
+LSST_FP_TYPES = {
+    "r:diaObjectId": "long",
+    "r:midpointMjdTai": "double",
+    "r:ra": "double",
+    "r:dec": "double",
+    "r:band": "string",
+    "r:psfFlux": "float",
+    "r:psfFluxErr": "float",
+}
+
+SSO_CAND_TYPES = {
+    "d:ssoCandId": "string",
+    "d:objectId": "string",
+    "d:candid": "long",
+    "d:jd": "double",
+    "d:ra": "double",
+    "d:dec": "double",
+    "d:fid": "integer",
+    "d:magpsf": "float",
+    "d:sigmapsf": "float",
+}
+
+ORB_CAND_TYPES = {
+    "d:ssoCandId": "string",
+    "d:a": "double",
+    "d:e": "double",
+    "d:i": "double",
+    "d:long. node": "double",
+    "d:arg. peric": "double",
+    "d:mean anomaly": "double",
+    "d:ref_epoch": "double",
+}
+
+LSST_OBJECT_TYPES = {
+    "r:diaObjectId": "long",
+    "r:ra": "double",
+    "r:dec": "double",
+    "r:nDiaSources": "integer",
+    "r:lastDiaSourceMjdTai": "double",
+    "f:main_label_crossmatch": "string",
+}
+
+
+def ztf_name(index: int) -> str:
+    """ZTF-like object name
+
+    Examples
+    --------
+    >>> ztf_name(0), ztf_name(27)
+    ('ZTF21aaaaaaa', 'ZTF21aaaaabb')
+    """
+    letters = []
+    for _ in range(7):
+        index, rest = divmod(index, 26)
+        letters.append(chr(ord("a") + rest))
+    return "ZTF21" + "".join(letters[::-1])
+
+
+def _sky(rng, n: int):
+    ra = CENTER_RA + rng.uniform(-1, 1, n) / np.cos(np.radians(CENTER_DEC))
+    dec = CENTER_DEC + rng.uniform(-1, 1, n)
+    return ra, dec
+
+
+def _write(output: str, tablename: str, rows: dict):
+    """Write rows keyed by rowkey, with all values as strings"""
+    pdf = pd.DataFrame.from_dict(rows, orient="index").astype(str)
+    pdf.insert(0, "key:key", pdf.index)
+    pdf.to_parquet(os.path.join(output, f"{tablename}.parquet"), index=False)
+
+
+def ztf_tables(rng, nobjects: int, output: str, schema: dict):
+    """Write ztf, ztf.class, ztf.anomaly, ztf.pixel128 and related tables"""
+    ra, dec = _sky(rng, nobjects)
+    nalerts = rng.poisson(5, nobjects) + 1
+    jdstart = 2459215.5 + rng.uniform(0, 300, nobjects)
+
+    alerts = {}
+    for index in range(nobjects):
+        name = ztf_name(index)
+        for jd in np.sort(jdstart[index] + rng.uniform(0, 60, nalerts[index])):
+            alerts[f"{name}_{jd:.8f}"] = {
+                "i:objectId": name,
+                "i:candid": str(rng.integers(1e17, 1e18)),
+                "i:jd": f"{jd:.8f}",
+                "i:jdstarthist": f"{jdstart[index]:.8f}",
+                "i:ra": f"{ra[index] + rng.normal(0, 1e-5):.7f}",
+                "i:dec": f"{dec[index] + rng.normal(0, 1e-5):.7f}",
+                "i:fid": str(rng.integers(1, 3)),
+                "i:magpsf": f"{rng.uniform(15, 21):.4f}",
+                "i:sigmapsf": f"{rng.uniform(0.01, 0.2):.4f}",
+                "i:ndethist": str(rng.integers(1, 50)),
+                "i:drb": f"{rng.uniform(0, 1):.4f}",
+                "i:classtar": f"{rng.uniform(0, 1):.4f}",
+                "i:ssnamenr": "null",
+                "d:cdsxmatch": "Unknown",
+                "d:roid": "0",
+                "d:mulens": "0.0",
+                "d:snn_snia_vs_nonia": f"{rng.uniform(0, 1):.4f}",
+                "d:snn_sn_vs_all": f"{rng.uniform(0, 1):.4f}",
+                "d:rf_snia_vs_nonia": f"{rng.uniform(0, 1):.4f}",
+                "d:rf_kn_vs_nonkn": f"{rng.uniform(0, 1):.4f}",
+                "d:anomaly_score": f"{rng.normal(0, 0.3):.4f}",
+                "d:tracklet": "",
+                "d:tns": "",
+            }
+    _write(output, "ztf", alerts)
+
+    classes = rng.choice(ZTF_CLASSES, len(alerts))
+    _write(
+        output,
+        "ztf.class",
+        {
+            f"{fink_class}_{alert['i:jd']}": alert
+            for fink_class, alert in zip(classes, alerts.values(), strict=True)
+        },
+    )
+    _write(
+        output,
+        "ztf.anomaly",
+        {
+            f"{alert['i:jd']}_{alert['i:objectId']}": alert
+            for alert in alerts.values()
+            if float(alert["d:anomaly_score"]) < -0.3
+        },
+    )
+
+    pixs = ang2pix(
+        128,
+        np.array([float(a["i:ra"]) for a in alerts.values()]),
+        np.array([float(a["i:dec"]) for a in alerts.values()]),
+        lonlat=True,
+    )
+    _write(
+        output,
+        "ztf.pixel128",
+        {
+            f"{pix}_{alert['i:jd']}_{alert['i:objectId']}": alert
+            for pix, alert in zip(pixs, alerts.values(), strict=True)
+        },
+    )
+
+    # One row per night
+    nights = pd.date_range("2021-01-01", periods=min(nobjects, 2000), freq="D")
+    _write(
+        output,
+        "statistics_class",
+        {
+            f"ztf_{night:%Y%m%d}": {
+                "basic:raw": str(rng.integers(1e5, 5e5)),
+                "basic:sci": str(rng.integers(1e4, 5e4)),
+                "basic:date": f"{night:%Y-%m-%d}",
+                **{f"class:{c}": str(rng.integers(0, 100)) for c in ZTF_CLASSES},
+            }
+            for night in nights
+        },
+    )
+
+    names = [ztf_name(index) for index in rng.choice(nobjects, nobjects // 10 + 1)]
+    _write(
+        output,
+        "ztf.metadata",
+        {
+            name: {
+                "d:internal_name": f"Fink {name}",
+                "d:internal_name_encoded": f"Fink{name}",
+                "d:comments": "synthetic",
+                "d:username": "benchmark",
+            }
+            for name in names
+        },
+    )
+    _write(
+        output,
+        "ztf.tns_resolver",
+        {
+            f"sn 2023{name[-4:]}_{name}": {
+                "d:fullname": f"SN 2023{name[-4:]}",
+                "d:internalname": name,
+                "d:type": "SN Ia",
+            }
+            for name in names
+        },
+    )
+
+    schema["ztf"] = ZTF_TYPES
+    schema["ztf.class"] = ZTF_TYPES
+    schema["ztf.anomaly"] = ZTF_TYPES
+    schema["ztf.pixel128"] = ZTF_TYPES
+
+
+def lsst_tables(rng, nobjects: int, output: str, schema: dict, tag: str):
+    """Write rubin.diaObject, rubin.diaSource_static, rubin.pixel1024 and related"""
+    ra, dec = _sky(rng, nobjects)
+    nsources = rng.poisson(5, nobjects) + 1
+    first = 60800.0 + rng.uniform(0, 300, nobjects)
+    ids = 170032915988086000 + np.arange(nobjects)
+
+    objects = {}
+    sources = {}
+    for index, diaobjectid in enumerate(ids.astype(str)):
+        mjds = np.sort(first[index] + rng.uniform(0, 60, nsources[index]))
+        objects[f"{diaobjectid[-3:]}_{diaobjectid}"] = {
+            "r:diaObjectId": diaobjectid,
+            "r:ra": f"{ra[index]:.7f}",
+            "r:dec": f"{dec[index]:.7f}",
+            "r:nDiaSources": str(nsources[index]),
+            "r:lastDiaSourceMjdTai": f"{mjds[-1]:.6f}",
+            "f:main_label_crossmatch": "Unknown",
+        }
+        for mjd in mjds:
+            sources[f"{diaobjectid[-3:]}_{diaobjectid}_{mjd:.6f}"] = {
+                "r:diaSourceId": str(rng.integers(1e17, 1e18)),
+                "r:diaObjectId": diaobjectid,
+                "r:midpointMjdTai": f"{mjd:.6f}",
+                "r:ra": f"{ra[index] + rng.normal(0, 1e-5):.7f}",
+                "r:dec": f"{dec[index] + rng.normal(0, 1e-5):.7f}",
+                "r:band": str(rng.choice(list("ugrizy"))),
+                "r:psfFlux": f"{rng.uniform(1e3, 1e5):.3f}",
+                "r:psfFluxErr": f"{rng.uniform(10, 100):.3f}",
+                "r:snr": f"{rng.uniform(5, 100):.3f}",
+                "f:xm_tns_fullname": "nan",
+                "f:xm_tns_type": "nan",
+                "f:main_label_crossmatch": "Unknown",
+                "f:firstDiaSourceMjdTaiFink": f"{first[index]:.6f}",
+            }
+    _write(output, "rubin.diaObject", objects)
+    _write(output, "rubin.diaSource_static", sources)
+
+    pixs = ang2pix(
+        1024,
+        np.array([float(s["r:ra"]) for s in sources.values()]),
+        np.array([float(s["r:dec"]) for s in sources.values()]),
+        lonlat=True,
+    )
+    _write(
+        output,
+        "rubin.pixel1024",
+        {
+            f"{pix}_{s['r:diaSourceId']}": s
+            for pix, s in zip(pixs, sources.values(), strict=True)
+        },
+    )
+    _write(
+        output,
+        "rubin.pixel1024_mjd",
+        {
+            f"{pix}_{float(s['r:midpointMjdTai']):012.6f}_{s['r:diaObjectId']}": s
+            for pix, s in zip(pixs, sources.values(), strict=True)
+        },
+    )
+
+    # Forced photometry at the position of the object, for each detection
+    forced = {}
+    for key, s in sources.items():
+        obj = objects[key.rsplit("_", 1)[0]]
+        forced[key] = {col: s[col] for col in LSST_FP_TYPES if col in s}
+        forced[key].update({"r:ra": obj["r:ra"], "r:dec": obj["r:dec"]})
+    _write(output, "rubin.fp", forced)
+    _write(
+        output,
+        f"rubin.tag_{tag}",
+        {
+            f"{s['r:midpointMjdTai']}_{s['r:diaSourceId']}": s
+            for s in list(sources.values())[:: max(1, len(sources) // 1000)]
+        },
+    )
+
+    nights = pd.date_range("2025-06-01", periods=min(nobjects, 2000), freq="D")
+    _write(
+        output,
+        "rubin.statistics",
+        {
+            f"{night:%Y%m%d}": {
+                "f:alerts": str(rng.integers(1e3, 1e6)),
+                "f:objects": str(rng.integers(1e2, 1e5)),
+            }
+            for night in nights
+        },
+    )
+
+    names = [str(i) for i in rng.choice(ids, nobjects // 10 + 1)]
+    _write(
+        output,
+        "rubin.tns_resolver",
+        {
+            # salt is the last letter of the name
+            f"{name[-1]}_at 2025a{name[-4:]}": {
+                "f:fullname": f"AT 2025a{name[-4:]}",
+                "f:diaObjectId": name,
+            }
+            for name in names
+        },
+    )
+
+    schema["rubin.diaObject"] = LSST_OBJECT_TYPES
+    schema["rubin.diaSource_static"] = LSST_TYPES
+    schema["rubin.pixel1024"] = LSST_TYPES
+    schema["rubin.pixel1024_mjd"] = LSST_TYPES
+    schema["rubin.fp"] = LSST_FP_TYPES
+    schema[f"rubin.tag_{tag}"] = LSST_TYPES
+
+
+def sso_tables(rng, nobjects: int, output: str, schema: dict):
+    """Write ztf.sso_cand and ztf.orb_cand (Solar System candidates)"""
+    ntrajectories = nobjects // 10 + 1
+    observations = {}
+    orbits = {}
+    for index in range(ntrajectories):
+        trajectory_id = f"FF2021{ztf_name(index)[5:]}"
+        ra, dec = _sky(rng, 1)
+        jds = np.sort(2459215.5 + rng.uniform(0, 300) + rng.uniform(0, 10, 6))
+        for jd in jds:
+            candid = str(rng.integers(1e17, 1e18))
+            observations[f"{jd:.8f}_{candid}"] = {
+                "d:ssoCandId": trajectory_id,
+                "d:objectId": ztf_name(int(rng.integers(nobjects))),
+                "d:candid": candid,
+                "d:jd": f"{jd:.8f}",
+                "d:ra": f"{ra[0] + (jd - jds[0]) * 0.1:.7f}",
+                "d:dec": f"{dec[0] + (jd - jds[0]) * 0.05:.7f}",
+                "d:fid": str(rng.integers(1, 3)),
+                "d:magpsf": f"{rng.uniform(17, 21):.4f}",
+                "d:sigmapsf": f"{rng.uniform(0.01, 0.2):.4f}",
+            }
+        orbits[f"cand_{trajectory_id}"] = {
+            "d:ssoCandId": trajectory_id,
+            "d:a": f"{rng.uniform(1.5, 4):.6f}",
+            "d:e": f"{rng.uniform(0, 0.3):.6f}",
+            "d:i": f"{rng.uniform(0, 30):.6f}",
+            "d:long. node": f"{rng.uniform(0, 360):.6f}",
+            "d:arg. peric": f"{rng.uniform(0, 360):.6f}",
+            "d:mean anomaly": f"{rng.uniform(0, 360):.6f}",
+            "d:ref_epoch": f"{jds[-1]:.8f}",
+        }
+    _write(output, "ztf.sso_cand", observations)
+    _write(output, "ztf.orb_cand", orbits)
+
+    schema["ztf.sso_cand"] = SSO_CAND_TYPES
+    schema["ztf.orb_cand"] = ORB_CAND_TYPES
+
+
+def bayestar_skymap(date_obs: str, nside: int = 64, sigma: float = 2.0) -> bytes:
+    """Gzipped FITS skymap (bayestar.fits.gz) centred on the fixture field
+
+    Parameters
+    ----------
+    date_obs: str
+        Date of the event, ISO format
+    nside: int, optional
+        HEALPix resolution of the map (RING). Default is 64.
+    sigma: float, optional
+        Width of the Gaussian probability density, in degree. Default is 2.
+
+    Returns
+    -------
+    out: bytes
+        Content of a bayestar.fits.gz file
+    """
+    from astropy.io import fits
+    from healpy import ang2vec, nside2npix, pix2vec
+
+    vec = ang2vec(CENTER_RA, CENTER_DEC, lonlat=True)
+    cos = np.dot(np.array(pix2vec(nside, np.arange(nside2npix(nside)))).T, vec)
+    prob = np.exp(-0.5 * (np.degrees(np.arccos(np.clip(cos, -1, 1))) / sigma) ** 2)
+
+    hdu = fits.BinTableHDU.from_columns(
+        [fits.Column(name="PROB", format="D", array=prob / prob.sum())]
+    )
+    hdu.header["ORDERING"] = "RING"
+    hdu.header["NSIDE"] = nside
+    hdu.header["DATE-OBS"] = date_obs
+
+    buffer = io.BytesIO()
+    fits.HDUList([fits.PrimaryHDU(), hdu]).writeto(buffer)
+    return gzip.compress(buffer.getvalue())
+
+
+def make_fixtures(output: str, nobjects: int, tag: str, seed: int = 0):
+    """Write all tables for `nobjects` objects per survey, unless they exist"""
+    version = os.path.join(output, "version")
+    if os.path.exists(os.path.join(output, "schema.json")):
+        if os.path.exists(version):
+            with open(version) as f:
+                if f.read() == str(VERSION):
+                    return
+        # Written by a previous version: rebuilt
+        os.remove(os.path.join(output, "schema.json"))
+
+    os.makedirs(output, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    schema = {}
+    ztf_tables(rng, nobjects, output, schema)
+    lsst_tables(rng, nobjects, output, schema, tag)
+    sso_tables(rng, nobjects, output, schema)
+
+    with open(version, "w") as f:
+        f.write(str(VERSION))
+
+    # Written last: its presence means the fixtures are complete
+    with open(os.path.join(output, "schema.json"), "w") as f:
+        json.dump(schema, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nobjects", type=int, default=1000)
+    parser.add_argument("--output", default="benchmarks/fixtures/1000")
+    parser.add_argument("--tag", default="benchmark", help="LSST tag table")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    make_fixtures(args.output, args.nobjects, args.tag, args.seed)
+
+
+if __name__ == "__main__":
+    main()
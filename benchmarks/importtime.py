@@ -0,0 +1,95 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Check the import time of an application against a budget
+
+The module is imported in a fresh interpreter with `python -X importtime`.
+The check fails if the import takes more than `--budget` seconds (best
+of `--repeat` runs), or if it imports one of the heavy modules that
+routes must import on first use (see `apps.utils.preload`).
+
+    python -m benchmarks.importtime app_ztf --budget 2
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from apps.utils.preload import HEAVY_MODULES
+
+
+def parse_importtime(lines: list) -> dict:
+    """Return the cumulative import time of each module, in second
+
+    Examples
+    --------
+    >>> lines = [
+    ...     "import time: self [us] | cumulative | imported package",
+    ...     "import time:       120 |        120 |     yaml",
+    ...     "import time:      3000 |       3120 |   apps.utils.utils",
+    ... ]
+    >>> parse_importtime(lines)
+    {'yaml': 0.00012, 'apps.utils.utils': 0.00312}
+    """
+    out = {}
+    for line in lines:
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        out[name.strip()] = int(cumulative) / 1e6
+    return out
+
+
+def import_times(module: str) -> dict:
+    """Import `module` in a fresh interpreter, and return the import times"""
+    env = {**os.environ, "PYTHONWARNINGS": "ignore"}
+    env.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return parse_importtime(result.stderr.splitlines())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("module", help="Module to import, e.g. app_ztf")
+    parser.add_argument("--budget", type=float, default=2.0, help="In second")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    times = min(runs, key=lambda times: times[args.module])
+    total = times[args.module]
+
+    print(f"{args.module} imported in {total:.2f}s (budget {args.budget:.2f}s)")
+    for name, seconds in sorted(times.items(), key=lambda item: -item[1])[
+        1 : args.top + 1
+    ]:
+        print(f"{seconds:>8.3f}s  {name}")
+
+    heavy = [name for name in HEAVY_MODULES if name in times]
+    if len(heavy) > 0:
+        print(f"Heavy modules imported at startup: {', '.join(heavy)}")
+    if total > args.budget or len(heavy) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
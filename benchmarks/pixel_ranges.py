@@ -0,0 +1,118 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark per-pixel prefix scans against coalesced rowkey ranges
+
+The pixel table is synthetic: every pixel of the sky holds a Poisson
+number of rows, and each scan costs a fixed round-trip latency (py4j call
+and HBase RPC) on top of the row materialisation.
+
+Usage:
+    python benchmarks/pixel_ranges.py --nside 1024 --latency 2
+"""
+
+import argparse
+import time
+from functools import partial
+
+import numpy as np
+from healpy import ang2vec, query_disc
+
+from apps.utils.healpix import key_rank, scan_pixels
+
+
+class SyntheticPixelClient:
+    """Minimal stand-in for the HBase client on a pixel table"""
+
+    def __init__(self, nside, rows_per_pixel=2.0, latency=0.002, seed=0):
+        npix = 12 * nside**2
+        self.latency = latency
+        self.rows = np.random.default_rng(seed).poisson(rows_per_pixel, npix)
+        self.pixel_by_rank = np.empty(npix, dtype=np.int64)
+        self.pixel_by_rank[key_rank(np.arange(npix), nside)] = np.arange(npix)
+        self.nside = nside
+        self.range_scan = False
+        self.nscans = 0
+        self.nrows = 0
+
+    def setRangeScan(self, flag):  # noqa: N802
+        self.range_scan = flag
+
+    def scan(self, key, search, cols, delay, ifkey, iftime):
+        self.nscans += 1
+        time.sleep(self.latency)
+
+        bounds = [int(s.split(":")[2].split("_")[0]) for s in search.split(",")]
+        if self.range_scan:
+            first, last = key_rank(bounds, self.nside)
+            pixs = self.pixel_by_rank[first : last + 1]
+        else:
+            pixs = bounds[:1]
+
+        out = {}
+        for pix in pixs:
+            for i in range(self.rows[pix]):
+                out[f"{pix}_{i}"] = {"i:ra": "0.0", "i:dec": "0.0"}
+        self.nrows += len(out)
+        return out
+
+
+def scan_one_by_one(client, pixs):
+    """Former strategy: one prefix scan per pixel"""
+    results = {}
+    for pix in pixs:
+        results.update(client.scan("", f"key:key:{pix}_", "*", 0, True, True))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nside", type=int, default=1024)
+    parser.add_argument("--latency", type=float, default=2.0, help="ms per scan")
+    parser.add_argument("--rows", type=float, default=2.0, help="rows per pixel")
+    args = parser.parse_args()
+
+    client = SyntheticPixelClient(args.nside, args.rows, args.latency / 1000.0)
+    vec = ang2vec(np.pi / 2.0 - np.radians(2.897311), np.radians(193.821739))
+
+    print(
+        f"{'radius':>8} {'pixels':>8} | {'scans':>7} {'rows':>8} {'time':>8} | "
+        f"{'scans':>7} {'rows':>8} {'time':>8} | {'speed-up':>8}"
+    )
+    for radius_arcsec in [10.0, 60.0, 600.0, 3600.0, 18000.0]:
+        pixs = query_disc(
+            args.nside, vec, np.radians(radius_arcsec / 3600.0), inclusive=True
+        )
+
+        timings = []
+        nresults = []
+        for fn in [
+            partial(scan_one_by_one, client, pixs),
+            partial(scan_pixels, client, pixs, args.nside, "*"),
+        ]:
+            client.nscans, client.nrows = 0, 0
+            t0 = time.perf_counter()
+            nresults.append(len(fn()))
+            timings.append((client.nscans, client.nrows, time.perf_counter() - t0))
+        assert nresults[0] == nresults[1], nresults
+
+        (s0, r0, t0), (s1, r1, t1) = timings
+        print(
+            f'{radius_arcsec:>7.0f}" {len(pixs):>8} | {s0:>7} {r0:>8} {t0:>7.3f}s | '
+            f"{s1:>7} {r1:>8} {t1:>7.3f}s | {t0 / t1:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Replay recorded API traffic, and report latencies per route
+
+Traffic is recorded by the API itself (see `TRAFFIC_RECORD` in
+config.yml and `apps/utils/recorder.py`), one JSON line per request.
+Requests are sent with their original spacing divided by `--speedup`
+(0 sends them as fast as possible), by `--workers` concurrent threads.
+Requests to streamed routes (/api/v1/stream) are skipped, as they only
+end when the client disconnects.
+
+By default, requests are served in-process by app_ztf or app_lsst, on
+top of the local stand-in of HBase and synthetic tables (see
+`benchmarks/routes.py`). Use `--asgi` to serve them through the ASGI entry
+point (asgi_ztf or asgi_lsst) instead, and `--url` to replay against a
+running server.
+
+    python -m benchmarks.replay /tmp/fink_traffic.jsonl --survey ztf --speedup 10
+
+In-process, the CPU time of the replay is reported, and the throughput
+per core is the number of requests per CPU second. To compare with the
+production workers (gthread, `--threads=8`, see install/README.md), use
+`--workers 8` for one gunicorn worker, and `--asgi --workers 32` for one
+process with ASGI.threads = 32.
+
+For each route, the report contains the number of requests and errors,
+the p50/p95/p99 latencies, the throughput, the mean response size and,
+in-process, the peak memory allocated by one request. Worker saturation
+is the fraction of the time workers spent serving requests, and the lag
+is the delay between the scheduled and the actual sending times.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import numpy as np
+import requests
+
+from apps.utils.recorder import STREAMED_ROUTES
+from benchmarks.fake_hbase import install
+from benchmarks.fixtures import make_fixtures
+from benchmarks.routes import benchmark_tag
+
+
+def load_traffic(path: str, survey: str, limit: int = None) -> list:
+    """Return recorded requests of a survey, sorted by time
+
+    Requests to streamed routes are skipped.
+    """
+    entries = []
+    with open(path) as f:
+        for line in f:
+            if line.strip() == "":
+                continue
+            entry = json.loads(line)
+            if (
+                entry.get("survey", survey) == survey
+                and entry["route"] not in STREAMED_ROUTES
+            ):
+                entries.append(entry)
+    entries.sort(key=lambda entry: entry["timestamp"])
+    return entries[:limit]
+
+
+class LocalSender:
+    """Send requests to an application in this process"""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def __call__(self, entry: dict):
+        if not hasattr(self.local, "client"):
+            self.local.client = self.app.test_client()
+        if entry["method"] == "GET":
+            response = self.local.client.get(
+                entry["route"], query_string=entry["payload"]
+            )
+        else:
+            response = self.local.client.open(
+                entry["route"], method=entry["method"], json=entry["payload"]
+            )
+        return response.status_code, len(response.get_data())
+
+
+class AsgiSender:
+    """Send requests to an ASGI application in this process"""
+
+    def __init__(self, app):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    async def request(self, entry: dict):
+        if entry["method"] == "GET":
+            query, body, headers = urlencode(entry["payload"]).encode(), b"", []
+        else:
+            query, body = b"", json.dumps(entry["payload"]).encode()
+            headers = [(b"content-type", b"application/json")]
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "method": entry["method"],
+            "scheme": "http",
+            "path": entry["route"],
+            "query_string": query,
+            "headers": headers,
+            "server": ("localhost", 80),
+            "client": ("127.0.0.1", 0),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        response = {"status": None, "bytes": 0}
+        done = asyncio.Event()
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            # The client stays connected until the response is complete
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            else:
+                response["bytes"] += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    done.set()
+
+        await self.app(scope, receive, send)
+        return response["status"], response["bytes"]
+
+    def __call__(self, entry: dict):
+        return asyncio.run_coroutine_threadsafe(self.request(entry), self.loop).result()
+
+
+class RemoteSender:
+    """Send requests to a running server"""
+
+    def __init__(self, url: str, timeout: float):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def __call__(self, entry: dict):
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        kwargs = (
+            {"params": entry["payload"]}
+            if entry["method"] == "GET"
+            else {"json": entry["payload"]}
+        )
+        try:
+            response = self.local.session.request(
+                entry["method"],
+                self.url + entry["route"],
+                timeout=self.timeout,
+                **kwargs,
+            )
+        except requests.RequestException:
+            return None, 0
+        return response.status_code, len(response.content)
+
+
+def replay(entries: list, send, workers: int, speedup: float) -> tuple:
+    """Send requests with their recorded spacing divided by `speedup`
+
+    Returns
+    -------
+    results: list of dict
+        Route, status, latency, lag and size of each request
+    wall: float
+        Duration of the replay, in second
+    cpu: float
+        CPU time of this process during the replay, in second
+    """
+    first = entries[0]["timestamp"]
+    results = []
+    lock = threading.Lock()
+
+    def run(entry, due, origin):
+        start = time.perf_counter()
+        status, nbytes = send(entry)
+        stop = time.perf_counter()
+        with lock:
+            results.append(
+                {
+                    "route": entry["route"],
+                    "status": status,
+                    "latency": stop - start,
+                    "lag": max(0.0, start - origin - due),
+                    "bytes": nbytes,
+                }
+            )
+
+    origin = time.perf_counter()
+    cpu = time.process_time()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for entry in entries:
+            due = 0.0 if speedup == 0 else (entry["timestamp"] - first) / speedup
+            delay = origin + due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, entry, due, origin)
+    return results, time.perf_counter() - origin, time.process_time() - cpu
+
+
+def peak_memory(entries: list, send) -> dict:
+    """Peak memory allocated by the first request of each route, in byte"""
+    first = {}
+    for entry in entries:
+        first.setdefault(entry["route"], entry)
+
+    out = {}
+    tracemalloc.start()
+    for route, entry in first.items():
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        send(entry)
+        out[route] = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return out
+
+
+def summarise(
+    results: list, wall: float, cpu: float, workers: int, memory: dict
+) -> dict:
+    """Aggregate the results per route"""
+    routes = {}
+    for route in sorted({result["route"] for result in results}):
+        selected = [result for result in results if result["route"] == route]
+        latencies = np.array([result["latency"] for result in selected])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        routes[route] = {
+            "requests": len(selected),
+            "errors": sum(
+                result["status"] is None or result["status"] >= 400
+                for result in selected
+            ),
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "throughput": len(selected) / wall,
+            "bytes": float(np.mean([result["bytes"] for result in selected])),
+            "memory": memory.get(route),
+        }
+
+    lags = np.array([result["lag"] for result in results])
+    return {
+        "requests": len(results),
+        "wall": wall,
+        "throughput": len(results) / wall,
+        "cpu": cpu,
+        "per_core": len(results) / cpu if cpu > 0 else None,
+        "saturation": sum(result["latency"] for result in results) / (workers * wall),
+        "lag_p95": float(np.percentile(lags, 95)),
+        "maxrss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "routes": routes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("traffic", help="Recorded requests (JSON lines)")
+    parser.add_argument("--survey", choices=["ztf", "lsst"], default="ztf")
+    parser.add_argument("--speedup", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, help="Number of requests to replay")
+    parser.add_argument("--url", help="Replay against a running server")
+    parser.add_argument("--asgi", action="store_true", help="In-process, with ASGI")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--nobjects", type=int, default=1000)
+    parser.add_argument("--fixtures", default="benchmarks/fixtures")
+    parser.add_argument("--latency", type=float, default=0.0, help="ms per scan")
+    parser.add_argument("--output", help="JSON report")
+    args = parser.parse_args()
+
+    entries = load_traffic(args.traffic, args.survey, args.limit)
+    if len(entries) == 0:
+        raise SystemExit(f"No {args.survey} requests in {args.traffic}")
+
+    memory = {}
+    if args.url is not None:
+        send = RemoteSender(args.url, args.timeout)
+    else:
+        path = os.path.join(args.fixtures, str(args.nobjects))
+        make_fixtures(path, args.nobjects, benchmark_tag())
+        install(path, args.latency / 1000.0)
+        if args.asgi:
+            app = importlib.import_module(f"asgi_{args.survey}").app
+            send = AsgiSender(app)
+        else:
+            app = importlib.import_module(f"app_{args.survey}").app
+            send = LocalSender(app)
+        memory = peak_memory(entries, send)
+
+    results, wall, cpu = replay(entries, send, args.workers, args.speedup)
+    if args.url is not None:
+        # CPU time of the client only
+        cpu = 0.0
+    report = summarise(results, wall, cpu, args.workers, memory)
+
+    print(
+        f"{report['requests']} requests in {wall:.1f}s "
+        f"({report['throughput']:.1f} req/s), "
+        f"saturation {report['saturation']:.0%} of {args.workers} workers, "
+        f"lag p95 {report['lag_p95'] * 1e3:.0f}ms, "
+        f"max RSS {report['maxrss'] / 1024**2:.0f}MB"
+    )
+    if report["per_core"] is not None:
+        print(f"CPU {cpu:.1f}s, throughput per core {report['per_core']:.1f} req/s")
+    print(
+        f"{'route':<28} {'n':>6} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9} "
+        f"{'req/s':>7} {'kB':>8} {'peak MB':>8}"
+    )
+    for route, stats in report["routes"].items():
+        memory = "" if stats["memory"] is None else f"{stats['memory'] / 1024**2:.1f}"
+        print(
+            f"{route:<28} {stats['requests']:>6} {stats['errors']:>5} "
+            f"{stats['p50'] * 1e3:>7.1f}ms {stats['p95'] * 1e3:>7.1f}ms "
+            f"{stats['p99'] * 1e3:>7.1f}ms {stats['throughput']:>7.2f} "
+            f"{stats['bytes'] / 1024:>8.1f} {memory:>8}"
+        )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
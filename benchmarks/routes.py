@@ -0,0 +1,411 @@
+# Copyright 2026 AstroLab Software
+# Author: Julien Peloton
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Offline benchmarks of the route utilities
+
+Each case calls the `utils.py` function of a route, as the API does,
+against synthetic tables served by a local stand-in of the HBase client
+(see `benchmarks.fake_hbase`). No gateway, HBase or network is needed.
+Cases are run for several table sizes, and timings are written to a JSON
+report that can be compared between releases:
+
+    python -m benchmarks.routes --sizes 100,1000 --output v1.json
+    python -m benchmarks.routes --sizes 100,1000 --compare v1.json
+
+Skymap cases upload a synthetic skymap (see `benchmarks.fixtures`), and
+crossmatch cases a catalog of fixture objects. Routes relying on external
+services (cutouts, sso, ssoft, ssobulk, tracklet, blocks), streaming
+(stream) or without HBase access (classes, schema) are not covered.
+"""
+
+import argparse
+import glob
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import threading
+import time
+
+import pandas as pd
+from flask import Response
+
+from benchmarks.fake_hbase import install
+from benchmarks.fixtures import (
+    CENTER_DEC,
+    CENTER_RA,
+    bayestar_skymap,
+    make_fixtures,
+    ztf_name,
+)
+from apps.utils.utils import extract_configuration
+
+
+def cases(context: dict) -> list:
+    """Return the benchmark cases
+
+    Returns
+    -------
+    out: list of tuple
+        (name, "module:function", positional arguments)
+    """
+    ztf = "apps.routes.v1.ztf"
+    lsst = "apps.routes.v1.lsst"
+    oid, diaobjectid = context["objectId"], context["diaObjectId"]
+    # Small cones are centred on an object, large ones on the fixture field
+    cone = {"ra": context["ra"], "dec": context["dec"]}
+    field = {"ra": CENTER_RA, "dec": CENTER_DEC}
+    lsst_cone = {"ra": context["lsst_ra"], "dec": context["lsst_dec"]}
+    skymap = {"credible_level": 0.5, "n_day_before": 30, "n_day_after": 30}
+    return [
+        (
+            "ztf/objects",
+            f"{ztf}.objects.utils:extract_object_data",
+            [{"objectId": oid}],
+        ),
+        (
+            "ztf/objects[10 objects]",
+            f"{ztf}.objects.utils:extract_object_data",
+            [{"objectId": ",".join(ztf_name(i) for i in range(10))}],
+        ),
+        (
+            "ztf/objects[columns]",
+            f"{ztf}.objects.utils:extract_object_data",
+            [{"objectId": oid, "columns": "i:jd,i:magpsf,i:fid"}],
+        ),
+        (
+            "ztf/latests",
+            f"{ztf}.latests.utils:extract_object_from_class",
+            [{"class": "Early SN Ia candidate", "n": 100}],
+        ),
+        (
+            "ztf/anomaly",
+            f"{ztf}.anomaly.utils:get_anomalous_alerts",
+            [{"n": 100}],
+        ),
+        (
+            "ztf/conesearch[60 arcsec]",
+            f"{ztf}.conesearch.utils:run_conesearch",
+            [{**cone, "radius": 60}],
+        ),
+        (
+            "ztf/conesearch[1 deg]",
+            f"{ztf}.conesearch.utils:run_conesearch",
+            [{**field, "radius": 3600, "n": 1000}],
+        ),
+        (
+            "ztf/skymap",
+            f"{ztf}.skymap.utils:search_in_skymap",
+            [{"bayestar": context["ztf_bayestar"], **skymap}],
+        ),
+        (
+            "ztf/crossmatch[100 sources]",
+            f"{ztf}.crossmatch.utils:run_crossmatch",
+            [{"catalog": context["ztf_catalog"]}, {}],
+        ),
+        (
+            "ztf/ssocand[orbParams]",
+            f"{ztf}.ssocand.utils:get_ssocand",
+            [{"kind": "orbParams"}],
+        ),
+        (
+            "ztf/ssocand[lightcurves]",
+            f"{ztf}.ssocand.utils:get_ssocand",
+            [{"kind": "lightcurves", "ssoCandId": context["ssoCandId"]}],
+        ),
+        (
+            "ztf/statistics",
+            f"{ztf}.statistics.utils:get_statistics",
+            [{"date": "2021"}],
+        ),
+        (
+            "ztf/statistics[cumsum]",
+            f"{ztf}.statistics.utils:get_statistics",
+            [{"date": "", "aggregate": "cumsum"}],
+        ),
+        (
+            "ztf/metadata[all]",
+            f"{ztf}.metadata.utils:retrieve_metadata",
+            ["all"],
+        ),
+        (
+            "ztf/metadata[internal_name]",
+            f"{ztf}.metadata.utils:retrieve_oid",
+            [context["internal_name"], "internal_name"],
+        ),
+        (
+            "ztf/resolver[tns]",
+            f"{ztf}.resolver.utils:resolve_name",
+            [{"resolver": "tns", "name": "sn 2023", "nmax": 10}],
+        ),
+        (
+            "ztf/resolver[tns reverse]",
+            f"{ztf}.resolver.utils:resolve_name",
+            [{"resolver": "tns", "name": context["internalname"], "reverse": True}],
+        ),
+        (
+            "lsst/objects",
+            f"{lsst}.objects.utils:extract_object_data",
+            [{"diaObjectId": diaobjectid}],
+        ),
+        (
+            "lsst/sources",
+            f"{lsst}.sources.utils:extract_object_data",
+            [{"diaObjectId": diaobjectid}],
+        ),
+        (
+            "lsst/fp",
+            f"{lsst}.fp.utils:extract_fp_data",
+            [{"diaObjectId": diaobjectid}],
+        ),
+        (
+            "lsst/conesearch[60 arcsec]",
+            f"{lsst}.conesearch.utils:run_conesearch",
+            [{**lsst_cone, "radius": 60}],
+        ),
+        (
+            "lsst/skymap",
+            f"{lsst}.skymap.utils:search_in_skymap",
+            [{"bayestar": context["lsst_bayestar"], **skymap}],
+        ),
+        (
+            "lsst/crossmatch[100 sources]",
+            f"{lsst}.crossmatch.utils:run_crossmatch",
+            [{"catalog": context["lsst_catalog"]}, {}],
+        ),
+        (
+            "lsst/tags",
+            f"{lsst}.tags.utils:extract_object_data",
+            [{"tag": context["tag"], "n": 100}],
+        ),
+        (
+            "lsst/statistics",
+            f"{lsst}.statistics.utils:get_statistics",
+            [{"date": ""}],
+        ),
+        (
+            "lsst/resolver[tns]",
+            f"{lsst}.resolver.utils:resolve_name",
+            [{"resolver": "tns", "name_or_id": context["lsst_tns"], "nmax": 10}],
+        ),
+    ]
+
+
+def catalog(pdf: pd.DataFrame, id_col: str, ra_col: str, dec_col: str) -> str:
+    """CSV catalog of 100 fixture objects, with a 5 arcsec radius"""
+    objects = pdf.drop_duplicates(id_col).iloc[:100]
+    return pd.DataFrame(
+        {
+            "id": objects[id_col].to_numpy(),
+            "ra": objects[ra_col].astype(float).to_numpy(),
+            "dec": objects[dec_col].astype(float).to_numpy(),
+            "radius": 5.0,
+        }
+    ).to_csv(index=False)
+
+
+def benchmark_tag() -> str:
+    """Return the LSST tag stored in the fixtures (first tag with HBase support)"""
+    from apps.routes.v1.lsst.tags.utils import tag_support
+
+    return next(tag for tag, supported in tag_support().items() if supported)
+
+
+def reset():
+    """Drop all per-process caches built from the previous tables"""
+    from apps.routes.v1.ztf.metadata.utils import metadata_store
+    from apps.utils.resolver_index import resolver_index
+    from apps.utils.statistics import statistics_store
+
+    for cached_fn in [metadata_store, resolver_index, statistics_store]:
+        cached_fn.cache_clear()
+
+    directory = extract_configuration("config.yml")["RESOLVER_INDEX"]["directory"]
+    for table in ["ztf.tns_resolver", "ztf.sso_resolver", "rubin.tns_resolver"]:
+        for path in glob.glob(os.path.join(directory, f"{table}*")):
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+
+def settle():
+    """Wait for background index builds started by a call"""
+    for thread in threading.enumerate():
+        if thread.name.startswith("index-"):
+            thread.join()
+
+
+def measure(fn, args, min_time: float, min_rounds: int, max_rounds: int) -> dict:
+    """Call `fn(*args)` repeatedly, and return timing statistics in second"""
+    out = fn(*args)
+    settle()
+    if isinstance(out, tuple):
+        # e.g. crossmatch: (alerts, truncated)
+        out = out[0]
+    if isinstance(out, Response):
+        raise RuntimeError(f"{out.status_code} {out.get_data(as_text=True)}")
+
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < min_rounds or (
+        len(timings) < max_rounds and time.perf_counter() - start < min_time
+    ):
+        t0 = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - t0)
+
+    quartiles = statistics.quantiles(timings, n=4) if len(timings) > 1 else [0] * 3
+    return {
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.fmean(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "median": statistics.median(timings),
+        "iqr": quartiles[2] - quartiles[0],
+        "rounds": len(timings),
+        "ops": 1.0 / statistics.fmean(timings),
+        "rows": len(out) if isinstance(out, pd.DataFrame) else None,
+    }
+
+
+def commit_info() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"id": commit}
+
+
+def compare(report: dict, previous: dict):
+    """Print the change of median time per case"""
+    before = {(b["name"], b["size"]): b["stats"] for b in previous["benchmarks"]}
+    print(f"{'case':<32} {'size':>7} {'before':>10} {'after':>10} {'change':>8}")
+    for bench in report["benchmarks"]:
+        old = before.get((bench["name"], bench["size"]))
+        if old is None or bench["stats"] is None or old is None:
+            continue
+        ratio = bench["stats"]["median"] / old["median"] - 1
+        print(
+            f"{bench['name']:<32} {bench['size']:>7} "
+            f"{old['median'] * 1e3:>8.2f}ms {bench['stats']['median'] * 1e3:>8.2f}ms "
+            f"{ratio:>+7.0%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100,1000", help="Objects per survey")
+    parser.add_argument("--fixtures", default="benchmarks/fixtures")
+    parser.add_argument("--latency", type=float, default=0.0, help="ms per scan")
+    parser.add_argument("--min-time", type=float, default=1.0, help="s per case")
+    parser.add_argument("--min-rounds", type=int, default=3)
+    parser.add_argument("--max-rounds", type=int, default=100)
+    parser.add_argument("--filter", default="", help="Run cases containing this")
+    parser.add_argument("--output", default="benchmarks/report.json")
+    parser.add_argument("--compare", help="Previous report to compare with")
+    args = parser.parse_args()
+
+    tag = benchmark_tag()
+
+    report = {
+        "datetime": pd.Timestamp.now("UTC").isoformat(),
+        "commit_info": commit_info(),
+        "machine_info": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "node": platform.node(),
+        },
+        "latency_ms": args.latency,
+        "benchmarks": [],
+    }
+
+    for size in [int(size) for size in args.sizes.split(",")]:
+        path = os.path.join(args.fixtures, str(size))
+        make_fixtures(path, size, tag)
+        install(path, args.latency / 1000.0)
+        reset()
+
+        alerts = pd.read_parquet(os.path.join(path, "ztf.parquet"))
+        diaobjects = pd.read_parquet(os.path.join(path, "rubin.diaObject.parquet"))
+        metadata = pd.read_parquet(os.path.join(path, "ztf.metadata.parquet"))
+        tns = pd.read_parquet(os.path.join(path, "ztf.tns_resolver.parquet"))
+        lsst_tns = pd.read_parquet(os.path.join(path, "rubin.tns_resolver.parquet"))
+        ssocand = pd.read_parquet(os.path.join(path, "ztf.orb_cand.parquet"))
+        context = {
+            "objectId": ztf_name(0),
+            "ra": float(alerts["i:ra"].iloc[0]),
+            "dec": float(alerts["i:dec"].iloc[0]),
+            "diaObjectId": diaobjects["r:diaObjectId"].iloc[0],
+            "lsst_ra": float(diaobjects["r:ra"].iloc[0]),
+            "lsst_dec": float(diaobjects["r:dec"].iloc[0]),
+            "tag": tag,
+            "internal_name": metadata["d:internal_name"].iloc[0],
+            "internalname": tns["d:internalname"].iloc[0],
+            "lsst_tns": lsst_tns["f:fullname"].iloc[0],
+            "ssoCandId": ssocand["d:ssoCandId"].iloc[0],
+            # Events in the middle of the alert time ranges
+            "ztf_bayestar": str(bayestar_skymap("2021-06-01T00:00:00")),
+            "lsst_bayestar": str(bayestar_skymap("2025-09-01T00:00:00")),
+            "ztf_catalog": catalog(alerts, "i:objectId", "i:ra", "i:dec"),
+            "lsst_catalog": catalog(diaobjects, "r:diaObjectId", "r:ra", "r:dec"),
+        }
+
+        for name, target, fn_args in cases(context):
+            if args.filter not in name:
+                continue
+            module, function = target.split(":")
+            fn = getattr(importlib.import_module(module), function)
+            try:
+                stats = measure(
+                    fn, fn_args, args.min_time, args.min_rounds, args.max_rounds
+                )
+                error = None
+            except Exception as e:
+                stats, error = None, f"{type(e).__name__}: {e}"
+
+            report["benchmarks"].append(
+                {
+                    "name": name,
+                    "group": name.split("[")[0],
+                    "size": size,
+                    "target": target,
+                    "stats": stats,
+                    "error": error,
+                }
+            )
+            if stats is None:
+                print(f"{name:<32} {size:>7} failed: {error}")
+            else:
+                print(
+                    f"{name:<32} {size:>7} {stats['median'] * 1e3:>9.2f}ms "
+                    f"(+/- {stats['iqr'] * 1e3:.2f}ms, {stats['rounds']} rounds, "
+                    f"{stats['rows']} rows)"
+                )
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,14 @@ import uuid
 
 from prometheus_flask_exporter.multiprocess import GunicornPrometheusMetrics
 
+from apps.utils.jobs import start_job_threads
+from apps.utils.preload import preload
+
+# Import the application in the master, before forking the workers, such
+# that they share its memory (see apps/utils/preload.py). Code changes
+# require a restart, not a reload (HUP).
+preload_app = True
+
 
 def when_ready(server):
     path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
@@ -27,6 +35,8 @@ def when_ready(server):
             os.remove(f)
     PORT = int(os.getenv("PROMETHEUS_METRIC_PORT", "9090"))
     GunicornPrometheusMetrics.start_http_server_when_ready(PORT)
+    # heavy dependencies of the routes, shared by the workers
+    preload()
 
 
 class GunicornWorkerIDsPool:
@@ -103,3 +113,5 @@ def post_fork(server, worker):
     :param worker: Gunicorn worker instance that was forked
     """
     os.environ["GUNICORN_WORKER_ID"] = getattr(worker, "worker_id", None)
+    # Job threads of the worker, if JOBS.threads > 0
+    start_job_threads()
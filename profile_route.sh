@@ -40,6 +40,9 @@ while [ "$#" -gt 0 ]; do
   esac
 done
 
+# Enable the @profile decorators (no-op by default)
+export FINK_PROFILE=1
+
 kernprof -l $ROUTE_PATH/profiling.py
 python -m line_profiler -rmt "profiling.py.lprof"
 
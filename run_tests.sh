@@ -49,6 +49,9 @@ if [[ -z $SURVEY ]]; then
   exit
 fi
 
+# Test cases shared by the surveys are in apps/routes/v1/tests
+export PYTHONPATH="$(pwd):$PYTHONPATH"
+
 # Run the ZTF test suite on the utilities
 for filename in apps/routes/v1/"${SURVEY}"/*/test.py
 do